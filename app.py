@@ -1,18 +1,36 @@
-import json
+import io
 import logging
 import os
-from urllib.parse import urljoin, urlencode
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Callable, Iterator
 
-import requests
-from flask import Flask, render_template, request, redirect, url_for, flash, abort, jsonify
-from flask_assets import Environment, Bundle
+from flask import Flask, render_template, request, redirect, url_for, flash, abort, jsonify, make_response, \
+    stream_template, stream_with_context, Response, session, send_file
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from markupsafe import Markup
+from werkzeug.http import is_resource_modified
 
 from config import Config
-from data_manager.sqlite_data_manager import SQLiteDataManager
-from project.data_models import db, Movie, User
-from project.exceptions import DatabaseError, MovieNotFoundError, UserNotUniqueError
+from data_manager import create_data_manager
+from data_manager.note_queue import NoteWriteBehindQueue
+from data_manager.read_replicas import create_read_replica_router
+from omdb.client import create_omdb_client, parse_movie_data
+from project.cli import create_cli
+from project.data_models import db, Movie, User, UserMovie, set_sqlite_pragmas
+from project.exceptions import DatabaseError, MovieNotFoundError, UserNotUniqueError, OmdbUnavailableError, \
+    UserMovieNotFoundError, PosterUnavailableError
+from project.instrumentation import PROMETHEUS_CONTENT_TYPE, create_instrumentation, timed
+from project.recommendations import create_similarity_refresh_queue
+from utils.avatars import AVATAR_MIMETYPE, avatar_key, create_avatar_cache, render_avatar_symbol
+from utils.fragment_cache import FragmentCacheExtension, create_fragment_cache
+from utils.http_cache import fingerprint_files, make_etag
+# registers the "sqlite" rate limit storage scheme
+from utils.limiter_storage import SQLiteStorage  # noqa: F401
+from utils.movie_io import SUPPORTED_FORMATS, get_file_format, read_movie_rows, write_movie_rows
+from utils.poster_cache import POSTER_MIMETYPE, create_poster_cache
+from utils.static_assets import StaticAssets
 from utils.validation import get_valid_number_or_none, get_valid_url_or_none
 
 app = Flask(__name__)
@@ -23,21 +41,48 @@ limiter = Limiter(key_func=get_remote_address, app=app)
 if not os.path.exists('instance'):
     os.makedirs('instance')
 
-assets = Environment(app)
-
-css = Bundle("css/style.css", filters="rcssmin", output="dist/css/style.min.css")
-js = Bundle("js/script.js", filters="rjsmin", output="dist/js/script.min.js")
-
-assets.register("css_all", css)
-assets.register("js_all", js)
+# built by "flask moviweb build-assets" during deployment, not at startup
+static_assets = StaticAssets(os.path.join(app.static_folder, "dist"))
 
 db.init_app(app)
-data_manager = SQLiteDataManager(db)
+with app.app_context():
+    set_sqlite_pragmas(db.engine, app.config["SQLITE_PRAGMAS"])
+instrumentation = create_instrumentation(app.config)
+if instrumentation:
+    instrumentation.init_app(app)
+read_router = create_read_replica_router(app.config)
+read_router.init_app(app)
+data_manager = create_data_manager(db, app.config, read_router)
+omdb_client = create_omdb_client(app.config)
+note_queue = NoteWriteBehindQueue(
+    app, data_manager, flush_interval=app.config["NOTES_FLUSH_INTERVAL_MS"] / 1000,
+    max_batch=app.config["NOTES_FLUSH_MAX_BATCH"]
+) if app.config["NOTES_WRITE_BEHIND"] else None
+similarity_queue = create_similarity_refresh_queue(app, data_manager)
+poster_cache = create_poster_cache(app.config)
+avatar_cache = create_avatar_cache(app.config)
+app.cli.add_command(create_cli(data_manager, omdb_client, poster_cache))
 
 # Set up global logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("app")
 
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 50
+NOTE_MAX_LENGTH = UserMovie.user_note.type.length
+POSTER_PLACEHOLDER_URL = "https://placehold.co/300x444?text=No%0APoster"
+# the built assets, proxied posters and avatars are addressed by versioned URLs, so browsers can keep them forever
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Part of the ETags of rendered pages, so that a deployment with changed templates or assets invalidates them
+PAGES_FINGERPRINT = fingerprint_files(app.template_folder, os.path.join(app.static_folder, "css"),
+                                      os.path.join(app.static_folder, "js"))
+
+app.jinja_env.add_extension(FragmentCacheExtension)
+app.jinja_env.globals["avatar_key"] = avatar_key
+app.jinja_env.fragment_cache = create_fragment_cache(app.config)
+app.jinja_env.fragment_cache_prefix = PAGES_FINGERPRINT[:12]
+
 
 @app.template_filter("pluralize")
 def pluralize(count, word):
@@ -54,6 +99,85 @@ def pluralize(count, word):
     return word if count == 1 else word + 's'
 
 
+@app.template_global()
+def asset_url(path: str) -> str:
+    """
+    Returns the URL of a fingerprinted static asset.
+
+    Args:
+        path (str): The path of the asset in the static folder, e.g. "css/style.css".
+
+    Returns:
+        str: The asset URL.
+    """
+    return static_assets.url(path)
+
+
+@app.template_global()
+def avatar_url(user: User) -> str:
+    """
+    Returns the URL of the avatar of a user, versioned by the avatar key.
+
+    Args:
+        user (User): The user.
+
+    Returns:
+        str: The avatar URL.
+    """
+    return url_for("user_avatar", user_id=user.id, v=avatar_key(user.name))
+
+
+@app.template_global()
+def avatar_symbol(user: User) -> Markup:
+    """
+    Returns the avatar of a user as a symbol of the inline SVG sprite, referenced by "#avatar-<key>".
+
+    Args:
+        user (User): The user.
+
+    Returns:
+        Markup: The SVG symbol element.
+    """
+    return Markup(render_avatar_symbol(user.name))
+
+
+@app.template_global()
+def poster_src(movie, width: int | None = None) -> str:
+    """
+    Returns the URL of a movie poster, served through the poster proxy when it is enabled.
+
+    Args:
+        movie (Movie | MovieCard): The movie with its poster URL and version.
+        width (int | None): One of POSTER_WIDTHS, the largest width by default.
+
+    Returns:
+        str: The proxied or original poster URL, the placeholder image URL for movies without a poster.
+    """
+    if not movie.poster_url:
+        return POSTER_PLACEHOLDER_URL
+    if not poster_cache:
+        return movie.poster_url
+
+    width = width or poster_cache.widths[-1]
+    return url_for("poster", movie_id=movie.id, width=width, v=movie.version)
+
+
+@app.template_global()
+def poster_srcset(movie) -> str:
+    """
+    Returns the srcset attribute value listing all proxied widths of a movie poster.
+
+    Args:
+        movie (Movie | MovieCard): The movie with its poster URL and version.
+
+    Returns:
+        str: The srcset value, empty when the poster is not served through the poster proxy.
+    """
+    if not movie.poster_url or not poster_cache:
+        return ""
+    return ", ".join(f"{poster_src(movie, width)} {width}w" for width in poster_cache.widths)
+
+
 @app.route('/')
 def home():
     """
@@ -69,39 +193,212 @@ def home():
     return render_template("index.html", users_count=users_count, movies_count=movies_count)
 
 
+def _get_page_args() -> tuple[int, int | None]:
+    """
+    Reads the keyset pagination parameters from the request query.
+
+    Returns:
+        tuple[int, int | None]: The page size limited to MAX_PAGE_SIZE and the ID after which the page starts.
+    """
+    limit = get_valid_number_or_none(request.args.get("limit", ""), int) or app.config["PAGE_SIZE"]
+    limit = min(max(limit, 1), app.config["MAX_PAGE_SIZE"])
+    after = get_valid_number_or_none(request.args.get("after", ""), int)
+    return limit, after
+
+
+def _render_page(template: str, partial_template: str, items_name: str, items: list, limit: int, endpoint: str,
+                 **context):
+    """
+    Renders one page of a keyset paginated list.
+
+    The items are expected to be fetched with one extra item, which signals that a next page exists.
+    When the "partial" query parameter is set only the items are rendered (for infinite scrolling)
+    and the URL of the next page is sent in the X-Next-Page header.
+
+    Args:
+        template (str): The template of the whole page.
+        partial_template (str): The template rendering only the items.
+        items_name (str): The name of the items in the template context.
+        items (list): Up to limit + 1 items ordered by their ID.
+        limit (int): The page size.
+        endpoint (str): The endpoint of the paginated list.
+        **context: The template context, also used as the endpoint values.
+
+    Returns:
+        Response: The rendered page or its items.
+    """
+    has_next_page = len(items) > limit
+    items = items[:limit]
+    endpoint_values = {key: value for key, value in context.items() if key.endswith("_id")}
+    next_page_url = url_for(endpoint, limit=limit, after=items[-1].id, **endpoint_values) if has_next_page else None
+    context[items_name] = items
+
+    if request.args.get("partial"):
+        response = make_response(render_template(partial_template, **context))
+        if next_page_url:
+            response.headers["X-Next-Page"] = next_page_url
+        return response
+
+    return render_template(template, next_page_url=next_page_url, **context)
+
+
+def _conditional_page(version: int, render: Callable[[], Response | str]) -> Response:
+    """
+    Renders a page unless the client already has the current version of it.
+
+    The strong ETag is derived from the data version stamp, the request path with its query
+    and the templates fingerprint, the Last-Modified date from the version stamp. When the
+    client's If-None-Match (or If-Modified-Since) matches, 304 is sent without rendering.
+    Pages with pending flash messages are always rendered.
+
+    Args:
+        version (int): The version stamp (milliseconds since the epoch) of the data shown on the page.
+        render (Callable[[], Response | str]): Renders the page.
+
+    Returns:
+        Response: The rendered page or an empty 304 Not Modified response, both with the caching headers.
+    """
+    etag = make_etag(PAGES_FINGERPRINT, version, request.full_path)
+    last_modified = datetime.fromtimestamp(version / 1000, timezone.utc) if version else None
+
+    if "_flashes" not in session and not is_resource_modified(request.environ, etag=etag,
+                                                               last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        response = make_response(render())
+
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # cached copies have to be revalidated, which is cheap thanks to the version stamps
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 @app.route("/users")
 def list_users():
     """
-    Lists all users in the database.
+    Lists users in the database, one page at a time.
+
+    Query parameters:
+        limit (int): The page size, at most MAX_PAGE_SIZE.
+        after (int): The ID of the last user of the previous page.
+
+    Returns:
+        Response: The rendered HTML template showing the page of users, or 304 when the client's copy is current.
+    """
+    def render():
+        limit, after = _get_page_args()
+        users = data_manager.get_all_users(limit=limit + 1, after=after)
+        return _render_page("content/users.html", "content/_user_cards.html", "users", users, limit, "list_users")
+
+    return _conditional_page(data_manager.get_users_version(), render)
+
+
+def _buffered(chunks: Iterator[str], buffer_size: int) -> Iterator[str]:
+    """
+    Joins small chunks of a streamed template into larger ones to avoid a write per template expression.
+
+    Args:
+        chunks (Iterator[str]): The chunks of the streamed template.
+        buffer_size (int): The minimal size of a yielded chunk, except for the last one.
 
-    Retrieves all users and renders the users list page.
+    Returns:
+        Iterator[str]: The joined chunks.
+    """
+    buffer = []
+    buffered_size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered_size += len(chunk)
+        if buffered_size >= buffer_size:
+            yield "".join(buffer)
+            buffer = []
+            buffered_size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def _stream_user_movies(user: User) -> Response:
+    """
+    Streams the whole movie list of a user.
+
+    The movies are fetched from a server-side cursor in batches while the template is rendered,
+    so the page header and first cards are sent immediately and memory use stays flat.
+
+    Args:
+        user (User): The user whose movies are to be displayed.
 
     Returns:
-        Response: The rendered HTML template showing the list of users.
+        Response: The streamed HTML response.
     """
-    users = data_manager.get_all_users()
-    return render_template("content/users.html", users=users)
+    movies = data_manager.iter_user_movies(user.id, batch_size=app.config["STREAM_BATCH_SIZE"])
+    first_movie = next(movies, None)
+    movies = chain([first_movie], movies) if first_movie else []
+
+    chunks = stream_template("content/movies.html", movies=movies, user=user, user_id=user.id, next_page_url=None)
+    return Response(_buffered(chunks, app.config["STREAM_BUFFER_SIZE"]), mimetype="text/html")
 
 
 @app.route("/users/<int:user_id>")
 def user_movies(user_id: int):
     """
-    Displays a user's movie list.
+    Displays a user's movie list, one page at a time or streamed as a whole.
 
     Args:
         user_id (int): The ID of the user whose movies are to be displayed.
 
+    Query parameters:
+        limit (int): The page size, at most MAX_PAGE_SIZE.
+        after (int): The ID of the last movie of the previous page.
+        stream (str): Streams the whole list when set, streaming is the default with STREAM_MOVIE_LISTS enabled.
+
+    Returns:
+        Response: The rendered HTML template showing the page of movies for the specified user,
+                  or 304 when the client's copy is current.
+    """
+    version = data_manager.get_user_movies_version(user_id)
+    if version is None:
+        abort(404, description="User not found!")
+
+    def render():
+        user = db.get_or_404(User, user_id, description="User not found!")
+        if (request.args.get("stream") or app.config["STREAM_MOVIE_LISTS"]) and not request.args.get("partial"):
+            return _stream_user_movies(user)
+
+        limit, after = _get_page_args()
+        movies = data_manager.get_user_movies(user_id, limit=limit + 1, after=after)
+        return _render_page("content/movies.html", "content/_movie_cards.html", "movies", movies, limit,
+                            "user_movies", user=user, user_id=user_id)
+
+    return _conditional_page(version, render)
+
+
+@app.route("/users/<int:user_id>/recommendations")
+def user_recommendations(user_id: int):
+    """
+    Renders the movies recommended to a user, loaded by the user's movie list page.
+
+    The recommendations change with the lists of other users, so they are not part of
+    the conditionally cached movie list page.
+
+    Args:
+        user_id (int): The ID of the user.
+
     Returns:
-        Response: The rendered HTML template showing the list of movies for the specified user.
+        Response: The rendered recommended movie cards, empty when there are none.
     """
-    movies = data_manager.get_user_movies(user_id)
+    if not app.config["RECOMMENDATIONS_ENABLED"]:
+        abort(404, description="Recommendations are disabled!")
+
     user = db.get_or_404(User, user_id, description="User not found!")
-    # Note - add notes to the movies
-    return render_template("content/movies.html", movies=movies, user=user)
+    movies = data_manager.get_recommended_movies(user_id, limit=app.config["RECOMMENDED_MOVIES_LIMIT"])
+    return render_template("content/_recommended_movies.html", user=user, movies=movies)
 
 
 @app.route("/add_user", methods=["GET", "POST"])
-@limiter.limit(limit_value="3 per day")
+@limiter.limit(limit_value=app.config["ADD_USER_RATE_LIMIT"])
 def add_user():
     """
     Allows the creation of a new user.
@@ -129,45 +426,36 @@ def add_user():
     return render_template("forms/add_user.html")
 
 
+@timed("omdb")
 def _load_movie(title: str) -> Movie | None:
     """
     Loads movie information from the OMDB API.
 
+    Responses are served from the OMDb response cache when enabled,
+    only cache misses are requested from the API.
+
     Args:
         title (str): The title of the movie to search for.
 
     Returns:
         Movie | None: A Movie object if found, otherwise None.
-    """
-    new_movie = None
-    base_url = "https://www.omdbapi.com/"
-    params = {"apikey": app.config["API_KEY"], "t": title, "type": "movie"}
-
-    response = requests.get(url=urljoin(base_url, "?" + urlencode(params)))
-    response_obj = json.loads(response.text)
-
-    if response.status_code == 200:
-        movie_was_found = eval(response_obj["Response"])
-
-        if movie_was_found:
-            new_title = response_obj["Title"]
-            new_director = response_obj["Director"]
-            new_year = get_valid_number_or_none(response_obj["Year"], int)
-            new_rating = get_valid_number_or_none(response_obj["imdbRating"], float)
-            new_poster_url = get_valid_url_or_none(response_obj["Poster"])
 
-            new_movie = Movie(name=new_title, director=new_director, year=new_year, rating=new_rating,
-                              poster_url=new_poster_url)
+    Raises:
+        OmdbUnavailableError: If the OMDb API cannot be reached or fails to respond.
+    """
+    response_obj = omdb_client.fetch_movie_data(title)
+    movie_data = parse_movie_data(response_obj)
 
-        else:
-            logger.warning(response_obj["Error"])
-    else:
-        logger.error("Error: Accessing movie data failed, please try again later.")
+    if not movie_data:
+        logger.warning(response_obj.get("Error"))
+        return None
 
-    return new_movie
+    return Movie(**movie_data)
 
 
 @app.route("/users/<int:user_id>/add_movie", methods=["GET", "POST"])
+@limiter.limit(limit_value=app.config["ADD_MOVIE_SEARCH_RATE_LIMIT"], methods=["GET"],
+               exempt_when=lambda: not request.args.get("title"))
 def add_movie(user_id: int):
     """
     Allows a user to add a movie to their movie list.
@@ -198,37 +486,33 @@ def add_movie(user_id: int):
                           poster_url=movie_poster_url)
 
         try:
-            user_movie_list = data_manager.get_user_movies(user_id)
-            this_user_movie = next((movie for movie in user_movie_list if movie.name == movie_name), None)
-            added_movie = data_manager.get_movie_by_title(movie_name)
-
-            if not added_movie:
-                data_manager.add_movie(new_movie)
-            else:
-                new_movie = added_movie
-
-            if not this_user_movie:
-                data_manager.add_movie_to_user(user_id, new_movie)
-            else:
-                flash("Movie is already in users list.")
-                return redirect(url_for("add_movie", user_id=user_id, movie=None))
-
+            is_assigned = data_manager.add_movie_for_user(user_id, new_movie)
         except DatabaseError as error:
             abort(500, description=str(error))
 
+        if not is_assigned:
+            flash("Movie is already in users list.")
+            return redirect(url_for("add_movie", user_id=user_id, movie=None))
+
+        if poster_cache and movie_poster_url:
+            poster_cache.warm(movie_poster_url)
+
         return redirect(url_for("user_movies", user_id=user_id))
 
     title = request.args.get("title")
 
     if title:
-        try:
-            fetched_movie = _load_movie(title)
-        except requests.exceptions.ConnectionError as error:
-            logger.error(f"Connection to omdb failed: {str(error)}")
-            flash("Searching online failed, please retry later.")
-            return render_template("forms/add_movie.html", user=user, movie=None)
+        # movies already stored locally are served without querying OMDb
+        matching_movie = data_manager.get_movie_by_title(title)
+
+        if not matching_movie:
+            try:
+                matching_movie = _load_movie(title)
+            except OmdbUnavailableError as error:
+                logger.error(str(error))
+                flash("Searching online failed, please retry later.")
+                return render_template("forms/add_movie.html", user=user, movie=None)
 
-        matching_movie = data_manager.get_movie_by_title(title) or fetched_movie
         if not matching_movie:
             flash(f"No movie found. Try a different search.")
 
@@ -237,6 +521,122 @@ def add_movie(user_id: int):
     return render_template("forms/add_movie.html", user=user, movie=None)
 
 
+@app.route("/users/<int:user_id>/import", methods=["POST"])
+def import_movies(user_id: int):
+    """
+    Imports an uploaded CSV or JSON Lines movie list (e.g. a Letterboxd or IMDb export) for a user.
+
+    The uploaded file is read as a stream and stored in chunked transactions.
+
+    Args:
+        user_id (int): The ID of the user importing the movies.
+
+    Returns:
+        Response: JSON response with the number of processed rows, added and assigned movies.
+    """
+    user = db.get_or_404(User, user_id, description="User not found!")
+    uploaded_file = request.files.get("file")
+    if not uploaded_file:
+        return jsonify(success=False, error="File is required"), 400
+
+    file_format = request.form.get("format") or get_file_format(uploaded_file.filename or "")
+    if not file_format:
+        return jsonify(success=False, error="Unsupported file format, use CSV or JSON Lines"), 400
+
+    rows = read_movie_rows(io.TextIOWrapper(uploaded_file.stream, encoding="utf-8-sig"), file_format)
+    try:
+        summary = data_manager.import_user_movies(user.id, rows, chunk_size=app.config["IMPORT_CHUNK_SIZE"])
+    except ValueError as error:
+        return jsonify(success=False, error=str(error)), 400
+    except DatabaseError as error:
+        abort(500, description=str(error))
+
+    return jsonify(success=True, **summary), 200
+
+
+@app.route("/users/<int:user_id>/export.<file_format>")
+def export_movies(user_id: int, file_format: str):
+    """
+    Exports the movie list of a user as CSV or JSON Lines.
+
+    The list is streamed from the database cursor without materializing it.
+
+    Args:
+        user_id (int): The ID of the user whose movies are exported.
+        file_format (str): The export format, "csv" or "jsonl".
+
+    Returns:
+        Response: The streamed file download.
+    """
+    user = db.get_or_404(User, user_id, description="User not found!")
+    if file_format not in SUPPORTED_FORMATS:
+        abort(404, description="Unsupported export format.")
+
+    lines = write_movie_rows(data_manager.iter_user_movies(user.id), file_format)
+    mimetype = "text/csv" if file_format == "csv" else "application/x-ndjson"
+    return Response(stream_with_context(lines), mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename=movies-{user.id}.{file_format}"})
+
+
+@app.route("/api/movies/search")
+def search_movies():
+    """
+    Searches the local movie catalog by title, director and year.
+
+    Query parameters:
+        q (str): The search text, partially typed words are matched as prefixes.
+        limit (int): The maximal number of movies returned, at most SEARCH_MAX_LIMIT.
+        offset (int): The number of best matching movies to skip.
+
+    Returns:
+        Response: JSON response with the matching movies ordered by relevance and the offset of the next page.
+    """
+    query = request.args.get("q", "").strip()
+    limit = get_valid_number_or_none(request.args.get("limit", ""), int) or SEARCH_DEFAULT_LIMIT
+    limit = min(max(limit, 1), SEARCH_MAX_LIMIT)
+    offset = max(get_valid_number_or_none(request.args.get("offset", ""), int) or 0, 0)
+
+    movies = data_manager.search_movies(query, limit=limit, offset=offset)
+    next_offset = offset + limit if len(movies) == limit else None
+
+    return jsonify(
+        movies=[{
+            "id": movie.id,
+            "name": movie.name,
+            "director": movie.director,
+            "year": movie.year,
+            "rating": movie.rating,
+            "poster_url": movie.poster_url,
+        } for movie in movies],
+        next_offset=next_offset,
+    ), 200
+
+
+@app.route("/api/movies/<int:movie_id>/similar")
+def similar_movies(movie_id: int):
+    """
+    Lists the movies most often saved together with a movie ("users who saved this also saved").
+
+    Args:
+        movie_id (int): The ID of the movie.
+
+    Returns:
+        Response: JSON response with the similar movies, the most similar first.
+    """
+    if not app.config["RECOMMENDATIONS_ENABLED"]:
+        abort(404, description="Recommendations are disabled!")
+
+    movies = data_manager.get_similar_movies(movie_id, limit=app.config["SIMILAR_MOVIES_LIMIT"])
+    return jsonify(movies=[{
+        "id": movie.id,
+        "name": movie.name,
+        "director": movie.director,
+        "year": movie.year,
+        "rating": movie.rating,
+        "poster_url": movie.poster_url,
+    } for movie in movies]), 200
+
+
 @app.route("/users/<int:user_id>/update_movie/<int:movie_id>", methods=["GET", "POST"])
 def update_movie(user_id: int, movie_id: int):
     """
@@ -272,12 +672,105 @@ def update_movie(user_id: int, movie_id: int):
         except DatabaseError as error:
             abort(500, description=str(error))
 
+        if poster_cache and movie_poster_url:
+            poster_cache.warm(movie_poster_url)
+
         return redirect(url_for("user_movies", user_id=movie_user.id))
 
     return render_template("forms/update_movie.html", user_id=user_id, movie=updated_movie)
 
 
+@app.route("/metrics")
+def metrics():
+    """
+    Exposes the request, SQL, OMDb and template rendering histograms of this process
+    to the clients of METRICS_ALLOWED_NETWORKS and to requests with the METRICS_TOKEN bearer token.
+
+    Returns:
+        Response: The metrics in the Prometheus text exposition format.
+    """
+    if not instrumentation:
+        abort(404, description="Instrumentation is disabled.")
+    if not instrumentation.is_metrics_client():
+        abort(403, description="Metrics are not available to this client.")
+    return Response(instrumentation.render_metrics(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.route("/assets/<path:filename>")
+def asset(filename: str):
+    """
+    Serves a built static asset, precompressed (Brotli or gzip) when the client accepts it.
+
+    The file names contain the hash of their content, so the responses are cached as immutable.
+
+    Args:
+        filename (str): The fingerprinted path of the asset.
+
+    Returns:
+        Response: The asset.
+    """
+    return static_assets.send(filename, max_age=IMMUTABLE_MAX_AGE)
+
+
+@app.route("/users/<int:user_id>/avatar.svg")
+def user_avatar(user_id: int):
+    """
+    Serves the generated avatar of a user.
+
+    The avatar is derived from the user name only and the "v" query parameter
+    (the avatar key) changes with it, so the response is cached as immutable.
+
+    Args:
+        user_id (int): The ID of the user.
+
+    Returns:
+        Response: The SVG image.
+    """
+    user = User.query.get_or_404(user_id, description="User not found!")
+    response = send_file(avatar_cache.get_path(user.name), mimetype=AVATAR_MIMETYPE, max_age=IMMUTABLE_MAX_AGE,
+                         conditional=True, etag=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@app.route("/posters/<int:movie_id>/<int:width>")
+def poster(movie_id: int, width: int):
+    """
+    Serves a movie poster resized to the given width as WebP.
+
+    The original is fetched from its origin on the first request only, later requests are
+    served from the poster cache directory. The "v" query parameter (the movie version)
+    changes with the poster URL, so the responses are cached as immutable.
+    Posters which cannot be fetched are redirected to their origin.
+
+    Args:
+        movie_id (int): The ID of the movie.
+        width (int): One of POSTER_WIDTHS.
+
+    Returns:
+        Response: The WebP image, or a redirect to the original poster or to the placeholder image.
+    """
+    if not poster_cache or width not in poster_cache.widths:
+        abort(404, description="Poster not found!")
+
+    movie = Movie.query.get_or_404(movie_id, description="Movie not found!")
+    if not movie.poster_url:
+        return redirect(POSTER_PLACEHOLDER_URL)
+
+    try:
+        path = poster_cache.get(movie.poster_url, width)
+    except PosterUnavailableError:
+        return redirect(movie.poster_url)
+
+    response = send_file(path, mimetype=POSTER_MIMETYPE, max_age=IMMUTABLE_MAX_AGE, conditional=True, etag=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
 @app.route("/users/<int:user_id>/add_note/<int:movie_id>", methods=["POST"])
+@limiter.limit(limit_value=app.config["ADD_NOTE_RATE_LIMIT"])
 def add_note(user_id: int, movie_id: int):
     """
     Adds a note to a specific movie in the user's movie list.
@@ -286,16 +779,35 @@ def add_note(user_id: int, movie_id: int):
         user_id (int): The ID of the user who owns the movie list.
         movie_id (int): The ID of the movie to which the note will be added.
 
+    With NOTES_WRITE_BEHIND enabled the validated note of a movie in the user's list is accepted (202)
+    and saved by the background flusher within NOTES_FLUSH_INTERVAL_MS.
+
     Returns:
         Response: JSON response indicating success or failure.
     """
-    note = request.form.get("note").strip()
+    note = request.form.get("note", "").strip()
 
     if note == "":
         return jsonify(success=False, error="Note cannot be empty"), 400
+    if len(note) > NOTE_MAX_LENGTH:
+        return jsonify(success=False, error=f"Note cannot be longer than {NOTE_MAX_LENGTH} characters"), 400
+
+    if note_queue:
+        # the flusher skips notes of unassigned movies silently, so the pair is checked before accepting the note
+        if not data_manager.has_user_movie(user_id, movie_id):
+            return jsonify(success=False, error="Movie is not in users list"), 404
+        try:
+            # the write is recorded in this request, the flusher has no client to pin to the primary
+            data_manager.mark_user_movies_changed(user_id)
+        except DatabaseError as error:
+            abort(500, description=str(error))
+        note_queue.enqueue(user_id, movie_id, note)
+        return jsonify(success=True, note=note), 202
 
     try:
         data_manager.add_user_movie_note(user_id, movie_id, note)
+    except UserMovieNotFoundError:
+        return jsonify(success=False, error="Movie is not in users list"), 404
     except DatabaseError as error:
         abort(500, description=str(error))
 
@@ -323,10 +835,12 @@ def too_many_requests(error):
     Handles 429 errors (too many requests)
 
     Returns:
-        Response: The rendered 429 error page.
+        Response: The rendered 429 error page, or a JSON response for the notes requested by the page script.
     """
     error_title = f"429 Too Many Requests"
     error_message = f"You exceeded the limit for allowed operations. Please try again later."
+    if request.endpoint == "add_note":
+        return jsonify(success=False, error=error_message), 429
     return render_template('error.html', title=error_title, message=error_message), 429
 
 
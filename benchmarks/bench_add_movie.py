@@ -0,0 +1,50 @@
+"""
+Benchmarks the write throughput of adding movies to users.
+
+Compares the former four query, two commit write path of the add_movie route
+with the single transaction SQLiteDataManager.add_movie_for_user.
+
+Usage:
+    python -m benchmarks.bench_add_movie [number of adds]
+"""
+import sys
+import time
+
+from benchmarks.common import benchmark_app, movie_title
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, Movie, User
+
+DEFAULT_ADDS = 2_000
+USERS = 10
+
+
+def legacy_add(data_manager: SQLiteDataManager, user_id: int, movie: Movie):
+    user_movie_list = data_manager.get_user_movies(user_id)
+    this_user_movie = next((listed for listed in user_movie_list if listed.name == movie.name), None)
+    added_movie = data_manager.get_movie_by_title(movie.name)
+    if not added_movie:
+        data_manager.add_movie(movie)
+    else:
+        movie = added_movie
+    if not this_user_movie:
+        data_manager.add_movie_to_user(user_id, movie)
+
+
+def run(adds: int):
+    for label, add in [("legacy", legacy_add), ("add_movie_for_user", SQLiteDataManager.add_movie_for_user)]:
+        with benchmark_app():
+            data_manager = SQLiteDataManager(db)
+            db.session.add_all([User(id=user_id, name=f"User {user_id}") for user_id in range(1, USERS + 1)])
+            db.session.commit()
+
+            start = time.perf_counter()
+            for index in range(adds):
+                # every movie is added to two users, so half of the adds reuse an existing movie
+                add(data_manager, index % USERS + 1, Movie(name=movie_title(index // 2)))
+            elapsed = time.perf_counter() - start
+
+        print(f"{adds:>6} adds | {label:<18} | {adds / elapsed:9.1f} adds/s | {elapsed / adds * 1000:7.3f} ms/add")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ADDS)
@@ -0,0 +1,91 @@
+"""
+Benchmarks mixed read/write throughput of several worker processes sharing one SQLite file.
+
+Each process plays a gunicorn worker: it lists movies of random users and, for a share of
+the operations, adds a movie to a user. The SQLite defaults (rollback journal, no pragmas)
+are compared with the tuned pragmas of Config.SQLITE_PRAGMAS.
+
+Usage:
+    python -m benchmarks.bench_concurrency [number of processes] [seconds]
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.common import benchmark_app, movie_title, seed_movies
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, Movie, User, UserMovie
+from project.exceptions import DatabaseError
+
+DEFAULT_PROCESSES = 4
+DEFAULT_SECONDS = 5
+USERS = 100
+MOVIES = 20_000
+WRITE_RATIO = 0.2
+TUNED_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def seed(db_path: str, sqlite_pragmas: dict | None):
+    with benchmark_app(db_path, sqlite_pragmas):
+        seed_movies(MOVIES)
+        db.session.add_all([User(id=user_id, name=f"User {user_id}") for user_id in range(1, USERS + 1)])
+        db.session.add_all([UserMovie(user_id=index % USERS + 1, movie_id=index + 1) for index in range(MOVIES)])
+        db.session.commit()
+
+
+def worker(db_path: str, sqlite_pragmas: dict | None, worker_id: int, seconds: float, results):
+    rng = random.Random(worker_id)
+    reads = writes = errors = 0
+    with benchmark_app(db_path, sqlite_pragmas):
+        data_manager = SQLiteDataManager(db)
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            user_id = rng.randint(1, USERS)
+            try:
+                if rng.random() < WRITE_RATIO:
+                    movie = Movie(name=movie_title(MOVIES + worker_id * 10_000_000 + writes + errors))
+                    data_manager.add_movie_for_user(user_id, movie)
+                    writes += 1
+                else:
+                    data_manager.get_user_movies(user_id, limit=60)
+                    data_manager.get_all_users_count()
+                    reads += 1
+            except DatabaseError:
+                errors += 1
+            db.session.remove()
+    results.put((reads, writes, errors))
+
+
+def run(processes: int, seconds: float):
+    for label, sqlite_pragmas in [("defaults", None), ("tuned", TUNED_PRAGMAS)]:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "concurrency.db")
+            seed(db_path, sqlite_pragmas)
+
+            results = multiprocessing.Queue()
+            workers = [multiprocessing.Process(target=worker, args=(db_path, sqlite_pragmas, worker_id, seconds, results))
+                       for worker_id in range(processes)]
+            for process in workers:
+                process.start()
+            totals = [sum(counts) for counts in zip(*(results.get() for _ in workers))]
+            for process in workers:
+                process.join()
+
+        reads, writes, errors = totals
+        print(f"{processes} processes | {label:<8} | {reads / seconds:8.1f} reads/s | {writes / seconds:7.1f} writes/s"
+              f" | {errors:>5} failed writes")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PROCESSES,
+        float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SECONDS)
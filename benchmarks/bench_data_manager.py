@@ -0,0 +1,105 @@
+"""
+Microbenchmarks of the SQLiteDataManager methods on a synthetic dataset.
+
+Users, complete movies and Zipfian distributed movie lists are generated by seed_dataset,
+every method is called on random (seeded) users and movies, writes on fresh rows.
+
+Usage:
+    python -m benchmarks.bench_data_manager [--users N] [--movies M] [--list-size L] [--output results.json]
+"""
+import argparse
+import itertools
+import random
+
+from benchmarks.common import benchmark_app, measure, movie_title, seed_dataset, write_results
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, Movie, User
+
+SQLITE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+REPEAT = 200
+WRITE_BATCH_SIZE = 100
+
+
+def run(users: int, movies: int, list_size: int) -> dict:
+    with benchmark_app(sqlite_pragmas=SQLITE_PRAGMAS):
+        dataset = seed_dataset(users, movies, list_size)
+        data_manager = SQLiteDataManager(db, counters_ttl=0)
+        rng = random.Random(1)
+        new_ids = itertools.count(movies)
+
+        def user_id() -> int:
+            return rng.randint(1, users)
+
+        def movie_id() -> int:
+            return rng.randint(1, movies)
+
+        def new_movie() -> Movie:
+            return Movie(name=movie_title(next(new_ids)), director="Director", year=2000, rating=7.5)
+
+        def assigned_pairs(count: int) -> list[tuple[int, int]]:
+            owner = user_id()
+            return [(owner, card.id) for card in data_manager.get_user_movies(owner, limit=count)]
+
+        unassigned_movies = []
+        added_movies = []
+
+        def add_movie():
+            movie = new_movie()
+            data_manager.add_movie(movie)
+            unassigned_movies.append(movie.id)
+            added_movies.append(movie.id)
+
+        benchmarks = {
+            "get_users_version": lambda: data_manager.get_users_version(),
+            "get_user_movies_version": lambda: data_manager.get_user_movies_version(user_id()),
+            "get_all_users": lambda: data_manager.get_all_users(limit=60, after=rng.randint(0, users)),
+            "get_all_users_count": lambda: data_manager.get_all_users_count(),
+            "get_all_movies_count": lambda: data_manager.get_all_movies_count(),
+            "get_user_movies": lambda: data_manager.get_user_movies(user_id(), limit=60),
+            "iter_user_movies": lambda: list(data_manager.iter_user_movies(user_id())),
+            "get_movie_by_title": lambda: data_manager.get_movie_by_title(movie_title(movie_id() - 1)),
+            "search_movies": lambda: data_manager.search_movies(movie_title(movie_id() - 1).rsplit(" ", 1)[0]),
+            "get_incomplete_movies": lambda: data_manager.get_incomplete_movies(WRITE_BATCH_SIZE),
+            "iter_poster_urls": lambda: sum(1 for _ in itertools.islice(data_manager.iter_poster_urls(), 1000)),
+            "add_user": lambda: data_manager.add_user(User(name=f"New user {next(new_ids)}")),
+            "add_movie": add_movie,
+            "add_movie_to_user": lambda: data_manager.add_movie_to_user(user_id(),
+                                                                        Movie(id=unassigned_movies.pop())),
+            "add_movie_for_user": lambda: data_manager.add_movie_for_user(user_id(), new_movie()),
+            "import_user_movies": lambda: data_manager.import_user_movies(user_id(), [
+                {"name": movie_title(next(new_ids)), "year": 2000, "note": "Imported"}
+                for _ in range(WRITE_BATCH_SIZE)
+            ]),
+            "update_movie": lambda: data_manager.update_movie(Movie(
+                id=movie_id(), name=movie_title(next(new_ids)), director="Updated", year=2001, rating=8.0
+            )),
+            "update_movies_metadata": lambda: data_manager.update_movies_metadata([
+                {"id": movie_id(), "director": "Enriched", "year": 1999, "rating": 6.5, "poster_url": None}
+                for _ in range(WRITE_BATCH_SIZE)
+            ]),
+            "add_user_movie_note": lambda: data_manager.add_user_movie_note(*assigned_pairs(1)[0], "Note"),
+            "update_user_movie_notes": lambda: data_manager.update_user_movie_notes(
+                {pair: "Batched note" for pair in assigned_pairs(WRITE_BATCH_SIZE)}
+            ),
+        }
+        results = {name: measure(benchmark, repeat=REPEAT) for name, benchmark in benchmarks.items()}
+        # the added movies are deleted, half of them assigned to a user
+        results["delete_movie"] = measure(lambda: data_manager.delete_movie(added_movies.pop()), repeat=REPEAT)
+
+    for name, stats in results.items():
+        print(f"{name:<24} | mean {stats['mean_ms']:8.3f} ms | p50 {stats['p50_ms']:8.3f} ms "
+              f"| p95 {stats['p95_ms']:8.3f} ms")
+    return {"dataset": dataset, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the SQLiteDataManager methods.")
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--movies", type=int, default=20_000)
+    parser.add_argument("--list-size", type=int, default=50, help="Mean number of movies in a user's list.")
+    parser.add_argument("--output", help="Path of the JSON file the results are written to.")
+    args = parser.parse_args()
+
+    run_results = run(args.users, args.movies, args.list_size)
+    if args.output:
+        write_results(args.output, "data_manager", run_results["dataset"], run_results["results"])
@@ -0,0 +1,48 @@
+"""
+Benchmarks rendering of a movie list page body with and without the movie card fragment cache.
+
+The cache is warmed by a first render, as it would be by other users listing the same popular movies.
+
+Usage:
+    python -m benchmarks.bench_movie_cards [list sizes...]
+"""
+import os
+import sys
+
+from flask import render_template
+from sqlalchemy import insert
+
+from benchmarks.common import benchmark_app, measure, seed_movies
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, User, UserMovie
+from utils.cache import LRUCache
+from utils.fragment_cache import FragmentCacheExtension
+
+DEFAULT_SIZES = (60, 200, 1_000)
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+
+
+def run(size: int):
+    with benchmark_app() as app:
+        seed_movies(size)
+        db.session.add(User(id=1, name="Power user"))
+        db.session.execute(insert(UserMovie), [{"user_id": 1, "movie_id": movie_id, "user_note": "note"}
+                                               for movie_id in range(1, size + 1)])
+        db.session.commit()
+        user = db.session.get(User, 1)
+        movies = SQLiteDataManager(db).get_user_movies(1)
+
+        app.jinja_loader.searchpath = [TEMPLATES_DIR]
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        for label, cache in [("uncached", None), ("cached", LRUCache(max_size=size))]:
+            app.jinja_env.fragment_cache = cache
+            with app.test_request_context():
+                render = lambda: render_template("content/_movie_cards.html", movies=movies, user=user)
+                render()
+                result = measure(render, repeat=50)
+            print(f"{size:>6} movies | {label:<8} | mean {result['mean_ms']:8.2f} ms | p95 {result['p95_ms']:8.2f} ms")
+
+
+if __name__ == "__main__":
+    for list_size in [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES:
+        run(list_size)
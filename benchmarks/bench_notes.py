@@ -0,0 +1,56 @@
+"""
+Benchmarks note saving throughput of the synchronous save against the write-behind queue.
+
+Notes of random movies of a few users are saved, as when users edit notes in quick succession.
+The write-behind numbers include the final flush, so every accepted note is committed.
+
+Usage:
+    python -m benchmarks.bench_notes [number of saves]
+"""
+import random
+import sys
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import benchmark_app, seed_movies
+from data_manager.note_queue import NoteWriteBehindQueue
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, User, UserMovie
+
+DEFAULT_SAVES = 2_000
+USERS = 10
+MOVIES = 1_000
+SQLITE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+
+
+def run(saves: int):
+    rng = random.Random(0)
+    notes = [(rng.randint(1, USERS), rng.randint(1, MOVIES), f"note {index}") for index in range(saves)]
+
+    for label in ("synchronous", "write-behind"):
+        with benchmark_app(sqlite_pragmas=SQLITE_PRAGMAS) as app:
+            seed_movies(MOVIES)
+            db.session.add_all([User(id=user_id, name=f"User {user_id}") for user_id in range(1, USERS + 1)])
+            db.session.execute(insert(UserMovie), [{"user_id": user_id, "movie_id": movie_id}
+                                                   for user_id in range(1, USERS + 1)
+                                                   for movie_id in range(1, MOVIES + 1)])
+            db.session.commit()
+            data_manager = SQLiteDataManager(db)
+
+            start = time.perf_counter()
+            if label == "synchronous":
+                for user_id, movie_id, note in notes:
+                    data_manager.add_user_movie_note(user_id, movie_id, note)
+            else:
+                note_queue = NoteWriteBehindQueue(app, data_manager, flush_interval=0.2)
+                for user_id, movie_id, note in notes:
+                    note_queue.enqueue(user_id, movie_id, note)
+                note_queue.stop()
+            elapsed = time.perf_counter() - start
+
+        print(f"{saves:>6} saves | {label:<12} | {saves / elapsed:10.1f} saves/s | {elapsed / saves * 1000:7.3f} ms/save")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SAVES)
@@ -0,0 +1,68 @@
+"""
+Benchmarks loading a user's movie list as ORM instances against MovieCard read models.
+
+Compares the former get_user_movies, which hydrated identity-mapped Movie instances and attached
+the notes to them, with the current column selection into MovieCard instances.
+
+Usage:
+    python -m benchmarks.bench_read_models [list size]
+"""
+import sys
+import tracemalloc
+
+from sqlalchemy import insert
+
+from benchmarks.common import benchmark_app, measure, seed_movies
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, Movie, User, UserMovie
+
+DEFAULT_SIZE = 10_000
+
+
+def legacy_get_user_movies(user_id: int) -> list:
+    movies = db.session.execute(
+        db.select(Movie).add_columns(UserMovie.user_note)
+        .join(UserMovie)
+        .filter(UserMovie.user_id == user_id)
+        .order_by(UserMovie.movie_id)
+    ).all()
+    for movie, user_note in movies:
+        movie.user_note = user_note
+    return [movie for movie, _ in movies]
+
+
+def retained_memory(load) -> int:
+    """ Returns the memory in bytes retained by the loaded list (and the session tracking it). """
+    db.session.expunge_all()
+    tracemalloc.start()
+    movies = load()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del movies
+    db.session.expunge_all()
+    return retained
+
+
+def run(size: int):
+    with benchmark_app():
+        seed_movies(size)
+        db.session.add(User(id=1, name="Power user"))
+        db.session.execute(insert(UserMovie), [{"user_id": 1, "movie_id": movie_id, "user_note": "Worth watching"}
+                                               for movie_id in range(1, size + 1)])
+        db.session.commit()
+        data_manager = SQLiteDataManager(db)
+
+        for label, load in [("ORM Movie", lambda: legacy_get_user_movies(1)),
+                            ("MovieCard", lambda: data_manager.get_user_movies(1))]:
+            def load_and_release():
+                load()
+                db.session.expunge_all()
+
+            result = measure(load_and_release, repeat=10)
+            memory_per_row = retained_memory(load) / size
+            print(f"{size:>7} rows | {label:<9} | {result['mean_ms'] / size * 10_000:8.1f} ms per 10k rows"
+                  f" | {memory_per_row:7.0f} B per row")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE)
@@ -0,0 +1,67 @@
+"""
+Benchmarks the precomputation of the similar movies and their incremental refresh.
+
+The full rebuild (load, sparse matrix product, store) runs once on the seeded movie lists,
+about 1M interactions with the defaults, the incremental refresh is measured on random
+movies added to random users afterwards.
+
+Usage:
+    python -m benchmarks.bench_recommendations [--users N] [--movies M] [--list-size L] [--top-k K]
+        [--output results.json]
+"""
+import argparse
+import random
+
+from benchmarks.common import benchmark_app, measure, seed_dataset, write_results
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, UserMovie
+from project.recommendations import rebuild_similarities
+
+SQLITE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+REPEAT = 200
+
+
+def run(users: int, movies: int, list_size: int, top_k: int) -> dict:
+    with benchmark_app(sqlite_pragmas=SQLITE_PRAGMAS):
+        dataset = seed_dataset(users, movies, list_size)
+        data_manager = SQLiteDataManager(db, counters_ttl=0)
+        rng = random.Random(4)
+
+        rebuild = rebuild_similarities(data_manager, top_k)
+        print(f"rebuild of {rebuild['assignments']} assignments | load {rebuild['load_seconds']:6.2f} s "
+              f"| compute {rebuild['compute_seconds']:6.2f} s | store {rebuild['store_seconds']:6.2f} s "
+              f"| {rebuild['similarities']} similar movies")
+
+        def refresh():
+            user_id, movie_id = rng.randint(1, users), rng.randint(1, movies)
+            if not db.session.get(UserMovie, (user_id, movie_id)):
+                db.session.add(UserMovie(user_id=user_id, movie_id=movie_id))
+                db.session.commit()
+            data_manager.refresh_movie_similarities(user_id, movie_id, top_k)
+
+        refresh_stats = measure(refresh, repeat=REPEAT)
+        print(f"{'incremental refresh':<24} | mean {refresh_stats['mean_ms']:8.3f} ms "
+              f"| p50 {refresh_stats['p50_ms']:8.3f} ms | p95 {refresh_stats['p95_ms']:8.3f} ms")
+
+    # the rebuild phases run once, reported in the statistics format of measure for benchmarks.compare
+    results = {
+        f"rebuild_{phase}": dict.fromkeys(("mean_ms", "p50_ms", "p95_ms"), rebuild[f"{phase}_seconds"] * 1000)
+        for phase in ("load", "compute", "store")
+    }
+    results["incremental_refresh"] = refresh_stats
+    dataset["similar_movies"] = rebuild["similarities"]
+    return {"dataset": dataset, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the similar movies precomputation.")
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--movies", type=int, default=50_000)
+    parser.add_argument("--list-size", type=int, default=100, help="Mean number of movies in a user's list.")
+    parser.add_argument("--top-k", type=int, default=20, help="Similar movies kept per movie.")
+    parser.add_argument("--output", help="Path of the JSON file the results are written to.")
+    args = parser.parse_args()
+
+    run_results = run(args.users, args.movies, args.list_size, args.top_k)
+    if args.output:
+        write_results(args.output, "recommendations", run_results["dataset"], run_results["results"])
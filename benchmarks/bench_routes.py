@@ -0,0 +1,80 @@
+"""
+Macrobenchmarks of the application routes through the Flask test client.
+
+The application is configured with a temporary SQLite database seeded by seed_dataset
+and the OMDb API replaced by the local OmdbStubServer, so that only the application is measured.
+
+Usage:
+    python -m benchmarks.bench_routes [--users N] [--movies M] [--list-size L] [--output results.json]
+"""
+import argparse
+import random
+
+from benchmarks.common import measure, seeded_application, stub_omdb_movies, write_results
+
+REPEAT = 200
+
+
+def run(users: int, movies: int, list_size: int) -> dict:
+    stub_movies = stub_omdb_movies(REPEAT)
+
+    with seeded_application(users, movies, list_size, stub_movies) as (app_module, dataset):
+        app = app_module.app
+        app_module.limiter.enabled = False
+        client = app.test_client()
+        rng = random.Random(2)
+        titles = iter(stub_movies)
+        added = iter(range(REPEAT))
+
+        def user_id() -> int:
+            return rng.randint(1, users)
+
+        def user_movies_etag() -> tuple[int, str]:
+            owner = user_id()
+            return owner, client.get(f"/users/{owner}").headers["ETag"]
+
+        def check(response):
+            assert response.status_code < 400, response.status_code
+            return response
+
+        def conditional_user_movies():
+            owner, etag = cached_pages[rng.randrange(len(cached_pages))]
+            assert client.get(f"/users/{owner}", headers={"If-None-Match": etag}).status_code == 304
+
+        cached_pages = [user_movies_etag() for _ in range(20)]
+        benchmarks = {
+            "home": lambda: check(client.get("/")),
+            "list_users": lambda: check(client.get(f"/users?after={rng.randint(0, users)}")),
+            "user_movies": lambda: check(client.get(f"/users/{user_id()}")),
+            "user_movies_not_modified": conditional_user_movies,
+            "search_movies": lambda: check(client.get("/api/movies/search?q=ka")),
+            "add_movie_search": lambda: check(client.get(f"/users/{user_id()}/add_movie?title={next(titles)}")),
+            "add_movie": lambda: check(client.post(f"/users/{user_id()}/add_movie", data={
+                "name": f"Added Movie {next(added)}", "director": "Director", "year": "2002", "rating": "6.4",
+                "poster_url": "",
+            })),
+            "add_note": lambda: check(client.post(f"/users/1/add_note/{rng.choice(first_user_movies)}",
+                                                  data={"note": "Benchmark note"})),
+        }
+        with app.app_context():
+            first_user_movies = [card.id for card in app_module.data_manager.get_user_movies(1)]
+
+        results = {name: measure(benchmark, repeat=REPEAT) for name, benchmark in benchmarks.items()}
+
+    for name, stats in results.items():
+        print(f"{name:<24} | mean {stats['mean_ms']:8.3f} ms | p50 {stats['p50_ms']:8.3f} ms "
+              f"| p95 {stats['p95_ms']:8.3f} ms")
+    return {"dataset": dataset, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Macrobenchmarks of the application routes.")
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--movies", type=int, default=20_000)
+    parser.add_argument("--list-size", type=int, default=50, help="Mean number of movies in a user's list.")
+    parser.add_argument("--output", help="Path of the JSON file the results are written to.")
+    args = parser.parse_args()
+
+    run_results = run(args.users, args.movies, args.list_size)
+    if args.output:
+        write_results(args.output, "routes", run_results["dataset"], run_results["results"])
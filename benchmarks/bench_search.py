@@ -0,0 +1,38 @@
+"""
+Benchmarks the full-text movie search on catalogs of growing size.
+
+Usage:
+    python -m benchmarks.bench_search [catalog sizes...]
+"""
+import random
+import sys
+
+from benchmarks.common import benchmark_app, measure, movie_title, seed_movies
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def run(size: int):
+    with benchmark_app():
+        seed_movies(size)
+        data_manager = SQLiteDataManager(db)
+        rng = random.Random(size)
+
+        def words():
+            return movie_title(rng.randrange(size)).rsplit(" ", 1)[0]
+
+        results = {
+            "title_words": measure(lambda: data_manager.search_movies(words())),
+            "typed_prefix": measure(lambda: data_manager.search_movies(words()[:4])),
+            "second_page": measure(lambda: data_manager.search_movies(words()[:4], offset=10)),
+        }
+
+    for search, stats in results.items():
+        print(f"{size:>9} movies | {search:<12} | mean {stats['mean_ms']:8.3f} ms | p95 {stats['p95_ms']:8.3f} ms")
+
+
+if __name__ == "__main__":
+    for catalog_size in [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES:
+        run(catalog_size)
@@ -0,0 +1,53 @@
+"""
+Benchmarks peak memory of loading a user's movie list at once against iterating it in batches.
+
+Usage:
+    python -m benchmarks.bench_streaming [list sizes...]
+"""
+import sys
+import tracemalloc
+
+from sqlalchemy import insert
+
+from benchmarks.common import benchmark_app, seed_movies
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, User, UserMovie
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+def peak_memory(func) -> float:
+    """ Returns the peak memory allocated by the function in MiB. """
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def run(size: int):
+    with benchmark_app():
+        seed_movies(size)
+        db.session.add(User(id=1, name="Power user"))
+        db.session.execute(insert(UserMovie), [{"user_id": 1, "movie_id": movie_id} for movie_id in range(1, size + 1)])
+        db.session.commit()
+        data_manager = SQLiteDataManager(db)
+
+        def render_list():
+            movies = data_manager.get_user_movies(1)
+            sum(len(movie.name) for movie in movies)
+            db.session.expunge_all()
+
+        def render_stream():
+            sum(len(movie.name) for movie in data_manager.iter_user_movies(1))
+            db.session.expunge_all()
+
+        results = {"list": peak_memory(render_list), "stream": peak_memory(render_stream)}
+
+    for mode, peak in results.items():
+        print(f"{size:>7} movies | {mode:<6} | peak {peak:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    for list_size in [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES:
+        run(list_size)
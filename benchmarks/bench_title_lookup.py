@@ -0,0 +1,47 @@
+"""
+Benchmarks movie title lookups on catalogs of growing size.
+
+Compares the indexed exact/prefix lookup of SQLiteDataManager.get_movie_by_title
+with the substring fallback and the former leading-wildcard ILIKE scan.
+
+Usage:
+    python -m benchmarks.bench_title_lookup [catalog sizes...]
+"""
+import random
+import sys
+
+from benchmarks.common import benchmark_app, measure, movie_title, seed_movies
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, Movie
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+
+def run(size: int):
+    with benchmark_app():
+        seed_movies(size)
+        data_manager = SQLiteDataManager(db)
+        rng = random.Random(size)
+
+        def title():
+            return movie_title(rng.randrange(size))
+
+        def legacy_ilike():
+            db.session.execute(
+                db.select(Movie).filter(Movie.name.ilike(f"%{title()}%"))
+            ).scalars().first()
+
+        results = {
+            "exact": measure(lambda: data_manager.get_movie_by_title(title())),
+            "prefix": measure(lambda: data_manager.get_movie_by_title(title()[:-2])),
+            "substring": measure(lambda: data_manager.get_movie_by_title(title()[3:], allow_substring=True), 10),
+            "legacy_ilike": measure(legacy_ilike, 10),
+        }
+
+    for lookup, stats in results.items():
+        print(f"{size:>9} movies | {lookup:<12} | mean {stats['mean_ms']:8.3f} ms | p95 {stats['p95_ms']:8.3f} ms")
+
+
+if __name__ == "__main__":
+    for catalog_size in [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES:
+        run(catalog_size)
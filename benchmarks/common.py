@@ -0,0 +1,281 @@
+import importlib
+import itertools
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable
+
+from flask import Flask
+from sqlalchemy import insert
+
+from omdb.stub_server import OmdbStubServer
+from project.data_models import db, Movie, User, UserMovie, set_sqlite_pragmas
+from utils.text import normalize_title
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ro", "sa", "ti", "vu", "ze", "dor", "han", "lin", "mar", "pet", "qui", "wes"]
+VOCABULARY = [a.capitalize() + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES]
+SEED_BATCH_SIZE = 50_000
+
+
+def movie_title(index: int) -> str:
+    """
+    Generates a deterministic, unique synthetic movie title.
+
+    Words are drawn from a generated vocabulary with a skewed (log-uniform) distribution,
+    so that some words are common and most are rare, like in real titles.
+
+    Args:
+        index (int): The index of the movie.
+
+    Returns:
+        str: The movie title.
+    """
+    rng = random.Random(index)
+    words = [VOCABULARY[int(len(VOCABULARY) ** rng.random()) - 1] for _ in range(rng.randint(1, 3))]
+    return f"{' '.join(words)} {index}"
+
+
+def seed_movies(count: int, complete: bool = False):
+    """
+    Inserts movies with synthetic titles in batched statements.
+
+    Args:
+        count (int): The number of movies to insert.
+        complete (bool): Whether the director, rating and poster URL are filled, only the year otherwise.
+    """
+    for start in range(0, count, SEED_BATCH_SIZE):
+        rows = []
+        for index in range(start, min(start + SEED_BATCH_SIZE, count)):
+            name = movie_title(index)
+            row = {"name": name, "name_normalized": normalize_title(name), "year": 1900 + index % 125}
+            if complete:
+                row.update(director=f"Director {index % 5000}", rating=round(1 + index % 90 / 10, 1),
+                           poster_url=f"https://posters.example.com/{index}.jpg")
+            rows.append(row)
+        db.session.execute(insert(Movie), rows)
+        db.session.commit()
+
+
+def zipf_sampler(count: int, exponent: float, rng: random.Random) -> Callable[[int], list[int]]:
+    """
+    Creates a sampler of indices with Zipfian popularity, the index of rank k is drawn with weight 1 / k ** exponent.
+
+    The ranks are assigned to randomly shuffled indices, so that popular items are spread over the whole range.
+
+    Args:
+        count (int): The number of indices (0 to count - 1).
+        exponent (float): The Zipf exponent, higher values concentrate the draws on fewer indices.
+        rng (random.Random): The random generator, seeded for reproducible samples.
+
+    Returns:
+        Callable[[int], list[int]]: Draws the given number of indices (with repetition).
+    """
+    cum_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+    indices = list(range(count))
+    rng.shuffle(indices)
+    return lambda k: [indices[rank] for rank in rng.choices(range(count), cum_weights=cum_weights, k=k)]
+
+
+def seed_dataset(users: int, movies: int, mean_list_size: int, exponent: float = 1.1, note_ratio: float = 0.1,
+                 seed: int = 0) -> dict:
+    """
+    Inserts a deterministic synthetic dataset of users, movies and their movie lists.
+
+    Movies are complete (director, rating and poster URL). List sizes are exponentially distributed
+    around mean_list_size and the movies of the lists are drawn with Zipfian popularity, so that
+    a few movies appear in many lists and most in few, a part of the list entries has a note.
+
+    Args:
+        users (int): The number of users.
+        movies (int): The number of movies.
+        mean_list_size (int): The mean number of movies in a user's list.
+        exponent (float): The Zipf exponent of the movie popularity.
+        note_ratio (float): The share of the list entries with a note.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        dict: The numbers of inserted users, movies and user movies.
+    """
+    seed_movies(movies, complete=True)
+    rng = random.Random(seed)
+    draw_movies = zipf_sampler(movies, exponent, rng)
+
+    db.session.execute(insert(User), [{"name": f"User {user_id}"} for user_id in range(1, users + 1)])
+    user_movies = 0
+    rows = []
+    for user_id in range(1, users + 1):
+        list_size = min(max(1, round(rng.expovariate(1 / mean_list_size))), movies)
+        movie_ids = set()
+        # popular movies repeat, so draw more until the list is full (limited for lists close to the catalog size)
+        for _ in range(10):
+            movie_ids.update(index + 1 for index in draw_movies(list_size - len(movie_ids)))
+            if len(movie_ids) >= list_size:
+                break
+
+        for movie_id in sorted(movie_ids):
+            note = f"Note of user {user_id}" if rng.random() < note_ratio else None
+            rows.append({"user_id": user_id, "movie_id": movie_id, "user_note": note})
+        if len(rows) >= SEED_BATCH_SIZE:
+            db.session.execute(insert(UserMovie), rows)
+            user_movies += len(rows)
+            rows = []
+
+    if rows:
+        db.session.execute(insert(UserMovie), rows)
+        user_movies += len(rows)
+    db.session.commit()
+    return {"users": users, "movies": movies, "user_movies": user_movies}
+
+
+def write_results(path: str, benchmark: str, parameters: dict, results: dict):
+    """
+    Writes benchmark results as JSON, together with the commit they were measured on.
+
+    The files are compared by "python -m benchmarks.compare".
+
+    Args:
+        path (str): The path of the JSON file.
+        benchmark (str): The name of the benchmark.
+        parameters (dict): The parameters of the run, e.g. the dataset size.
+        results (dict): The measured statistics keyed by the name of the measured operation.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({
+            "benchmark": benchmark,
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "parameters": parameters,
+            "results": results,
+        }, file, indent=2)
+
+
+@contextmanager
+def benchmark_app(db_path: str | None = None, sqlite_pragmas: dict | None = None):
+    """
+    Creates a minimal Flask application bound to a SQLite file with all tables created.
+
+    Args:
+        db_path (str | None): The path of the database file, a temporary file is used when not provided.
+        sqlite_pragmas (dict | None): The pragmas set on every connection, SQLite defaults when not provided.
+
+    Yields:
+        Flask: The application with an active application context.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        app = Flask(__name__)
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path or os.path.join(temp_dir, 'benchmark.db')}"
+        db.init_app(app)
+        with app.app_context():
+            set_sqlite_pragmas(db.engine, sqlite_pragmas)
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.engine.dispose()
+
+
+@contextmanager
+def seeded_application(users: int, movies: int, list_size: int, omdb_movies: dict | None = None):
+    """
+    Imports the application configured with a temporary SQLite database seeded by seed_dataset
+    and a fresh rate limit storage file.
+
+    The OMDb API is replaced by the local OmdbStubServer (with its response cache disabled),
+    so that only the application is measured.
+
+    Args:
+        users (int): The number of users.
+        movies (int): The number of movies.
+        list_size (int): The mean number of movies in a user's list.
+        omdb_movies (dict | None): The OMDb response objects served by the stub keyed by the movie title.
+
+    Yields:
+        tuple[module, dict]: The imported app module and the numbers of seeded users, movies and user movies.
+    """
+    with tempfile.TemporaryDirectory() as temp_dir, OmdbStubServer(omdb_movies) as omdb_stub:
+        os.environ.update({
+            "FLASK_SECRET_KEY": os.getenv("FLASK_SECRET_KEY", "benchmark"),
+            "API_KEY": os.getenv("API_KEY", "benchmark"),
+            "DATABASE_URL": f"sqlite:///{os.path.join(temp_dir, 'benchmark.db')}",
+            "RATELIMIT_STORAGE_URI": f"sqlite:///{os.path.join(temp_dir, 'rate_limits.db')}",
+            "OMDB_BASE_URL": omdb_stub.url,
+            "OMDB_CACHE_ENABLED": "false",
+        })
+        # imported after the environment is set, the configuration is read on import
+        app_module = importlib.import_module("app")
+
+        with app_module.app.app_context():
+            app_module.db.create_all()
+            dataset = seed_dataset(users, movies, list_size)
+
+        yield app_module, dataset
+
+        if app_module.note_queue:
+            app_module.note_queue.stop()
+        with app_module.app.app_context():
+            app_module.db.engine.dispose()
+
+
+def stub_omdb_movies(count: int) -> dict:
+    """
+    Generates OMDb response objects of movies titled "Stub Movie <index>" for the OmdbStubServer.
+
+    Args:
+        count (int): The number of movies.
+
+    Returns:
+        dict: The response objects keyed by the movie title.
+    """
+    return {f"Stub Movie {index}": {"Title": f"Stub Movie {index}", "Director": "Stub Director", "Year": "2001",
+                                    "imdbRating": "7.1", "Poster": "N/A"}
+            for index in range(count)}
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """
+    Returns the nearest-rank percentile of sorted values.
+
+    Args:
+        sorted_values (list[float]): The values in ascending order, not empty.
+        percent (float): The percentile (0-100).
+
+    Returns:
+        float: The value below which the given percentage of the values falls.
+    """
+    return sorted_values[max(0, min(len(sorted_values) - 1, round(len(sorted_values) * percent / 100) - 1))]
+
+
+def measure(func: Callable, repeat: int = 100) -> dict:
+    """
+    Calls the function repeatedly and summarizes the call durations.
+
+    Args:
+        func (Callable): The function to measure.
+        repeat (int): The number of calls.
+
+    Returns:
+        dict: The mean, median and 95th percentile call duration in milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    durations.sort()
+    return {
+        "mean_ms": statistics.fmean(durations),
+        "p50_ms": durations[len(durations) // 2],
+        "p95_ms": durations[int(len(durations) * 0.95) - 1],
+    }
@@ -0,0 +1,57 @@
+"""
+Compares two benchmark result files written with --output, e.g. of two commits.
+
+Operations whose median (p50) got slower by more than the threshold are reported
+as regressions and make the command exit with status 1.
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json [--threshold 10]
+"""
+import argparse
+import json
+import sys
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """
+    Prints the change of the median durations of the operations measured in both runs.
+
+    Args:
+        baseline (dict): The baseline result file content.
+        current (dict): The current result file content.
+        threshold (float): The slowdown (in percent) reported as a regression.
+
+    Returns:
+        list[str]: The names of the regressed operations.
+    """
+    print(f"{baseline['benchmark']}: {baseline.get('commit')} -> {current.get('commit')}")
+    regressions = []
+    for name, stats in current["results"].items():
+        baseline_stats = baseline["results"].get(name)
+        if not baseline_stats:
+            print(f"{name:<24} | {'':>10}    {stats['p50_ms']:9.3f} ms | new")
+            continue
+
+        change = (stats["p50_ms"] - baseline_stats["p50_ms"]) / baseline_stats["p50_ms"] * 100
+        is_regression = change > threshold
+        if is_regression:
+            regressions.append(name)
+        print(f"{name:<24} | {baseline_stats['p50_ms']:9.3f} -> {stats['p50_ms']:9.3f} ms | {change:+7.1f} %"
+              f"{' REGRESSION' if is_regression else ''}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10, help="Slowdown in percent reported as a regression.")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as baseline_file, open(args.current, encoding="utf-8") as current_file:
+        baseline_results, current_results = json.load(baseline_file), json.load(current_file)
+    if baseline_results["parameters"] != current_results["parameters"]:
+        print(f"Warning: the runs used different parameters: {baseline_results['parameters']} "
+              f"and {current_results['parameters']}")
+
+    sys.exit(1 if compare(baseline_results, current_results, args.threshold) else 0)
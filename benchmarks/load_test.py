@@ -0,0 +1,228 @@
+"""
+Load test replaying a JSON Lines workload against the application over HTTP.
+
+Every line of the workload is one request: {"name": ..., "method": ..., "path": ..., "data": {...}},
+the lines are replayed in order and repeated until the number of requests is reached.
+"{user_id}" and "{movie_id}" in the path and form data are replaced by random IDs of the dataset,
+"{sequence}" by the number of the request (for unique names).
+
+Without --url the application is started in-process on a local port with a seeded temporary
+database and the OMDb stub, the rate limits stay enabled, so 429 responses are reported.
+With --rate requests arrive at a fixed rate (open loop) and the latency includes the time
+a request waited for a free worker, without it every worker sends its next request immediately.
+
+Usage:
+    python -m benchmarks.load_test [--workload benchmarks/workloads/browse.jsonl] [--url http://host:port]
+        [--concurrency 8] [--rate 200] [--requests 2000] [--users N] [--movies M] [--output results.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from werkzeug.serving import make_server
+
+from benchmarks.common import percentile, seeded_application, stub_omdb_movies, write_results
+
+DEFAULT_WORKLOAD = os.path.join(os.path.dirname(__file__), "workloads", "browse.jsonl")
+STUB_MOVIES = 1_000
+
+
+def read_workload(path: str) -> list[dict]:
+    """
+    Reads the requests of a JSON Lines workload, blank lines are skipped.
+
+    Args:
+        path (str): The path of the workload file.
+
+    Returns:
+        list[dict]: The requests with their name, method, path and optional form data.
+
+    Raises:
+        ValueError: If a line is not a request with a method and path.
+    """
+    with open(path, encoding="utf-8") as file:
+        workload = [json.loads(line) for line in file if line.strip()]
+
+    for line_number, entry in enumerate(workload, start=1):
+        if not isinstance(entry, dict) or not {"method", "path"} <= entry.keys():
+            raise ValueError(f"Line {line_number} of {path} is not a request with a method and path.")
+        entry.setdefault("name", f"{entry['method']} {entry['path']}")
+    return workload
+
+
+def render_request(entry: dict, sequence: int, rng: random.Random, users: int, movies: int) -> tuple[str, dict]:
+    """
+    Fills the placeholders of a workload request.
+
+    Args:
+        entry (dict): The workload request.
+        sequence (int): The number of the request.
+        rng (random.Random): The random generator of the IDs.
+        users (int): The number of users of the dataset.
+        movies (int): The number of movies of the dataset.
+
+    Returns:
+        tuple[str, dict]: The path and the form data.
+    """
+    values = {"user_id": rng.randint(1, users), "movie_id": rng.randint(1, movies), "sequence": sequence}
+    data = {key: str(value).format(**values) for key, value in entry.get("data", {}).items()}
+    return entry["path"].format(**values), data
+
+
+@contextmanager
+def local_server(users: int, movies: int, list_size: int):
+    """
+    Serves the seeded application from a threaded WSGI server on a free local port.
+
+    Yields:
+        tuple[str, dict]: The base URL of the server and the numbers of seeded users, movies and user movies.
+    """
+    with seeded_application(users, movies, list_size, stub_omdb_movies(STUB_MOVIES)) as (app_module, dataset):
+        server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://127.0.0.1:{server.server_port}", dataset
+        finally:
+            server.shutdown()
+
+
+def run(base_url: str, workload: list[dict], total: int, concurrency: int, rate: float | None, users: int,
+        movies: int) -> dict:
+    """
+    Replays the workload and summarizes the responses per request name.
+
+    Args:
+        base_url (str): The base URL of the application.
+        workload (list[dict]): The workload requests.
+        total (int): The number of requests sent.
+        concurrency (int): The number of concurrent workers (connections).
+        rate (float | None): The arrival rate in requests per second, None for a closed loop.
+        users (int): The number of users of the dataset.
+        movies (int): The number of movies of the dataset.
+
+    Returns:
+        dict: The throughput, latency percentiles, error and 429 rates per request name and in total.
+    """
+    rng = random.Random(3)
+    scheduled = queue.Queue(maxsize=concurrency * 4 if rate is None else 0)
+    samples = defaultdict(list)
+    samples_lock = threading.Lock()
+    local = threading.local()
+
+    def get_session() -> requests.Session:
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+            local.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return local.session
+
+    def worker():
+        while (item := scheduled.get()) is not None:
+            entry, path, data, scheduled_at = item
+            # open loop latency counts from the arrival time, closed loop from the dequeue
+            started_at = scheduled_at or time.perf_counter()
+            try:
+                response = get_session().request(entry["method"], base_url + path, data=data or None,
+                                                 allow_redirects=False, timeout=30)
+                status = response.status_code
+            except requests.exceptions.RequestException:
+                status = None
+            elapsed = time.perf_counter() - started_at
+            with samples_lock:
+                samples[entry["name"]].append((elapsed, status))
+
+    workers = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for thread in workers:
+        thread.start()
+
+    started_at = time.perf_counter()
+    for sequence, entry in zip(range(total), itertools.cycle(workload)):
+        path, data = render_request(entry, sequence, rng, users, movies)
+        arrival = None
+        if rate:
+            arrival = started_at + sequence / rate
+            time.sleep(max(0.0, arrival - time.perf_counter()))
+        scheduled.put((entry, path, data, arrival))
+    for _ in workers:
+        scheduled.put(None)
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started_at
+
+    results = {name: summarize(name_samples, elapsed) for name, name_samples in sorted(samples.items())}
+    results["total"] = summarize([sample for name_samples in samples.values() for sample in name_samples], elapsed)
+    return results
+
+
+def summarize(samples: list[tuple[float, int | None]], elapsed: float) -> dict:
+    """
+    Summarizes the latencies and statuses of the responses.
+
+    Args:
+        samples (list[tuple[float, int | None]]): The latency (seconds) and status of each request,
+            None status for failed connections.
+        elapsed (float): The duration of the whole run in seconds.
+
+    Returns:
+        dict: The request count, throughput, p50/p95/p99 latency in milliseconds,
+        the share of errors (5xx and failed connections) and of 429 responses.
+    """
+    latencies = sorted(latency * 1000 for latency, _ in samples)
+    statuses = [status for _, status in samples]
+    return {
+        "requests": len(samples),
+        "throughput_rps": len(samples) / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "error_rate": sum(status is None or status >= 500 for status in statuses) / len(samples),
+        "rate_limited_rate": statuses.count(429) / len(samples),
+    }
+
+
+def print_results(results: dict):
+    print(f"{'request':<20} | {'count':>6} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8} "
+          f"| {'errors':>7} | {'429':>7}")
+    for name, stats in results.items():
+        print(f"{name:<20} | {stats['requests']:>6} | {stats['throughput_rps']:8.1f} | {stats['p50_ms']:8.2f} "
+              f"| {stats['p95_ms']:8.2f} | {stats['p99_ms']:8.2f} | {stats['error_rate']:7.2%} "
+              f"| {stats['rate_limited_rate']:7.2%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replays a JSON Lines workload against the application.")
+    parser.add_argument("--workload", default=DEFAULT_WORKLOAD, help="Path of the JSON Lines workload.")
+    parser.add_argument("--url", help="Base URL of a running application, started in-process when not provided.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent connections.")
+    parser.add_argument("--rate", type=float, help="Arrival rate in requests per second, as fast as possible if unset.")
+    parser.add_argument("--requests", type=int, default=2_000, help="Number of requests sent.")
+    parser.add_argument("--users", type=int, default=1_000, help="Users of the (seeded) dataset.")
+    parser.add_argument("--movies", type=int, default=20_000, help="Movies of the (seeded) dataset.")
+    parser.add_argument("--list-size", type=int, default=50, help="Mean movie list size of the seeded dataset.")
+    parser.add_argument("--output", help="Path of the JSON file the results are written to.")
+    args = parser.parse_args()
+
+    requests_workload = read_workload(args.workload)
+    parameters = {"workload": os.path.basename(args.workload), "concurrency": args.concurrency, "rate": args.rate,
+                  "requests": args.requests}
+    if args.url:
+        load_results = run(args.url.rstrip("/"), requests_workload, args.requests, args.concurrency, args.rate,
+                           args.users, args.movies)
+    else:
+        with local_server(args.users, args.movies, args.list_size) as (server_url, seeded):
+            parameters["dataset"] = seeded
+            load_results = run(server_url, requests_workload, args.requests, args.concurrency, args.rate,
+                               args.users, args.movies)
+
+    print_results(load_results)
+    if args.output:
+        write_results(args.output, "load_test", parameters, load_results)
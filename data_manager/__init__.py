@@ -0,0 +1,32 @@
+from data_manager.data_manager_interface import DataManagerInterface
+from data_manager.postgresql_data_manager import PostgreSQLDataManager
+from data_manager.read_replicas import ReadReplicaRouter
+from data_manager.sqlalchemy_data_manager import SQLAlchemyDataManager
+from data_manager.sqlite_data_manager import SQLiteDataManager
+
+DATA_MANAGERS = {
+    "sqlite": SQLiteDataManager,
+    "postgresql": PostgreSQLDataManager,
+}
+
+
+def create_data_manager(db, config, read_router: ReadReplicaRouter | None = None) -> DataManagerInterface:
+    """
+    Creates the data manager of the backend selected by the application configuration.
+
+    Args:
+        db: SQLAlchemy database instance used to execute queries.
+        config: The application configuration mapping.
+        read_router (ReadReplicaRouter | None): Routes read-only queries to read replicas.
+
+    Returns:
+        DataManagerInterface: The data manager of the DATA_MANAGER_BACKEND.
+
+    Raises:
+        ValueError: If the configured backend is not supported.
+    """
+    backend = config["DATA_MANAGER_BACKEND"]
+    if backend not in DATA_MANAGERS:
+        raise ValueError(f"Unsupported data manager backend: {backend}. Use one of: {', '.join(DATA_MANAGERS)}.")
+
+    return DATA_MANAGERS[backend](db, counters_ttl=config["COUNTERS_CACHE_TTL"], read_router=read_router)
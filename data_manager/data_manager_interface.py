@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Callable, Iterable, Iterator, List
 
 from project.data_models import User, Movie
+from project.read_models import MovieCard
 
 
 class DataManagerInterface(ABC):
@@ -10,14 +11,21 @@ class DataManagerInterface(ABC):
     Concrete implementations must provide methods for accessing and modifying user
     and movie data in various storage formats.
     """
+    # called with the user ID and the movie ID of every new assignment after it is stored, e.g. to refresh
+    # the similar movies of the movie
+    on_movie_assigned: Callable[[int, int], None] | None = None
 
     @abstractmethod
-    def get_all_users(self) -> List[User]:
+    def get_all_users(self, limit: int | None = None, after: int | None = None) -> List[User]:
         """
-        Retrieves all users.
+        Retrieves all users ordered by their ID, optionally one page at a time.
+
+        Args:
+            limit (int | None): The maximal number of users returned, None for all users.
+            after (int | None): The ID of the last user of the previous page (keyset cursor).
 
         Returns:
-            List[User]: A list of all user objects.
+            List[User]: A list of user objects.
         """
         pass
 
@@ -42,15 +50,56 @@ class DataManagerInterface(ABC):
         pass
 
     @abstractmethod
-    def get_user_movies(self, user_id) -> List[Movie]:
+    def get_users_version(self) -> int:
+        """
+        Retrieves the version stamp of the users list, it changes whenever a user is added.
+
+        Returns:
+            int: The version stamp (milliseconds since the epoch of the last change), 0 before the first user.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_movies_version(self, user_id: int) -> int | None:
+        """
+        Retrieves the version stamp of a user's movie list, it changes whenever a movie of the list,
+        its assignment or note changes.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            int | None: The version stamp (milliseconds since the epoch of the last change), None if the user is not found.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_movies(self, user_id, limit: int | None = None, after: int | None = None) -> List[MovieCard]:
+        """
+        Retrieves all movies associated with a specific user ordered by movie ID, optionally one page at a time.
+
+        Args:
+            user_id (int): The ID of the user whose movies are to be retrieved.
+            limit (int | None): The maximal number of movies returned, None for all movies.
+            after (int | None): The ID of the last movie of the previous page (keyset cursor).
+
+        Returns:
+            List[MovieCard]: A list of movies assignd to the user with the user's notes.
+        """
+        pass
+
+    @abstractmethod
+    def iter_user_movies(self, user_id: int, batch_size: int = 500) -> Iterator[MovieCard]:
         """
-        Retrieves all movies associated with a specific user.
+        Iterates over all movies associated with a specific user ordered by movie ID,
+        without loading the whole list into memory.
 
         Args:
             user_id (int): The ID of the user whose movies are to be retrieved.
+            batch_size (int): The number of movies fetched from the storage at once.
 
         Returns:
-            List[Movie]: A list of movies assignd to the user.
+            Iterator[MovieCard]: An iterator over the movies assigned to the user with the user's notes.
         """
         pass
 
@@ -85,6 +134,37 @@ class DataManagerInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def add_movie_for_user(self, user_id: int, movie: Movie) -> bool:
+        """
+        Adds a movie (unless a movie with the same name exists) and assigns it to a user in one transaction.
+
+        Args:
+            user_id (int): The ID of the user.
+            movie (Movie): The movie object to be added and assigned, its ID is set to the stored movie ID.
+
+        Returns:
+            bool: True if the movie was assigned to the user, False if the user already had it assigned.
+        """
+        pass
+
+    @abstractmethod
+    def import_user_movies(self, user_id: int, rows: Iterable[dict], chunk_size: int = 1000,
+                           on_progress: Callable[[int], None] | None = None) -> dict:
+        """
+        Adds movies from an imported list and assigns them to a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            rows (Iterable[dict]): Movie fields (name, director, year, rating, poster_url, note).
+            chunk_size (int): The number of rows stored in one transaction.
+            on_progress (Callable[[int], None] | None): Called with the number of processed rows after each chunk.
+
+        Returns:
+            dict: The number of processed rows, added movies and movies newly assigned to the user.
+        """
+        pass
+
     @abstractmethod
     def update_movie(self, movie: Movie):
         """
@@ -96,6 +176,48 @@ class DataManagerInterface(ABC):
 
     pass
 
+    @abstractmethod
+    def get_incomplete_movies(self, limit: int, after: int | None = None,
+                              attempted_before: int | None = None) -> List[Movie]:
+        """
+        Retrieves movies missing any of the director, year, rating or poster URL, ordered by their ID.
+
+        Args:
+            limit (int): The maximal number of movies returned.
+            after (int | None): The ID of the last movie of the previous page (keyset cursor).
+            attempted_before (int | None): Leaves out movies whose details were looked up at or after
+                this version stamp, None for all incomplete movies.
+
+        Returns:
+            List[Movie]: A list of incomplete movies.
+        """
+        pass
+
+    @abstractmethod
+    def iter_poster_urls(self, batch_size: int = 500) -> Iterator[str]:
+        """
+        Iterates over the distinct poster URLs of all stored movies.
+
+        Args:
+            batch_size (int): The number of URLs fetched from the storage at once.
+
+        Returns:
+            Iterator[str]: An iterator over the poster URLs.
+        """
+        pass
+
+    @abstractmethod
+    def update_movies_metadata(self, updates: List[dict], attempted_movie_ids: Iterable[int] = ()):
+        """
+        Fills missing details of several movies at once, existing values are kept.
+        The updated and attempted movies are stamped as looked up.
+
+        Args:
+            updates (List[dict]): The movie "id" with the fetched director, year, rating and poster_url.
+            attempted_movie_ids (Iterable[int]): The IDs of further movies looked up without details to fill.
+        """
+        pass
+
     @abstractmethod
     def delete_movie(self, movie_id: int):
         """
@@ -107,18 +229,37 @@ class DataManagerInterface(ABC):
         pass
 
     @abstractmethod
-    def get_movie_by_title(self, title: str) -> Movie | None:
+    def get_movie_by_title(self, title: str, allow_substring: bool = False) -> Movie | None:
         """
         Retrieves a movie by its title.
 
+        Exact matches of the normalized title are preferred over prefix matches,
+        substring matches are used only when explicitly allowed.
+
         Args:
             title (str): The title of the movie to be retrieved.
+            allow_substring (bool): Whether to fall back to a substring match.
 
         Returns:
             Movie | None: The movie object if found, otherwise None.
         """
         pass
 
+    @abstractmethod
+    def search_movies(self, query: str, limit: int = 10, offset: int = 0) -> List[Movie]:
+        """
+        Searches movies by their title, director and year.
+
+        Args:
+            query (str): The search text, partially typed words are matched as prefixes.
+            limit (int): The maximal number of movies returned.
+            offset (int): The number of best matching movies to skip.
+
+        Returns:
+            List[Movie]: Matching movies ordered by relevance.
+        """
+        pass
+
     @abstractmethod
     def add_user_movie_note(self, user_id: int, movie_id: int, user_note: str):
         """
@@ -128,5 +269,114 @@ class DataManagerInterface(ABC):
             user_id (int): The ID of the user.
             movie_id (int): The ID of the movie.
             user_note (str): The note to be added for the movie by the user.
+
+        Raises:
+            UserMovieNotFoundError: If the movie is not assigned to the user.
+        """
+        pass
+
+    @abstractmethod
+    def has_user_movie(self, user_id: int, movie_id: int) -> bool:
+        """
+        Checks whether a movie is assigned to a user.
+
+        Args:
+            user_id (int): The ID of the user.
+            movie_id (int): The ID of the movie.
+
+        Returns:
+            bool: True if the movie is in the user's list.
+        """
+        pass
+
+    @abstractmethod
+    def mark_user_movies_changed(self, user_id: int):
+        """
+        Stamps a new version on a user's movie list changed by a write saved later, e.g. a queued note.
+
+        Args:
+            user_id (int): The ID of the user.
+        """
+        pass
+
+    @abstractmethod
+    def update_user_movie_notes(self, notes: dict[tuple[int, int], str]) -> int:
+        """
+        Saves notes of several user and movie pairs at once.
+
+        Args:
+            notes (dict[tuple[int, int], str]): The notes keyed by (user ID, movie ID).
+
+        Returns:
+            int: The number of saved notes, pairs of movies not assigned to the user are skipped.
+        """
+        pass
+
+    @abstractmethod
+    def iter_user_movie_pairs(self, batch_size: int = 10_000) -> Iterator[tuple[int, int]]:
+        """
+        Iterates over all assignments of movies to users.
+
+        Args:
+            batch_size (int): The number of pairs fetched from the storage at once.
+
+        Returns:
+            Iterator[tuple[int, int]]: An iterator over the (user ID, movie ID) pairs.
+        """
+        pass
+
+    @abstractmethod
+    def replace_movie_similarities(self, similarities: Iterable[tuple[int, int, float]],
+                                   chunk_size: int = 10_000) -> int:
+        """
+        Replaces all stored similar movies in one transaction.
+
+        Args:
+            similarities (Iterable[tuple[int, int, float]]): The (movie ID, similar movie ID, score) triples.
+            chunk_size (int): The number of triples inserted at once.
+
+        Returns:
+            int: The number of stored triples.
+        """
+        pass
+
+    @abstractmethod
+    def refresh_movie_similarities(self, user_id: int, movie_id: int, top_k: int):
+        """
+        Updates the stored similar movies after a movie was assigned to a user,
+        without recomputing the similarities of all movies.
+
+        Args:
+            user_id (int): The ID of the user.
+            movie_id (int): The ID of the assigned movie.
+            top_k (int): The number of similar movies kept per movie.
+        """
+        pass
+
+    @abstractmethod
+    def get_similar_movies(self, movie_id: int, limit: int = 10) -> List[Movie]:
+        """
+        Retrieves the movies most similar to a movie.
+
+        Args:
+            movie_id (int): The ID of the movie.
+            limit (int): The maximal number of movies returned.
+
+        Returns:
+            List[Movie]: The similar movies, the most similar first.
+        """
+        pass
+
+    @abstractmethod
+    def get_recommended_movies(self, user_id: int, limit: int = 10) -> List[Movie]:
+        """
+        Retrieves movies similar to the movies of a user's list which are not in the list.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int): The maximal number of movies returned.
+
+        Returns:
+            List[Movie]: The recommended movies, the best recommendation first.
         """
         pass
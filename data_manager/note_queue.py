@@ -0,0 +1,81 @@
+import logging
+import threading
+
+from flask import Flask
+
+from data_manager.data_manager_interface import DataManagerInterface
+from utils.background_queue import BackgroundQueue
+
+logger = logging.getLogger("note_queue")
+
+
+class NoteWriteBehindQueue(BackgroundQueue):
+    """
+    Write-behind queue of user notes saved by a background flusher in batches.
+
+    Accepted notes are kept in memory, a repeated note of the same (user, movie) pair
+    replaces the pending one. Every flush_interval seconds (or as soon as max_batch pairs are
+    pending) the flusher saves all pending notes in one batched UPDATE and one commit,
+    so frequent note saves cost a fraction of a commit (fsync) each. Pending notes are flushed
+    when the queue is stopped, which happens at interpreter exit.
+
+    Each process has its own queue and flusher, started with the first note accepted by the process.
+    Notes are durable once flushed.
+
+    Attributes:
+        flush_interval (float): Seconds between flushes.
+        max_batch (int): The number of pending pairs triggering an early flush.
+    """
+    thread_name = "note-flusher"
+
+    def __init__(self, app: Flask, data_manager: DataManagerInterface, flush_interval: float = 0.2,
+                 max_batch: int = 500):
+        super().__init__(app, wait_interval=flush_interval, max_batch=max_batch)
+        self._data_manager = data_manager
+        self._flush_lock = threading.Lock()
+
+    @property
+    def flush_interval(self) -> float:
+        """ Seconds between flushes. """
+        return self.wait_interval
+
+    def enqueue(self, user_id: int, movie_id: int, note: str):
+        """
+        Accepts a note to be saved by the next flush.
+
+        Args:
+            user_id (int): The ID of the user.
+            movie_id (int): The ID of the movie.
+            note (str): The validated note.
+        """
+        self._put((user_id, movie_id), note)
+
+    def flush(self) -> int:
+        """
+        Saves all pending notes in one batch.
+
+        Notes of a failed batch are put back to the queue unless a newer note of the pair was accepted meanwhile.
+
+        Returns:
+            int: The number of saved notes.
+        """
+        with self._flush_lock:
+            notes = self._take_pending()
+            if not notes:
+                return 0
+
+            try:
+                with self._app.app_context():
+                    saved_notes = self._data_manager.update_user_movie_notes(notes)
+            except Exception:
+                # no accepted note may be lost, whatever failed
+                self._return_pending(notes)
+                logger.exception(f"Saving {len(notes)} notes failed, they are kept for the next flush.")
+                return 0
+
+            if saved_notes < len(notes):
+                logger.warning(f"{len(notes) - saved_notes} notes of movies not assigned to their user were skipped.")
+            return saved_notes
+
+    def _process_pending(self) -> int:
+        return self.flush()
@@ -0,0 +1,111 @@
+import logging
+from typing import List
+
+from sqlalchemy import BigInteger, String, case, cast, column, func, or_, and_, table
+from sqlalchemy.dialects.postgresql import insert
+
+from data_manager.sqlalchemy_data_manager import SQLAlchemyDataManager
+from project.data_models import Movie
+from utils.text import normalize_title, split_words
+
+logger = logging.getLogger("postgresql_data_manager")
+
+# Tables with fewer estimated rows are counted exactly
+COUNT_ESTIMATE_MIN_ROWS = 100_000
+
+pg_class = table("pg_class", column("oid"), column("reltuples"))
+
+
+class PostgreSQLDataManager(SQLAlchemyDataManager):
+    """
+    Data manager for PostgreSQL (and compatible) databases.
+
+    Dialect neutral queries are inherited from SQLAlchemyDataManager, the PostgreSQL flavour
+    of the ON CONFLICT upserts is used, large tables are counted from the planner statistics
+    and movies are searched with trigram (pg_trgm) indexes instead of SQLite FTS5.
+    """
+    _insert = staticmethod(insert)
+
+    def _get_count(self, name: str, model) -> int:
+        """
+        Retrieves a row count from the in-process cache or the planner estimate of the table.
+
+        The estimate (pg_class.reltuples) is kept up to date by autovacuum and costs no table scan,
+        small or never analyzed tables are counted exactly.
+
+        Args:
+            name (str): The name of the counter in the in-process cache.
+            model: The model whose rows are counted.
+
+        Returns:
+            int: The (estimated) number of rows.
+        """
+        count = self._get_cached_count(name)
+        if count is None:
+            count = self._read_session.execute(
+                self.db.select(cast(pg_class.c.reltuples, BigInteger))
+                .filter(pg_class.c.oid == func.to_regclass(model.__tablename__))
+            ).scalar()
+            if count is None or count < COUNT_ESTIMATE_MIN_ROWS:
+                count = self._read_session.execute(self.db.select(func.count()).select_from(model)).scalar()
+            self._counters_cache.set(name, count)
+        return count
+
+    def _title_prefix_condition(self, normalized_title: str):
+        """
+        Builds the condition matching normalized titles longer than and starting with the given one.
+
+        LIKE 'title%' uses the text_pattern_ops index on PostgreSQL.
+
+        Args:
+            normalized_title (str): The normalized title prefix.
+
+        Returns:
+            ColumnElement: The filter condition.
+        """
+        return and_(Movie.name_normalized.startswith(normalized_title, autoescape=True),
+                    Movie.name_normalized != normalized_title)
+
+    def search_movies(self, query: str, limit: int = 10, offset: int = 0) -> List[Movie]:
+        """
+        Searches movies by their title, director and year using the trigram indexes.
+
+        Movies containing all words of the query in the title are ranked first, then movies
+        containing each word in the title, director or year, then titles merely similar
+        to the query (typos). Within a group more similar and shorter titles come first.
+
+        Args:
+            query (str): The search text, partially typed words are matched as substrings.
+            limit (int): The maximal number of movies returned.
+            offset (int): The number of best matching movies to skip.
+
+        Returns:
+            List[Movie]: Matching movies ordered by relevance.
+        """
+        words = split_words(query)
+        if not words:
+            return []
+
+        normalized_query = normalize_title(" ".join(words))
+        director = func.lower(Movie.director)
+        year = cast(Movie.year, String)
+
+        title_match = and_(*(Movie.name_normalized.contains(word, autoescape=True) for word in words))
+        any_column_match = and_(*(
+            or_(Movie.name_normalized.contains(word, autoescape=True), director.contains(word, autoescape=True),
+                year == word)
+            for word in words
+        ))
+        similar_title = Movie.name_normalized.op("%")(normalized_query)
+        match_group = case((title_match, 0), (any_column_match, 1), else_=2)
+
+        movies = self._read_session.execute(
+            self.db.select(Movie)
+            .filter(or_(any_column_match, similar_title))
+            .order_by(match_group, func.similarity(Movie.name_normalized, normalized_query).desc(),
+                      func.length(Movie.name), Movie.id)
+            .limit(limit)
+            .offset(offset)
+        ).scalars().all()
+
+        return movies
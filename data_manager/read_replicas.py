@@ -0,0 +1,98 @@
+import itertools
+import time
+
+from flask import Flask, g, has_request_context, session
+from flask.globals import app_ctx
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.orm import Session, scoped_session
+
+from project.data_models import set_sqlite_pragmas
+
+
+class ReadReplicaRouter:
+    """
+    Routes read-only queries to a pool of read replica engines.
+
+    Each application context (request) reads from one replica, replicas are assigned round-robin.
+    After a write, reads of the same client stay on the primary for sticky_seconds
+    (read-your-writes), the time of the last write is kept in the Flask session cookie.
+
+    Attributes:
+        engines (list[Engine]): The read replica engines, reads use the primary when empty.
+        sticky_seconds (float): How long reads of a client stay on the primary after its write.
+    """
+
+    def __init__(self, engines: list[Engine], sticky_seconds: float = 10):
+        self.engines = engines
+        self.sticky_seconds = sticky_seconds
+        self._engine_cycle = itertools.cycle(engines)
+        self._sessions = scoped_session(lambda: Session(bind=next(self._engine_cycle)),
+                                        scopefunc=lambda: id(app_ctx._get_current_object()))
+
+    def init_app(self, app: Flask):
+        """
+        Closes the read session at the end of every application context.
+
+        Args:
+            app (Flask): The application.
+        """
+        app.teardown_appcontext(lambda exception: self._sessions.remove())
+
+    def mark_write(self):
+        """
+        Records a write of the current client, so that its following reads use the primary.
+
+        Without read replicas all reads use the primary anyway, the write is not recorded
+        and the session cookie is left untouched.
+        """
+        if not self.engines:
+            return
+        g.last_write_at = time.time()
+        if has_request_context():
+            session["last_write_at"] = g.last_write_at
+
+    def is_pinned_to_primary(self) -> bool:
+        """
+        Checks whether the current client wrote recently and has to read from the primary.
+
+        Returns:
+            bool: True if the last write of the client is less than sticky_seconds old.
+        """
+        last_write_at = g.get("last_write_at")
+        if last_write_at is None and has_request_context():
+            last_write_at = session.get("last_write_at")
+        return last_write_at is not None and time.time() - last_write_at < self.sticky_seconds
+
+    def get_session(self, primary_session):
+        """
+        Selects the session of a read-only query.
+
+        Args:
+            primary_session: The session of the primary database.
+
+        Returns:
+            The read replica session of the current application context,
+            the primary session when no replica is configured or the client is pinned to the primary.
+        """
+        if not self.engines or self.is_pinned_to_primary():
+            return primary_session
+        return self._sessions
+
+
+def create_read_replica_router(config) -> ReadReplicaRouter:
+    """
+    Creates the read replica router from the application configuration.
+
+    Args:
+        config: The application configuration mapping.
+
+    Returns:
+        ReadReplicaRouter: The router with an engine for each of the DATABASE_READ_REPLICA_URLS.
+    """
+    engines = []
+    for url in config["DATABASE_READ_REPLICA_URLS"]:
+        engine = create_engine(url, **config.get("SQLALCHEMY_ENGINE_OPTIONS", {}))
+        set_sqlite_pragmas(engine, config.get("SQLITE_PRAGMAS"))
+        engines.append(engine)
+
+    return ReadReplicaRouter(engines, sticky_seconds=config["READ_YOUR_WRITES_SECONDS"])
@@ -0,0 +1,1041 @@
+import heapq
+import logging
+import math
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List
+
+from sqlalchemy import update, delete, func, bindparam, or_, and_, case, tuple_
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.orm import aliased
+
+from data_manager.data_manager_interface import DataManagerInterface
+from data_manager.read_replicas import ReadReplicaRouter
+from project.data_models import User, Movie, UserMovie, MovieSimilarity, Stat, version_stamp
+from project.read_models import MovieCard, MOVIE_CARD_COLUMNS
+from project.exceptions import MovieNotFoundError, DatabaseError, UserNotUniqueError, UserMovieNotFoundError
+from utils.cache import LRUCache
+from utils.text import normalize_title
+
+logger = logging.getLogger("sqlalchemy_data_manager")
+
+USERS_VERSION = "users_version"
+
+
+def next_version(current_version):
+    """
+    Builds the SQL expression of a version stamp following the current one.
+
+    The stamp is the current time in milliseconds, or the current stamp + 1 when the clock
+    did not move forward, so that stamps increase strictly and double as modification times.
+
+    Args:
+        current_version: The column (expression) holding the current version stamp.
+
+    Returns:
+        ColumnElement: The next version stamp.
+    """
+    now_ms = version_stamp()
+    return case((current_version >= now_ms, current_version + 1), else_=now_ms)
+
+
+class SQLAlchemyDataManager(DataManagerInterface, ABC):
+    """
+    Base class of the data managers storing the models through SQLAlchemy.
+
+    Holds the dialect neutral queries, the backends provide the INSERT construct with ON CONFLICT
+    support of their dialect, the indexed title prefix condition and the movie search.
+    """
+    # INSERT construct with ON CONFLICT support of the database dialect, set by the backends
+    _insert: Callable
+
+    def __init__(self, db, counters_ttl: float = 5, read_router: ReadReplicaRouter | None = None):
+        """
+        Initializes the data manager with a pre-configured SQLAlchemy instance.
+
+        Args:
+            db: SQLAlchemy database instance used to execute queries.
+            counters_ttl (float): Seconds for which the users and movies counts are cached in-process.
+            read_router (ReadReplicaRouter | None): Routes read-only queries to read replicas,
+                all queries use the primary when not provided.
+        """
+        self.db = db
+        self._counters_cache = LRUCache(max_size=8, ttl=counters_ttl)
+        self._read_router = read_router
+
+    @property
+    def _read_session(self):
+        """ The session of read-only queries, a read replica unless the client wrote recently. """
+        if self._read_router:
+            return self._read_router.get_session(self.db.session)
+        return self.db.session
+
+    def _commit(self):
+        """ Commits the primary session and pins the following reads of the client to the primary. """
+        self.db.session.commit()
+        if self._read_router:
+            self._read_router.mark_write()
+
+    def _notify_assigned(self, user_id: int, movie_ids: List[int]):
+        """
+        Passes stored assignments to the on_movie_assigned listener, when one is set.
+
+        Args:
+            user_id (int): The ID of the user.
+            movie_ids (List[int]): The IDs of the movies newly assigned to the user.
+        """
+        if self.on_movie_assigned:
+            for movie_id in movie_ids:
+                self.on_movie_assigned(user_id, movie_id)
+
+    def _bump_user_movies_versions(self, user_condition):
+        """
+        Stamps a new version on the movie lists of the matching users, in the current transaction.
+
+        Args:
+            user_condition: The filter condition of the users whose movie lists changed.
+        """
+        self.db.session.execute(
+            update(User).where(user_condition).values(movies_version=next_version(User.movies_version))
+        )
+
+    def _bump_movie_versions(self, movie_ids: List[int]):
+        """
+        Stamps a new version on the movie lists of all users having any of the movies, in the current transaction.
+
+        Args:
+            movie_ids (List[int]): The IDs of the changed movies.
+        """
+        self._bump_user_movies_versions(
+            User.id.in_(self.db.select(UserMovie.user_id).filter(UserMovie.movie_id.in_(movie_ids)))
+        )
+
+    def get_users_version(self) -> int:
+        """
+        Retrieves the version stamp of the users list.
+
+        Returns:
+            int: The version stamp (milliseconds since the epoch of the last added user), 0 before the first user.
+        """
+        return self._read_session.execute(
+            self.db.select(Stat.value).filter(Stat.name == USERS_VERSION)
+        ).scalar() or 0
+
+    def get_user_movies_version(self, user_id: int) -> int | None:
+        """
+        Retrieves the version stamp of a user's movie list without loading the user.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            int | None: The version stamp (milliseconds since the epoch of the last change), None if the user is not found.
+        """
+        return self._read_session.execute(
+            self.db.select(User.movies_version).filter(User.id == user_id)
+        ).scalar()
+
+    def get_all_users(self, limit: int | None = None, after: int | None = None) -> List[User]:
+        """
+        Retrieves all users from the database ordered by their ID, optionally one page at a time.
+
+        Pages are selected by a keyset cursor on the primary key,
+        so the cost of a page does not grow with its depth.
+
+        Args:
+            limit (int | None): The maximal number of users returned, None for all users.
+            after (int | None): The ID of the last user of the previous page.
+
+        Returns:
+            List[User]: A list of user objects retrieved from the database.
+        """
+        users_query = self.db.select(User).order_by(User.id)
+        if after is not None:
+            users_query = users_query.filter(User.id > after)
+        if limit is not None:
+            users_query = users_query.limit(limit)
+
+        return self._read_session.execute(users_query).scalars().all()
+
+    def get_all_users_count(self) -> int:
+        """
+        Retrieves the count of all users from the database.
+
+        Returns:
+            int: The total number of users in the database.
+        """
+        return self._get_count("users", User)
+
+    def get_all_movies_count(self) -> int:
+        """
+        Retrieves the count of all movies from the database.
+
+        Returns:
+            int: The total number of movies in the database.
+        """
+        return self._get_count("movies", Movie)
+
+    def _get_cached_count(self, name: str) -> int | None:
+        """
+        Retrieves a row count from the in-process cache, unless the client reads from the primary.
+
+        A count cached from a lagging replica (or before the write) would hide the client's own write,
+        so the cache is bypassed while the client is pinned to the primary.
+
+        Args:
+            name (str): The name of the counter.
+
+        Returns:
+            int | None: The cached number of rows, None when it has to be read from the database.
+        """
+        if self._read_router and self._read_router.is_pinned_to_primary():
+            return None
+        return self._counters_cache.get(name)
+
+    def _get_count(self, name: str, model) -> int:
+        """
+        Retrieves a row count from the in-process cache or the trigger maintained stats table.
+
+        Falls back to counting the rows when the database has no counter of the name yet.
+
+        Args:
+            name (str): The name of the counter in the stats table.
+            model: The model whose rows are counted.
+
+        Returns:
+            int: The number of rows.
+        """
+        count = self._get_cached_count(name)
+        if count is None:
+            count = self._read_session.execute(
+                self.db.select(Stat.value).filter(Stat.name == name)
+            ).scalar()
+            if count is None:
+                count = self._read_session.execute(self.db.select(func.count()).select_from(model)).scalar()
+            self._counters_cache.set(name, count)
+        return count
+
+    def get_user_movies(self, user_id: int, limit: int | None = None, after: int | None = None) -> List[MovieCard]:
+        """
+        Retrieves all movies associated with a specific user ordered by movie ID, optionally one page at a time.
+
+        Pages are selected by a keyset cursor on the (user_id, movie_id) primary key of user_movies,
+        so the cost of a page does not grow with its depth. Plain columns are selected into
+        MovieCard read models, no ORM instances are built or tracked by the session.
+
+        Args:
+            user_id (int): The ID of the user whose movies are to be retrieved.
+            limit (int | None): The maximal number of movies returned, None for all movies.
+            after (int | None): The ID of the last movie of the previous page.
+
+        Returns:
+            List[MovieCard]: A list of movies associated with the user with the user's notes.
+        """
+        movies_query = (
+            self.db.select(*MOVIE_CARD_COLUMNS)
+            .join(UserMovie)
+            .filter(UserMovie.user_id == user_id)
+            .order_by(UserMovie.movie_id)
+        )
+        if after is not None:
+            movies_query = movies_query.filter(UserMovie.movie_id > after)
+        if limit is not None:
+            movies_query = movies_query.limit(limit)
+
+        return [MovieCard(*row) for row in self._read_session.execute(movies_query)]
+
+    def iter_user_movies(self, user_id: int, batch_size: int = 500) -> Iterator[MovieCard]:
+        """
+        Iterates over all movies associated with a specific user ordered by movie ID.
+
+        Rows are fetched from the database cursor in batches (yield_per), so memory use
+        does not grow with the length of the list.
+
+        Args:
+            user_id (int): The ID of the user whose movies are to be retrieved.
+            batch_size (int): The number of movies fetched from the cursor at once.
+
+        Returns:
+            Iterator[MovieCard]: An iterator over the movies associated with the user with the user's notes.
+        """
+        rows = self._read_session.execute(
+            self.db.select(*MOVIE_CARD_COLUMNS)
+            .join(UserMovie)
+            .filter(UserMovie.user_id == user_id)
+            .order_by(UserMovie.movie_id)
+            .execution_options(yield_per=batch_size)
+        )
+
+        for row in rows:
+            yield MovieCard(*row)
+
+    def add_user(self, user: User):
+        """
+        Adds a new user to the database with error handling.
+
+        Args:
+            user (User): The user object to be added to the database.
+
+        Raises:
+            UserNotUniqueError: If the user already exists in the database.
+            DatabaseError: If an error occurs while adding the user to the database.
+        """
+        try:
+            self.db.session.add(user)
+            self.db.session.flush()
+            self.db.session.execute(
+                self._insert(Stat).values(name=USERS_VERSION, value=next_version(0))
+                .on_conflict_do_update(index_elements=[Stat.name], set_={"value": next_version(Stat.value)})
+            )
+            self._commit()
+            self._counters_cache.delete("users")
+            logger.info("New user was added to the database.")
+        except IntegrityError as error:
+            self.db.session.rollback()
+            error_message = f"Integrity error: {str(error)}"
+            logger.error(error_message)
+            raise UserNotUniqueError("User already exists.") from error
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Adding user failed.") from error
+
+    def add_movie(self, movie: Movie):
+        """
+        Adds a new movie to the database.
+
+        Args:
+            movie (Movie): The movie object to be added to the database.
+
+        Raises:
+            DatabaseError: If an error occurs while adding the movie to the database.
+        """
+        try:
+            self.db.session.add(movie)
+            self._commit()
+            self._counters_cache.delete("movies")
+            logger.info("New movie was added to the database.")
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Adding movie failed.") from error
+
+    def add_movie_to_user(self, user_id: int, movie: Movie):
+        """
+        Assigns a movie to an existing user.
+
+        Args:
+            user_id (int): The ID of the user to assign the movie to.
+            movie (Movie): The movie object to be assigned to the user.
+
+        Raises:
+            DatabaseError: If an error occurs while assigning the movie to the user.
+        """
+        try:
+            new_user_movie = UserMovie(
+                user_id=user_id,
+                movie_id=movie.id
+            )
+            self.db.session.add(new_user_movie)
+            self._bump_user_movies_versions(User.id == user_id)
+            self._commit()
+            logger.info(f"Movie with ID: {movie.id} was assigned to user with ID: {user_id}.")
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Assigning movie to a user failed.") from error
+
+        self._notify_assigned(user_id, [movie.id])
+
+    def add_movie_for_user(self, user_id: int, movie: Movie) -> bool:
+        """
+        Adds a movie (unless a movie with the same name exists) and assigns it to a user in one transaction.
+
+        The movie is upserted by its unique name and the assignment is inserted with
+        ON CONFLICT DO NOTHING, so the whole operation needs a single commit.
+
+        Args:
+            user_id (int): The ID of the user to assign the movie to.
+            movie (Movie): The movie object to be added and assigned, its ID is set to the stored movie ID.
+
+        Returns:
+            bool: True if the movie was assigned to the user, False if the user already had it assigned.
+
+        Raises:
+            DatabaseError: If an error occurs while adding or assigning the movie.
+        """
+        try:
+            movie_id = self.db.session.execute(
+                self._insert(Movie).values(
+                    name=movie.name,
+                    name_normalized=normalize_title(movie.name),
+                    director=movie.director,
+                    year=movie.year,
+                    rating=movie.rating,
+                    poster_url=movie.poster_url
+                )
+                .on_conflict_do_nothing(index_elements=[Movie.name])
+                .returning(Movie.id)
+            ).scalar()
+            is_movie_added = movie_id is not None
+
+            if not is_movie_added:
+                movie_id = self.db.session.execute(
+                    self.db.select(Movie.id).filter(Movie.name == movie.name)
+                ).scalar_one()
+
+            is_assigned = self.db.session.execute(
+                self._insert(UserMovie).values(user_id=user_id, movie_id=movie_id).on_conflict_do_nothing()
+                .returning(UserMovie.movie_id)
+            ).first() is not None
+            if is_assigned:
+                self._bump_user_movies_versions(User.id == user_id)
+
+            self._commit()
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Adding movie to a user failed.") from error
+
+        movie.id = movie_id
+        if is_movie_added:
+            self._counters_cache.delete("movies")
+        if is_assigned:
+            logger.info(f"Movie with ID: {movie_id} was assigned to user with ID: {user_id}.")
+            self._notify_assigned(user_id, [movie_id])
+        return is_assigned
+
+    def import_user_movies(self, user_id: int, rows: Iterable[dict], chunk_size: int = 1000,
+                           on_progress: Callable[[int], None] | None = None) -> dict:
+        """
+        Adds movies from an imported list and assigns them to a user.
+
+        Rows are stored in chunks, each chunk in one transaction with two batched (executemany)
+        inserts skipping existing movies and assignments. Notes longer than the note column
+        are truncated. Chunks committed before an error stay stored.
+
+        Args:
+            user_id (int): The ID of the user to assign the movies to.
+            rows (Iterable[dict]): Movie fields (name, director, year, rating, poster_url, note).
+            chunk_size (int): The number of rows stored in one transaction.
+            on_progress (Callable[[int], None] | None): Called with the number of processed rows after each chunk.
+
+        Returns:
+            dict: The number of processed rows, added movies and movies newly assigned to the user.
+
+        Raises:
+            DatabaseError: If an error occurs while storing a chunk.
+        """
+        note_length = UserMovie.user_note.type.length
+        summary = {"rows": 0, "movies_added": 0, "movies_assigned": 0}
+        rows = iter(rows)
+
+        while chunk := list(islice(rows, chunk_size)):
+            movies = {}
+            for row in chunk:
+                movies.setdefault(row["name"], row)
+
+            try:
+                # Core executemany on the session connection, the inserted rows are counted by RETURNING,
+                # the rowcount of a batched insert is not reported by every driver (psycopg)
+                connection = self.db.session.connection()
+                summary["movies_added"] += len(connection.execute(
+                    self._insert(Movie).on_conflict_do_nothing(index_elements=[Movie.name]).returning(Movie.id),
+                    [{
+                        "name": name,
+                        "name_normalized": normalize_title(name),
+                        "director": row.get("director"),
+                        "year": row.get("year"),
+                        "rating": row.get("rating"),
+                        "poster_url": row.get("poster_url"),
+                    } for name, row in movies.items()]
+                ).all())
+
+                movie_ids = dict(self.db.session.execute(
+                    self.db.select(Movie.name, Movie.id).filter(Movie.name.in_(movies))
+                ).all())
+
+                assigned_movie_ids = connection.execute(
+                    self._insert(UserMovie).on_conflict_do_nothing().returning(UserMovie.movie_id),
+                    [{
+                        "user_id": user_id,
+                        "movie_id": movie_ids[name],
+                        "user_note": row.get("note")[:note_length] if row.get("note") else None,
+                    } for name, row in movies.items()]
+                ).scalars().all()
+                if assigned_movie_ids:
+                    self._bump_user_movies_versions(User.id == user_id)
+
+                self._commit()
+                summary["movies_assigned"] += len(assigned_movie_ids)
+            except SQLAlchemyError as error:
+                self.db.session.rollback()
+                error_message = f"Database error: {str(error)}"
+                logger.error(error_message)
+                raise DatabaseError(f"Importing movies failed after {summary['rows']} rows.") from error
+
+            self._notify_assigned(user_id, assigned_movie_ids)
+            summary["rows"] += len(chunk)
+            if on_progress:
+                on_progress(summary["rows"])
+
+        self._counters_cache.delete("movies")
+        logger.info(f"{summary['rows']} movies were imported for user with ID: {user_id}.")
+        return summary
+
+    def update_movie(self, movie: Movie):
+        """
+        Updates an existing movie in the database.
+
+        Args:
+            movie (Movie): The movie object with updated details.
+
+        Raises:
+            DatabaseError: If an error occurs while updating the movie in the database.
+        """
+        try:
+            stmt = update(Movie).where(Movie.id == movie.id).values(
+                name=movie.name,
+                name_normalized=normalize_title(movie.name),
+                director=movie.director,
+                year=movie.year,
+                rating=movie.rating,
+                poster_url=movie.poster_url,
+                version=next_version(Movie.version)
+            )
+            self.db.session.execute(stmt)
+            self._bump_movie_versions([movie.id])
+            self._commit()
+            logger.info("Movie was updated.")
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Updating movie failed.") from error
+
+    def get_incomplete_movies(self, limit: int, after: int | None = None,
+                              attempted_before: int | None = None) -> List[Movie]:
+        """
+        Retrieves movies missing any of the director, year, rating or poster URL, ordered by their ID.
+
+        Args:
+            limit (int): The maximal number of movies returned.
+            after (int | None): The ID of the last movie of the previous page.
+            attempted_before (int | None): Leaves out movies whose details were looked up at or after
+                this version stamp, None for all incomplete movies.
+
+        Returns:
+            List[Movie]: A list of incomplete movies.
+        """
+        movies_query = (
+            self.db.select(Movie)
+            .filter(or_(Movie.director.is_(None), Movie.year.is_(None), Movie.rating.is_(None),
+                        Movie.poster_url.is_(None)))
+            .order_by(Movie.id)
+            .limit(limit)
+        )
+        if after is not None:
+            movies_query = movies_query.filter(Movie.id > after)
+        if attempted_before is not None:
+            movies_query = movies_query.filter(or_(Movie.enrichment_attempted_at.is_(None),
+                                                   Movie.enrichment_attempted_at < attempted_before))
+
+        return self.db.session.execute(movies_query).scalars().all()
+
+    def iter_poster_urls(self, batch_size: int = 500) -> Iterator[str]:
+        """
+        Iterates over the distinct poster URLs of all stored movies, fetched from the cursor in batches.
+
+        Args:
+            batch_size (int): The number of URLs fetched from the cursor at once.
+
+        Returns:
+            Iterator[str]: An iterator over the poster URLs.
+        """
+        yield from self._read_session.execute(
+            self.db.select(Movie.poster_url)
+            .filter(Movie.poster_url.is_not(None))
+            .distinct()
+            .execution_options(yield_per=batch_size)
+        ).scalars()
+
+    def update_movies_metadata(self, updates: List[dict], attempted_movie_ids: Iterable[int] = ()):
+        """
+        Fills missing details of several movies in one batched (executemany) UPDATE statement.
+
+        Only NULL columns are filled, values entered by users are kept. The updated movies
+        and the attempted ones are stamped as looked up in the same transaction.
+
+        Args:
+            updates (List[dict]): The movie "id" with the fetched director, year, rating and poster_url.
+            attempted_movie_ids (Iterable[int]): The IDs of further movies looked up without details to fill.
+
+        Raises:
+            DatabaseError: If an error occurs while updating the movies.
+        """
+        attempted_movie_ids = list(attempted_movie_ids)
+        if not updates and not attempted_movie_ids:
+            return
+
+        attempted_at = version_stamp()
+        stmt = update(Movie).where(Movie.id == bindparam("movie_id")).values(
+            director=func.coalesce(Movie.director, bindparam("new_director")),
+            year=func.coalesce(Movie.year, bindparam("new_year")),
+            rating=func.coalesce(Movie.rating, bindparam("new_rating")),
+            poster_url=func.coalesce(Movie.poster_url, bindparam("new_poster_url")),
+            version=next_version(Movie.version),
+            enrichment_attempted_at=attempted_at
+        )
+        try:
+            if updates:
+                self.db.session.connection().execute(stmt, [{
+                    "movie_id": movie_update["id"],
+                    "new_director": movie_update.get("director"),
+                    "new_year": movie_update.get("year"),
+                    "new_rating": movie_update.get("rating"),
+                    "new_poster_url": movie_update.get("poster_url"),
+                } for movie_update in updates])
+                self._bump_movie_versions([movie_update["id"] for movie_update in updates])
+            if attempted_movie_ids:
+                self.db.session.execute(
+                    update(Movie).where(Movie.id.in_(attempted_movie_ids)).values(enrichment_attempted_at=attempted_at)
+                )
+            self._commit()
+            logger.info(f"Details of {len(updates)} movies were updated.")
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Updating movies failed.") from error
+
+    def delete_movie(self, movie_id: int):
+        """
+        Deletes a movie from the database.
+
+        Args:
+            movie_id (int): The ID of the movie to be deleted.
+
+        Raises:
+            MovieNotFoundError: If the movie to delete is not found.
+            DatabaseError: If an error occurs while deleting the movie from the database.
+        """
+        movie = Movie.query.get(movie_id)
+        if movie:
+            try:
+                self._bump_movie_versions([movie_id])
+                self.db.session.execute(delete(MovieSimilarity).where(
+                    or_(MovieSimilarity.movie_id == movie_id, MovieSimilarity.similar_movie_id == movie_id)
+                ))
+                self.db.session.delete(movie)
+                self._commit()
+                self._counters_cache.delete("movies")
+                logger.info("Movie was deleted.")
+            except SQLAlchemyError as error:
+                self.db.session.rollback()
+                error_message = f"Database error: {str(error)}"
+                logger.error(error_message)
+                raise DatabaseError("Deleting movie failed.") from error
+        else:
+            error_message = f"Movie to delete with ID: {movie_id} not found."
+            logger.error(error_message)
+            raise MovieNotFoundError(error_message)
+
+    def get_movie_by_title(self, title: str, allow_substring: bool = False) -> Movie | None:
+        """
+        Retrieves a movie by its title from the database.
+
+        The lookup uses the index on the normalized title: an exact match is tried first,
+        then the alphabetically first title starting with the searched one (read from the index,
+        without sorting all matches). The substring match requires a full table scan
+        and is used only when explicitly allowed.
+
+        Args:
+            title (str): The title of the movie to retrieve.
+            allow_substring (bool): Whether to fall back to a substring match.
+
+        Returns:
+            Movie | None: The movie object if found, otherwise None.
+        """
+        normalized_title = normalize_title(title)
+        if not normalized_title:
+            return None
+
+        lookups = [
+            self.db.select(Movie).filter(Movie.name_normalized == normalized_title),
+            self.db.select(Movie).filter(self._title_prefix_condition(normalized_title))
+            .order_by(Movie.name_normalized),
+        ]
+        if allow_substring:
+            lookups.append(
+                self.db.select(Movie).filter(Movie.name_normalized.contains(normalized_title, autoescape=True))
+                .order_by(Movie.name_normalized)
+            )
+
+        for lookup in lookups:
+            movie = self._read_session.execute(lookup.limit(1)).scalars().first()
+            if movie:
+                return movie
+
+        return None
+
+    @abstractmethod
+    def _title_prefix_condition(self, normalized_title: str):
+        """
+        Builds the condition matching normalized titles longer than and starting with the given one.
+
+        Args:
+            normalized_title (str): The normalized title prefix.
+
+        Returns:
+            ColumnElement: The filter condition, kept on the index of the normalized titles.
+        """
+        pass
+
+    def add_user_movie_note(self, user_id: int, movie_id: int, user_note: str):
+        """
+        Adds a note for a specific user and movie in the database.
+
+        Args:
+            user_id (int): The ID of the user adding the note.
+            movie_id (int): The ID of the movie for which the note is being added.
+            user_note (str): The note to be added for the movie by the user.
+
+        Raises:
+            UserMovieNotFoundError: If the movie is not assigned to the user.
+            DatabaseError: If an error occurs while saving the note to the database.
+        """
+        if not self.update_user_movie_notes({(user_id, movie_id): user_note}):
+            error_message = f"Movie with ID: {movie_id} is not assigned to user with ID: {user_id}."
+            logger.error(error_message)
+            raise UserMovieNotFoundError(error_message)
+
+    def has_user_movie(self, user_id: int, movie_id: int) -> bool:
+        """
+        Checks whether a movie is assigned to a user, on the primary so that a movie just added is found.
+
+        Args:
+            user_id (int): The ID of the user.
+            movie_id (int): The ID of the movie.
+
+        Returns:
+            bool: True if the movie is in the user's list.
+        """
+        return self.db.session.execute(
+            self.db.select(UserMovie.user_id).filter(UserMovie.user_id == user_id, UserMovie.movie_id == movie_id)
+        ).first() is not None
+
+    def mark_user_movies_changed(self, user_id: int):
+        """
+        Stamps a new version on a user's movie list changed by a write saved later, e.g. a queued note.
+
+        The commit pins the following reads of the client to the primary, like the write itself would,
+        so that the client does not revalidate its cached list against the old version or read a replica.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Raises:
+            DatabaseError: If an error occurs while saving the version.
+        """
+        try:
+            self._bump_user_movies_versions(User.id == user_id)
+            self._commit()
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Saving movie list version failed.") from error
+
+    def update_user_movie_notes(self, notes: dict[tuple[int, int], str]) -> int:
+        """
+        Saves notes of several user and movie pairs in one batched (executemany) UPDATE and one commit.
+
+        Args:
+            notes (dict[tuple[int, int], str]): The notes keyed by (user ID, movie ID).
+
+        Returns:
+            int: The number of saved notes, pairs of movies not assigned to the user are skipped.
+
+        Raises:
+            DatabaseError: If an error occurs while saving the notes to the database.
+        """
+        if not notes:
+            return 0
+
+        stmt = update(UserMovie).where(
+            UserMovie.user_id == bindparam("note_user_id"), UserMovie.movie_id == bindparam("note_movie_id")
+        ).values(user_note=bindparam("new_note"))
+        try:
+            saved_notes = self.db.session.connection().execute(stmt, [
+                {"note_user_id": user_id, "note_movie_id": movie_id, "new_note": note}
+                for (user_id, movie_id), note in notes.items()
+            ]).rowcount
+            self._bump_user_movies_versions(User.id.in_({user_id for user_id, _ in notes}))
+            self._commit()
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Saving note failed.") from error
+
+        logger.info(f"{saved_notes} notes were saved.")
+        return saved_notes
+
+    def iter_user_movie_pairs(self, batch_size: int = 10_000) -> Iterator[tuple[int, int]]:
+        """
+        Iterates over all assignments of movies to users, fetched from the cursor in batches.
+
+        Args:
+            batch_size (int): The number of pairs fetched from the cursor at once.
+
+        Returns:
+            Iterator[tuple[int, int]]: An iterator over the (user ID, movie ID) pairs.
+        """
+        for user_id, movie_id in self._read_session.execute(
+            self.db.select(UserMovie.user_id, UserMovie.movie_id).execution_options(yield_per=batch_size)
+        ):
+            yield user_id, movie_id
+
+    def replace_movie_similarities(self, similarities: Iterable[tuple[int, int, float]],
+                                   chunk_size: int = 10_000) -> int:
+        """
+        Replaces all stored similar movies in one transaction, inserted by batched (executemany) INSERTs.
+
+        Readers see the previous similarities until the transaction is committed.
+
+        Args:
+            similarities (Iterable[tuple[int, int, float]]): The (movie ID, similar movie ID, score) triples.
+            chunk_size (int): The number of triples inserted at once.
+
+        Returns:
+            int: The number of stored triples.
+
+        Raises:
+            DatabaseError: If an error occurs while storing the similarities.
+        """
+        similarities = iter(similarities)
+        stored = 0
+        try:
+            connection = self.db.session.connection()
+            connection.execute(delete(MovieSimilarity))
+            while chunk := list(islice(similarities, chunk_size)):
+                connection.execute(self._insert(MovieSimilarity), [
+                    {"movie_id": movie_id, "similar_movie_id": similar_movie_id, "score": score}
+                    for movie_id, similar_movie_id, score in chunk
+                ])
+                stored += len(chunk)
+            self._commit()
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Storing similar movies failed.") from error
+
+        logger.info(f"{stored} similar movies were stored.")
+        return stored
+
+    def refresh_movie_similarities(self, user_id: int, movie_id: int, top_k: int):
+        """
+        Updates the stored similar movies after a movie was assigned to a user.
+
+        Only the similarities changed by the assignment are recomputed from the co-occurrence counts
+        of the assigned movie: its own top-k list is replaced, its score is inserted into the lists of
+        the user's other movies (trimmed back to top_k) and updated in the other lists holding it.
+        Its score in those lists decreases (it has one more user), a list where it falls below
+        the previously lowest score is recomputed, since an unlisted movie may outrank it now.
+
+        Args:
+            user_id (int): The ID of the user.
+            movie_id (int): The ID of the assigned movie.
+            top_k (int): The number of similar movies kept per movie.
+
+        Raises:
+            DatabaseError: If an error occurs while updating the similarities.
+        """
+        try:
+            scores = self._compute_movie_similarities(movie_id)
+            user_movie_ids = set(self.db.session.execute(
+                self.db.select(UserMovie.movie_id).filter(UserMovie.user_id == user_id, UserMovie.movie_id != movie_id)
+            ).scalars())
+            # the lowest score and the length of the other lists holding the movie, before the update
+            listing_movies = {
+                listing_movie_id: (lowest_score, length)
+                for listing_movie_id, lowest_score, length in self.db.session.execute(
+                    self.db.select(MovieSimilarity.movie_id, func.min(MovieSimilarity.score), func.count())
+                    .filter(MovieSimilarity.movie_id.in_(
+                        self.db.select(MovieSimilarity.movie_id).filter(MovieSimilarity.similar_movie_id == movie_id)
+                    ))
+                    .group_by(MovieSimilarity.movie_id)
+                )
+                if listing_movie_id not in user_movie_ids and listing_movie_id in scores
+            }
+            # all similarities are computed before the first write, so the database is locked only for the writes
+            recomputed_scores = {
+                listing_movie_id: self._compute_movie_similarities(listing_movie_id)
+                for listing_movie_id, (lowest_score, length) in listing_movies.items()
+                if length >= top_k and scores[listing_movie_id] < lowest_score
+            }
+
+            self._store_similar_movies(movie_id, scores, top_k)
+            connection = self.db.session.connection()
+            if listing_movies:
+                connection.execute(
+                    update(MovieSimilarity)
+                    .where(MovieSimilarity.movie_id == bindparam("listing_movie_id"),
+                           MovieSimilarity.similar_movie_id == movie_id)
+                    .values(score=bindparam("new_score")),
+                    [{"listing_movie_id": listing_movie_id, "new_score": scores[listing_movie_id]}
+                     for listing_movie_id in listing_movies]
+                )
+            for listing_movie_id, listing_scores in recomputed_scores.items():
+                self._store_similar_movies(listing_movie_id, listing_scores, top_k)
+
+            if user_movie_ids:
+                upsert = self._insert(MovieSimilarity)
+                connection.execute(
+                    upsert.on_conflict_do_update(
+                        index_elements=[MovieSimilarity.movie_id, MovieSimilarity.similar_movie_id],
+                        set_={"score": upsert.excluded.score}
+                    ),
+                    [{"movie_id": user_movie_id, "similar_movie_id": movie_id, "score": scores[user_movie_id]}
+                     for user_movie_id in user_movie_ids]
+                )
+                self._trim_movie_similarities(
+                    self.db.select(UserMovie.movie_id).filter(UserMovie.user_id == user_id), top_k
+                )
+
+            self._commit()
+        except SQLAlchemyError as error:
+            self.db.session.rollback()
+            error_message = f"Database error: {str(error)}"
+            logger.error(error_message)
+            raise DatabaseError("Refreshing similar movies failed.") from error
+
+    def _compute_movie_similarities(self, movie_id: int) -> dict[int, float]:
+        """
+        Computes the cosine similarities of a movie with all movies sharing a user with it.
+
+        Args:
+            movie_id (int): The ID of the movie.
+
+        Returns:
+            dict[int, float]: The similarities keyed by the IDs of the other movies.
+        """
+        mine, other, counted = aliased(UserMovie), aliased(UserMovie), aliased(UserMovie)
+        other_users_count = (
+            self.db.select(func.count()).select_from(counted).filter(counted.movie_id == other.movie_id)
+            .scalar_subquery()
+        )
+        users_count = self.db.session.execute(
+            self.db.select(func.count()).select_from(UserMovie).filter(UserMovie.movie_id == movie_id)
+        ).scalar()
+        co_occurrences = self.db.session.execute(
+            self.db.select(other.movie_id, func.count(), other_users_count)
+            .select_from(mine)
+            .join(other, and_(other.user_id == mine.user_id, other.movie_id != mine.movie_id))
+            .filter(mine.movie_id == movie_id)
+            .group_by(other.movie_id)
+        ).all()
+        return {
+            other_movie_id: common_users / math.sqrt(users_count * other_count)
+            for other_movie_id, common_users, other_count in co_occurrences
+        }
+
+    def _store_similar_movies(self, movie_id: int, scores: dict[int, float], top_k: int):
+        """
+        Replaces the similar movies of a movie by its top_k most similar movies, in the current transaction.
+
+        Args:
+            movie_id (int): The ID of the movie.
+            scores (dict[int, float]): The similarities keyed by the IDs of the other movies.
+            top_k (int): The number of similar movies kept.
+        """
+        connection = self.db.session.connection()
+        connection.execute(delete(MovieSimilarity).where(MovieSimilarity.movie_id == movie_id))
+        # the most similar first, ties by the lower movie ID
+        top_similar = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0]))
+        if top_similar:
+            connection.execute(self._insert(MovieSimilarity), [
+                {"movie_id": movie_id, "similar_movie_id": similar_movie_id, "score": score}
+                for similar_movie_id, score in top_similar
+            ])
+
+    def _trim_movie_similarities(self, movie_ids, top_k: int):
+        """
+        Deletes the similar movies ranked below top_k in the lists of the movies, in the current transaction.
+
+        Args:
+            movie_ids: The select of the IDs of the movies whose lists are trimmed.
+            top_k (int): The number of similar movies kept per movie.
+        """
+        ranked = (
+            self.db.select(
+                MovieSimilarity.movie_id,
+                MovieSimilarity.similar_movie_id,
+                func.row_number().over(
+                    partition_by=MovieSimilarity.movie_id,
+                    order_by=(MovieSimilarity.score.desc(), MovieSimilarity.similar_movie_id)
+                ).label("rank")
+            )
+            .filter(MovieSimilarity.movie_id.in_(movie_ids))
+            .subquery()
+        )
+        self.db.session.execute(
+            delete(MovieSimilarity).where(tuple_(MovieSimilarity.movie_id, MovieSimilarity.similar_movie_id).in_(
+                self.db.select(ranked.c.movie_id, ranked.c.similar_movie_id).filter(ranked.c.rank > top_k)
+            ))
+        )
+
+    def get_similar_movies(self, movie_id: int, limit: int = 10) -> List[Movie]:
+        """
+        Retrieves the movies most similar to a movie from the precomputed similarities.
+
+        Args:
+            movie_id (int): The ID of the movie.
+            limit (int): The maximal number of movies returned.
+
+        Returns:
+            List[Movie]: The similar movies, the most similar first.
+        """
+        return self._read_session.execute(
+            self.db.select(Movie)
+            .join(MovieSimilarity, MovieSimilarity.similar_movie_id == Movie.id)
+            .filter(MovieSimilarity.movie_id == movie_id)
+            .order_by(MovieSimilarity.score.desc(), Movie.id)
+            .limit(limit)
+        ).scalars().all()
+
+    def get_recommended_movies(self, user_id: int, limit: int = 10) -> List[Movie]:
+        """
+        Retrieves movies similar to the movies of a user's list which are not in the list.
+
+        The movies are ranked by the sum of their similarities to the movies of the list,
+        so that movies similar to several of them come first.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int): The maximal number of movies returned.
+
+        Returns:
+            List[Movie]: The recommended movies, the best recommendation first.
+        """
+        user_movie_ids = self.db.select(UserMovie.movie_id).filter(UserMovie.user_id == user_id)
+        score = func.sum(MovieSimilarity.score).label("score")
+        recommendations = (
+            self.db.select(MovieSimilarity.similar_movie_id, score)
+            .filter(MovieSimilarity.movie_id.in_(user_movie_ids),
+                    MovieSimilarity.similar_movie_id.not_in(user_movie_ids))
+            .group_by(MovieSimilarity.similar_movie_id)
+            .order_by(score.desc(), MovieSimilarity.similar_movie_id)
+            .limit(limit)
+            .subquery()
+        )
+        return self._read_session.execute(
+            self.db.select(Movie)
+            .join(recommendations, recommendations.c.similar_movie_id == Movie.id)
+            .order_by(recommendations.c.score.desc(), Movie.id)
+        ).scalars().all()
@@ -1,243 +1,90 @@
-import logging
-from abc import ABC
 from typing import List
 
-from sqlalchemy import update
-from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy import literal_column, and_
+from sqlalchemy.dialects.sqlite import insert
 
-from data_manager.data_manager_interface import DataManagerInterface
-from project.data_models import User, Movie, UserMovie
-from project.exceptions import MovieNotFoundError, DatabaseError, UserNotUniqueError
+from data_manager.sqlalchemy_data_manager import SQLAlchemyDataManager
+from project.data_models import Movie, movies_fts
+from utils.text import normalize_title, build_fts_query, split_search_text, contains_search_words
 
-logger = logging.getLogger("sqlite_data_manager")
 
-class SQLiteDataManager(DataManagerInterface, ABC):
-    def __init__(self, db):
-        """
-        Initializes SQLiteDataManager with a pre-configured SQLAlchemy instance.
+# matches of a search ranked by the title, the following matches keep the index order
+SEARCH_RANKED_CANDIDATES = 100
 
-        Args:
-            db: SQLAlchemy database instance used to execute queries.
-        """
-        self.db = db
 
-    def get_all_users(self) -> List[User]:
-        """
-        Retrieves all users from the database.
-
-        Returns:
-            List[User]: A list of all user objects retrieved from the database.
-        """
-        users_query = self.db.session.query(User)
-        return users_query.all()
+class SQLiteDataManager(SQLAlchemyDataManager):
+    """
+    Data manager for SQLite databases.
 
-    def get_all_users_count(self) -> int:
-        """
-        Retrieves the count of all users from the database.
-
-        Returns:
-            int: The total number of users in the database.
-        """
-        return self.db.session.query(User).count()
-
-    def get_all_movies_count(self) -> int:
-        """
-        Retrieves the count of all movies from the database.
+    Movies are searched in the FTS5 full-text index and titles are prefix matched
+    by range conditions kept on the index of the normalized titles.
+    """
+    _insert = staticmethod(insert)
 
-        Returns:
-            int: The total number of movies in the database.
+    def _title_prefix_condition(self, normalized_title: str):
         """
-        return self.db.session.query(Movie).count()
+        Builds the condition matching normalized titles longer than and starting with the given one.
 
-    def get_user_movies(self, user_id: int) -> List[Movie]:
-        """
-        Retrieves all movies associated with a specific user.
+        The range condition keeps the prefix match on the index, unlike LIKE 'title%' on SQLite.
 
         Args:
-            user_id (int): The ID of the user whose movies are to be retrieved.
+            normalized_title (str): The normalized title prefix.
 
         Returns:
-            List[Movie]: A list of movies associated with the user, with dynamically
-                          attached user notes for each movie.
-        """
-        movies = self.db.session.execute(
-            self.db.select(Movie).add_columns(UserMovie.user_note)
-            .join(UserMovie)
-            .filter(UserMovie.user_id == user_id)
-        ).all()
-
-        # Attach user_note dynamically
-        for movie, user_note in movies:
-            movie.user_note = user_note  # Add user_note to each Movie object
-
-        # Extract only Movie objects (now modified with user_note)
-        movies = [movie for movie, _ in movies]
-
-        return movies
-
-    def add_user(self, user: User):
-        """
-        Adds a new user to the database with error handling.
-
-        Args:
-            user (User): The user object to be added to the database.
-
-        Raises:
-            UserNotUniqueError: If the user already exists in the database.
-            DatabaseError: If an error occurs while adding the user to the database.
-        """
-        try:
-            self.db.session.add(user)
-            self.db.session.commit()
-            logger.info("New user was added to the database.")
-        except IntegrityError as error:
-            self.db.session.rollback()
-            error_message = f"Integrity error: {str(error)}"
-            logger.error(error_message)
-            raise UserNotUniqueError("User already exists.") from error
-        except SQLAlchemyError as error:
-            self.db.session.rollback()
-            error_message = f"Database error: {str(error)}"
-            logger.error(error_message)
-            raise DatabaseError("Adding user failed.") from error
-
-    def add_movie(self, movie: Movie):
+            ColumnElement: The filter condition.
         """
-        Adds a new movie to the database.
+        return and_(Movie.name_normalized > normalized_title, Movie.name_normalized < normalized_title + "\U0010ffff")
 
-        Args:
-            movie (Movie): The movie object to be added to the database.
-
-        Raises:
-            DatabaseError: If an error occurs while adding the movie to the database.
-        """
-        try:
-            self.db.session.add(movie)
-            self.db.session.commit()
-            logger.info("New movie was added to the database.")
-        except SQLAlchemyError as error:
-            self.db.session.rollback()
-            error_message = f"Database error: {str(error)}"
-            logger.error(error_message)
-            raise DatabaseError("Adding movie failed.") from error
-
-    def add_movie_to_user(self, user_id: int, movie: Movie):
-        """
-        Assigns a movie to an existing user.
-
-        Args:
-            user_id (int): The ID of the user to assign the movie to.
-            movie (Movie): The movie object to be assigned to the user.
-
-        Raises:
-            DatabaseError: If an error occurs while assigning the movie to the user.
-        """
-        try:
-            new_user_movie = UserMovie(
-                user_id=user_id,
-                movie_id=movie.id
-            )
-            self.db.session.add(new_user_movie)
-            self.db.session.commit()
-            logger.info(f"Movie with ID: {movie.id} was assigned to user with ID: {user_id}.")
-        except SQLAlchemyError as error:
-            self.db.session.rollback()
-            error_message = f"Database error: {str(error)}"
-            logger.error(error_message)
-            raise DatabaseError("Assigning movie to a user failed.") from error
-
-    def update_movie(self, movie: Movie):
-        """
-        Updates an existing movie in the database.
-
-        Args:
-            movie (Movie): The movie object with updated details.
-
-        Raises:
-            DatabaseError: If an error occurs while updating the movie in the database.
-        """
-        try:
-            stmt = update(Movie).where(Movie.id == movie.id).values(
-                name=movie.name,
-                director=movie.director,
-                year=movie.year,
-                rating=movie.rating,
-                poster_url=movie.poster_url
-            )
-            self.db.session.execute(stmt)
-            self.db.session.commit()
-            logger.info("Movie was updated.")
-        except SQLAlchemyError as error:
-            self.db.session.rollback()
-            error_message = f"Database error: {str(error)}"
-            logger.error(error_message)
-            raise DatabaseError("Updating movie failed.") from error
-
-    def delete_movie(self, movie_id: int):
+    def search_movies(self, query: str, limit: int = 10, offset: int = 0) -> List[Movie]:
         """
-        Deletes a movie from the database.
+        Searches movies in the full-text index by their title, director and year.
 
-        Args:
-            movie_id (int): The ID of the movie to be deleted.
-
-        Raises:
-            MovieNotFoundError: If the movie to delete is not found.
-            DatabaseError: If an error occurs while deleting the movie from the database.
-        """
-        movie = Movie.query.get(movie_id)
-        if movie:
-            try:
-                self.db.session.delete(movie)
-                self.db.session.commit()
-                logger.info("Movie was deleted.")
-            except SQLAlchemyError as error:
-                self.db.session.rollback()
-                error_message = f"Database error: {str(error)}"
-                logger.error(error_message)
-                raise DatabaseError("Deleting movie failed.") from error
-        else:
-            error_message = f"Movie to delete with ID: {movie_id} not found."
-            logger.error(error_message)
-            raise MovieNotFoundError(error_message)
-
-    def get_movie_by_title(self, title: str) -> Movie | None:
-        """
-        Retrieves a movie by its title from the database.
+        Movies with the exact title come first. The first SEARCH_RANKED_CANDIDATES other matches
+        in the index (rowid) order follow, ranked with the movies matching the query in the title
+        before the movies matching it in other columns only, then by title length (shorter, closer titles first,
+        ties by the movie ID). The remaining matches follow in the index order. The order does not depend
+        on the requested page, so the pages follow one order, and a page reads a bounded number of matches
+        however common the words are.
 
         Args:
-            title (str): The title of the movie to retrieve.
+            query (str): The search text, partially typed words are matched as prefixes.
+            limit (int): The maximal number of movies returned.
+            offset (int): The number of best matching movies to skip.
 
         Returns:
-            Movie | None: The movie object if found, otherwise None.
-        """
-        movie = self.db.session.execute(
-            self.db.select(Movie).filter(Movie.name.ilike(f"%{title}%"))
-        ).scalars().first()
-
-        return movie
-
-    def add_user_movie_note(self, user_id: int, movie_id: int, user_note: str):
-        """
-        Adds a note for a specific user and movie in the database.
-
-        Args:
-            user_id (int): The ID of the user adding the note.
-            movie_id (int): The ID of the movie for which the note is being added.
-            user_note (str): The note to be added for the movie by the user.
-
-        Raises:
-            DatabaseError: If an error occurs while saving the note to the database.
-        """
-        try:
-            user_movie = self.db.session.execute(
-                self.db.select(UserMovie).filter(UserMovie.user_id == user_id, UserMovie.movie_id == movie_id)
-            ).scalars().first()
-            user_movie.user_note = user_note
-
-            self.db.session.commit()
-            logger.info(f"Note was saved for movie with ID: {movie_id} by user with ID: {user_id}.")
-        except SQLAlchemyError as error:
-            self.db.session.rollback()
-            error_message = f"Database error: {str(error)}"
-            logger.error(error_message)
-            raise DatabaseError("Saving note failed.") from error
+            List[Movie]: Matching movies ordered by relevance.
+        """
+        fts_query = build_fts_query(query)
+        if not fts_query:
+            return []
+
+        # a title equal to the search text contains all its words, no need to match it in the index
+        exact_ids = self._read_session.execute(
+            self.db.select(Movie.id).filter(Movie.name_normalized == normalize_title(query)).order_by(Movie.id)
+        ).scalars().all()
+        fts_match = literal_column("movies_fts").op("MATCH")(fts_query)
+        matches = (self.db.select(movies_fts.c.rowid).filter(fts_match, movies_fts.c.rowid.notin_(exact_ids))
+                   .order_by(movies_fts.c.rowid))
+        candidates = self._read_session.execute(
+            self.db.select(Movie.id, Movie.name)
+            .join(matches.limit(SEARCH_RANKED_CANDIDATES).subquery("candidates"),
+                  literal_column("candidates.rowid") == Movie.id)
+        ).all()
+        # the title matches are told apart in Python, matching the candidates in the index again costs another pass
+        words, is_prefix = split_search_text(query)
+        candidates.sort(key=lambda movie: (not contains_search_words(movie.name, words, is_prefix),
+                                           len(movie.name), movie.id))
+        movie_ids = (exact_ids + [movie.id for movie in candidates])[offset:offset + limit]
+
+        if len(movie_ids) < limit and len(candidates) == SEARCH_RANKED_CANDIDATES:
+            # the matches following the ranked candidates, in the index order
+            last_candidate_id = max(movie.id for movie in candidates)
+            movie_ids += self._read_session.execute(
+                matches.filter(movies_fts.c.rowid > last_candidate_id)
+                .limit(limit - len(movie_ids)).offset(max(0, offset - len(exact_ids) - len(candidates)))
+            ).scalars().all()
+
+        movies = {movie.id: movie for movie in self._read_session.execute(
+            self.db.select(Movie).filter(Movie.id.in_(movie_ids))
+        ).scalars()}
+        return [movies[movie_id] for movie_id in movie_ids if movie_id in movies]
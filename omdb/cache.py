@@ -0,0 +1,83 @@
+import logging
+
+from utils.cache import LRUCache, SQLiteCache, TieredCache
+from utils.text import normalize_title
+
+logger = logging.getLogger("omdb_cache")
+
+MOVIE_NOT_FOUND_ERROR = "Movie not found!"
+
+
+class OmdbResponseCache:
+    """
+    Caches decoded OMDb API responses keyed by the normalized movie title.
+
+    Found movies are kept for the regular TTL, "Movie not found!" responses are kept
+    for a shorter negative TTL so that unknown titles are not re-queried on every search.
+    Other error responses (e.g. invalid API key, request limit reached) are never cached.
+
+    Attributes:
+        cache: The backing cache providing get, set and stats methods.
+        ttl (float): Time to live of found movies in seconds.
+        negative_ttl (float): Time to live of "Movie not found!" responses in seconds.
+    """
+
+    def __init__(self, cache, ttl: float, negative_ttl: float):
+        self.cache = cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    def get(self, title: str) -> dict | None:
+        """
+        Retrieves the cached OMDb response for a title.
+
+        Args:
+            title (str): The searched movie title.
+
+        Returns:
+            dict | None: The cached decoded response, otherwise None.
+        """
+        return self.cache.get(normalize_title(title))
+
+    def set(self, title: str, response_obj: dict):
+        """
+        Caches the decoded OMDb response for a title.
+
+        Args:
+            title (str): The searched movie title.
+            response_obj (dict): The decoded OMDb response.
+        """
+        if response_obj.get("Response") == "True":
+            self.cache.set(normalize_title(title), response_obj, ttl=self.ttl)
+        elif response_obj.get("Error") == MOVIE_NOT_FOUND_ERROR:
+            self.cache.set(normalize_title(title), response_obj, ttl=self.negative_ttl)
+
+    def stats(self) -> dict:
+        """
+        Returns the usage statistics of the backing cache.
+
+        Returns:
+            dict: The hit and miss counters of the backing cache.
+        """
+        return self.cache.stats()
+
+
+def create_omdb_cache(config) -> OmdbResponseCache | None:
+    """
+    Creates the OMDb response cache from the application configuration.
+
+    Args:
+        config: The application configuration mapping.
+
+    Returns:
+        OmdbResponseCache | None: The configured cache, None when caching is disabled.
+    """
+    if not config.get("OMDB_CACHE_ENABLED"):
+        return None
+
+    cache = LRUCache(max_size=config["OMDB_CACHE_MAX_SIZE"])
+    if config.get("OMDB_CACHE_DB_PATH"):
+        cache = TieredCache(cache, SQLiteCache(config["OMDB_CACHE_DB_PATH"]))
+        logger.info(f"OMDb cache persisted to: {config['OMDB_CACHE_DB_PATH']}")
+
+    return OmdbResponseCache(cache, ttl=config["OMDB_CACHE_TTL"], negative_ttl=config["OMDB_CACHE_NEGATIVE_TTL"])
@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from omdb.cache import OmdbResponseCache, create_omdb_cache
+from project.exceptions import OmdbUnavailableError
+from utils.text import normalize_title
+from utils.validation import get_valid_number_or_none, get_valid_url_or_none
+
+logger = logging.getLogger("omdb_client")
+
+OMDB_BASE_URL = "https://www.omdbapi.com/"
+
+
+class OmdbClient:
+    """
+    Thread-safe OMDb API client.
+
+    Requests share a keep-alive connection pool, are bounded by connect/read timeouts
+    and retried with exponential backoff on connection errors and 429/5xx responses.
+    Concurrent lookups of the same title are coalesced into a single request
+    and answered from the optional response cache when possible.
+
+    Attributes:
+        api_key (str): The OMDb API key.
+        base_url (str): The base URL of the OMDb API.
+        timeout (tuple[float, float]): The connect and read timeout in seconds.
+        cache (OmdbResponseCache | None): The response cache, None for no caching.
+        session (requests.Session): The pooled HTTP session.
+    """
+
+    def __init__(self, api_key: str, base_url: str = OMDB_BASE_URL, timeout: tuple[float, float] = (3.05, 10),
+                 retries: int = 2, backoff_factor: float = 0.3, backoff_max: float = 5, pool_size: int = 10,
+                 cache: OmdbResponseCache | None = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            backoff_max=backoff_max,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch_movie_data(self, title: str) -> dict:
+        """
+        Retrieves the decoded OMDb response for a movie title.
+
+        Args:
+            title (str): The title of the movie to search for.
+
+        Returns:
+            dict: The decoded OMDb response, "Response" is "False" when no movie was found.
+
+        Raises:
+            OmdbUnavailableError: If the API cannot be reached or responds with an error status.
+        """
+        if self.cache:
+            response_obj = self.cache.get(title)
+            if response_obj is not None:
+                return response_obj
+
+        key = normalize_title(title)
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            response_obj = self._request(title)
+            if self.cache:
+                self.cache.set(title, response_obj)
+            future.set_result(response_obj)
+            return response_obj
+        except Exception as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _request(self, title: str) -> dict:
+        params = {"apikey": self.api_key, "t": title, "type": "movie"}
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        except requests.exceptions.RequestException as error:
+            raise OmdbUnavailableError(f"Connection to OMDb failed: {str(error)}") from error
+
+        if response.status_code != 200:
+            raise OmdbUnavailableError(f"OMDb responded with status: {response.status_code}")
+
+        try:
+            return response.json()
+        except ValueError as error:
+            raise OmdbUnavailableError("OMDb responded with invalid JSON.") from error
+
+    def close(self):
+        """ Closes all pooled connections. """
+        self.session.close()
+
+
+class AsyncOmdbClient:
+    """
+    Asyncio variant of the OMDb client.
+
+    Lookups run on the pooled synchronous client in worker threads, bounded by
+    a concurrency limit. Concurrent lookups of the same title within the event loop
+    share a single task.
+
+    Attributes:
+        client (OmdbClient): The underlying pooled client.
+        max_concurrency (int): The maximal number of requests running at once.
+    """
+
+    def __init__(self, client: OmdbClient, max_concurrency: int = 10):
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._in_flight = {}
+
+    async def fetch_movie_data(self, title: str) -> dict:
+        """
+        Retrieves the decoded OMDb response for a movie title.
+
+        Args:
+            title (str): The title of the movie to search for.
+
+        Returns:
+            dict: The decoded OMDb response, "Response" is "False" when no movie was found.
+
+        Raises:
+            OmdbUnavailableError: If the API cannot be reached or responds with an error status.
+        """
+        key = normalize_title(title)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(title))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch(self, title: str) -> dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await asyncio.to_thread(self.client.fetch_movie_data, title)
+
+
+def parse_movie_data(response_obj: dict) -> dict | None:
+    """
+    Extracts movie fields from a decoded OMDb response.
+
+    Args:
+        response_obj (dict): The decoded OMDb response.
+
+    Returns:
+        dict | None: The name, director, year, rating and poster_url of the movie, None if no movie was found.
+    """
+    if response_obj.get("Response") != "True":
+        return None
+
+    director = response_obj.get("Director")
+    return {
+        "name": response_obj["Title"],
+        "director": director if director and director != "N/A" else None,
+        "year": get_valid_number_or_none(response_obj.get("Year", ""), int),
+        "rating": get_valid_number_or_none(response_obj.get("imdbRating", ""), float),
+        "poster_url": get_valid_url_or_none(response_obj.get("Poster", "")),
+    }
+
+
+def create_omdb_client(config) -> OmdbClient:
+    """
+    Creates the OMDb client from the application configuration.
+
+    Args:
+        config: The application configuration mapping.
+
+    Returns:
+        OmdbClient: The configured client with the response cache attached when enabled.
+    """
+    return OmdbClient(
+        api_key=config["API_KEY"],
+        base_url=config["OMDB_BASE_URL"],
+        timeout=(config["OMDB_CONNECT_TIMEOUT"], config["OMDB_READ_TIMEOUT"]),
+        retries=config["OMDB_RETRIES"],
+        backoff_factor=config["OMDB_BACKOFF_FACTOR"],
+        pool_size=config["OMDB_POOL_SIZE"],
+        cache=create_omdb_cache(config),
+    )
@@ -0,0 +1,131 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from data_manager.data_manager_interface import DataManagerInterface
+from omdb.client import OmdbClient, parse_movie_data
+from project.data_models import Movie, version_stamp
+from project.exceptions import OmdbUnavailableError
+from utils.text import normalize_title
+
+logger = logging.getLogger("omdb_enrichment")
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter spacing calls evenly to at most a given rate.
+
+    Attributes:
+        rate (float): The maximal number of calls per second.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._interval = 1 / rate
+        self._next_call_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """ Blocks until the next call is allowed. """
+        with self._lock:
+            now = time.monotonic()
+            call_at = max(now, self._next_call_at)
+            self._next_call_at = call_at + self._interval
+        if call_at > now:
+            time.sleep(call_at - now)
+
+
+def is_same_movie(movie: Movie, movie_data: dict) -> bool:
+    """
+    Checks that the OMDb details found by the title of a stored movie describe that movie,
+    not a remake or another film with a similar title.
+
+    Args:
+        movie (Movie): The stored movie.
+        movie_data (dict): The details parsed from the OMDb response.
+
+    Returns:
+        bool: True if the normalized titles are equal and so are the years, when both are known.
+    """
+    if normalize_title(movie_data["name"]) != normalize_title(movie.name):
+        return False
+    return movie.year is None or movie_data["year"] is None or movie_data["year"] == movie.year
+
+
+def enrich_incomplete_movies(data_manager: DataManagerInterface, client: OmdbClient, workers: int = 4,
+                             rate_limit: float = 5, batch_size: int = 100, limit: int | None = None,
+                             retry_after_days: float = 30,
+                             on_progress: Callable[[dict], None] | None = None) -> dict:
+    """
+    Fills missing director, year, rating and poster URL of stored movies from the OMDb API.
+
+    Incomplete movies are read in batches, their details are fetched concurrently by a bounded
+    thread pool respecting the rate limit, and each batch is written back in one batched update.
+    Details of another movie (different title, or year when known) are skipped. Movies answered
+    by OMDb are stamped as attempted and looked up again only after retry_after_days, so that details
+    OMDb does not know ("N/A") are not fetched on every run, movies failed by an OMDb error are retried.
+    Only the database access runs in the calling thread, so it needs an application context.
+
+    Args:
+        data_manager (DataManagerInterface): The data manager holding the movies.
+        client (OmdbClient): The OMDb client used to fetch the details.
+        workers (int): The number of concurrent OMDb requests.
+        rate_limit (float): The maximal number of OMDb requests per second.
+        batch_size (int): The number of movies fetched and updated at once.
+        limit (int | None): The maximal number of movies to process, None for all incomplete movies.
+        retry_after_days (float): The days after which a movie answered by OMDb is looked up again.
+        on_progress (Callable[[dict], None] | None): Called with the running summary after each batch.
+
+    Returns:
+        dict: The number of processed, updated, not found, mismatched and failed movies.
+    """
+    rate_limiter = RateLimiter(rate_limit)
+    summary = {"processed": 0, "updated": 0, "not_found": 0, "mismatched": 0, "failed": 0}
+    last_movie_id = None
+    attempted_before = version_stamp() - int(retry_after_days * 24 * 60 * 60 * 1000)
+
+    def fetch(title: str) -> dict | None:
+        rate_limiter.acquire()
+        return client.fetch_movie_data(title)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while limit is None or summary["processed"] < limit:
+            page_size = batch_size if limit is None else min(batch_size, limit - summary["processed"])
+            movies = data_manager.get_incomplete_movies(limit=page_size, after=last_movie_id,
+                                                        attempted_before=attempted_before)
+            if not movies:
+                break
+
+            last_movie_id = movies[-1].id
+            futures = [(movie, executor.submit(fetch, movie.name)) for movie in movies]
+            updates, attempted_movie_ids = [], []
+
+            for movie, future in futures:
+                try:
+                    movie_data = parse_movie_data(future.result())
+                except OmdbUnavailableError as error:
+                    logger.error(f"Fetching details of movie with ID: {movie.id} failed: {str(error)}")
+                    summary["failed"] += 1
+                    continue
+
+                if not movie_data:
+                    summary["not_found"] += 1
+                    attempted_movie_ids.append(movie.id)
+                elif not is_same_movie(movie, movie_data):
+                    logger.warning(f"OMDb details of '{movie_data['name']}' ({movie_data['year']}) do not match "
+                                   f"movie with ID: {movie.id}, skipped.")
+                    summary["mismatched"] += 1
+                    attempted_movie_ids.append(movie.id)
+                else:
+                    updates.append({**movie_data, "id": movie.id})
+
+            data_manager.update_movies_metadata(updates, attempted_movie_ids)
+            summary["processed"] += len(movies)
+            summary["updated"] += len(updates)
+            if on_progress:
+                on_progress(summary)
+
+    logger.info(f"Enrichment finished: {summary}")
+    return summary
@@ -0,0 +1,88 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from utils.text import normalize_title
+
+
+class OmdbStubServer:
+    """
+    Local stand-in for the OMDb API used by tests, benchmarks and load tests.
+
+    Serves movies from a dictionary on a random localhost port and answers
+    unknown titles with the "Movie not found!" response like the real API.
+
+    Attributes:
+        movies (dict): OMDb response objects keyed by the normalized movie title.
+        delay (float): Seconds to wait before answering each request.
+        fail_first (int): The number of first requests answered with 503 status.
+        request_count (int): The number of requests received so far.
+        url (str): The base URL of the running server.
+    """
+
+    def __init__(self, movies: dict | None = None, delay: float = 0, fail_first: int = 0):
+        self.movies = {normalize_title(title): movie for title, movie in (movies or {}).items()}
+        self.delay = delay
+        self.fail_first = fail_first
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub._lock:
+                    stub.request_count += 1
+                    failing = stub.request_count <= stub.fail_first
+
+                if stub.delay:
+                    time.sleep(stub.delay)
+
+                if failing:
+                    self._respond(503, {"Response": "False", "Error": "Service unavailable"})
+                    return
+
+                params = parse_qs(urlparse(self.path).query)
+                title = params.get("t", [""])[0]
+                movie = stub.movies.get(normalize_title(title))
+                if movie:
+                    self._respond(200, {**movie, "Response": "True"})
+                else:
+                    self._respond(200, {"Response": "False", "Error": "Movie not found!"})
+
+            def _respond(self, status: int, body: dict):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "OmdbStubServer":
+        """ Starts serving requests in a background thread. """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ Stops the server and releases its port. """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
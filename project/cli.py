@@ -0,0 +1,147 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from data_manager.data_manager_interface import DataManagerInterface
+from omdb.client import OmdbClient
+from omdb.enrichment import enrich_incomplete_movies
+from project.data_models import db, User
+from project.exceptions import DatabaseError
+from project.migrations import migrate
+from project.recommendations import rebuild_similarities
+from utils.movie_io import SUPPORTED_FORMATS, get_file_format, read_movie_rows, write_movie_rows
+from utils.poster_cache import PosterCache
+from utils.static_assets import build_assets
+
+
+def create_cli(data_manager: DataManagerInterface, omdb_client: OmdbClient,
+               poster_cache: PosterCache | None = None) -> AppGroup:
+    """
+    Creates the "flask moviweb" command group.
+
+    Args:
+        data_manager (DataManagerInterface): The data manager used by the commands.
+        omdb_client (OmdbClient): The OMDb client used to enrich movies.
+        poster_cache (PosterCache | None): The poster cache warmed by the commands, None when the proxy is disabled.
+
+    Returns:
+        AppGroup: The command group to register on the application.
+    """
+    moviweb_cli = AppGroup("moviweb", help="Moviweb maintenance commands.")
+
+    def get_user_or_fail(user_id: int) -> User:
+        user = db.session.get(User, user_id)
+        if not user:
+            raise click.ClickException(f"User with ID: {user_id} not found.")
+        return user
+
+    @moviweb_cli.command("migrate")
+    def migrate_database():
+        """Bring the schema of a database created by an earlier version up to date (run after every upgrade)."""
+        applied = migrate(db)
+        click.echo(f"Applied {len(applied)} migration steps: {', '.join(applied)}." if applied
+                   else "The database is up to date.")
+
+    @moviweb_cli.command("import")
+    @click.argument("user_id", type=int)
+    @click.argument("file", type=click.File("r", encoding="utf-8-sig"))
+    @click.option("--format", "file_format", type=click.Choice(SUPPORTED_FORMATS),
+                  help="Format of the file, derived from its extension by default.")
+    @click.option("--chunk-size", type=int, help="Rows stored in one transaction, IMPORT_CHUNK_SIZE by default.")
+    def import_movies(user_id: int, file, file_format: str | None, chunk_size: int | None):
+        """Import a CSV or JSON Lines movie list (e.g. a Letterboxd or IMDb export) for a user."""
+        user = get_user_or_fail(user_id)
+        chunk_size = chunk_size or current_app.config["IMPORT_CHUNK_SIZE"]
+        file_format = file_format or get_file_format(file.name, default="csv")
+
+        try:
+            summary = data_manager.import_user_movies(
+                user.id, read_movie_rows(file, file_format), chunk_size=chunk_size,
+                on_progress=lambda rows: click.echo(f"Processed {rows} rows...")
+            )
+        except (DatabaseError, ValueError) as error:
+            raise click.ClickException(str(error)) from error
+
+        click.echo(f"Imported {summary['rows']} rows for {user.name}: {summary['movies_added']} new movies, "
+                   f"{summary['movies_assigned']} assigned.")
+
+    @moviweb_cli.command("export")
+    @click.argument("user_id", type=int)
+    @click.argument("file", type=click.File("w", encoding="utf-8"), default="-")
+    @click.option("--format", "file_format", type=click.Choice(SUPPORTED_FORMATS),
+                  help="Format of the file, derived from its extension by default (CSV for standard output).")
+    def export_movies(user_id: int, file, file_format: str | None):
+        """Export the movie list of a user as CSV or JSON Lines."""
+        user = get_user_or_fail(user_id)
+        file_format = file_format or get_file_format(file.name, default="csv")
+
+        for line in write_movie_rows(data_manager.iter_user_movies(user.id), file_format):
+            file.write(line)
+
+    @moviweb_cli.command("enrich")
+    @click.option("--workers", type=int, help="Concurrent OMDb requests, ENRICH_WORKERS by default.")
+    @click.option("--rate-limit", type=float, help="Maximal OMDb requests per second, ENRICH_RATE_LIMIT by default.")
+    @click.option("--batch-size", default=100, show_default=True, help="Movies updated in one statement.")
+    @click.option("--limit", type=int, help="Maximal number of movies processed, all by default.")
+    def enrich_movies(workers: int | None, rate_limit: float | None, batch_size: int, limit: int | None):
+        """Fill missing director, year, rating and poster of stored movies from the OMDb API."""
+        workers = workers or current_app.config["ENRICH_WORKERS"]
+        rate_limit = rate_limit or current_app.config["ENRICH_RATE_LIMIT"]
+        try:
+            summary = enrich_incomplete_movies(
+                data_manager, omdb_client, workers=workers, rate_limit=rate_limit, batch_size=batch_size,
+                limit=limit, retry_after_days=current_app.config["ENRICH_RETRY_AFTER_DAYS"],
+                on_progress=lambda progress: click.echo(f"Processed {progress['processed']} movies...")
+            )
+        except DatabaseError as error:
+            raise click.ClickException(str(error)) from error
+
+        click.echo(f"Enriched {summary['updated']} of {summary['processed']} movies: "
+                   f"{summary['not_found']} not found, {summary['mismatched']} mismatched, {summary['failed']} failed.")
+
+    @moviweb_cli.command("build-assets")
+    def build_static_assets():
+        """Build the fingerprinted, minified and precompressed static assets into static/dist."""
+        manifest = build_assets(current_app.static_folder, os.path.join(current_app.static_folder, "dist"))
+        click.echo(f"Built {len(manifest)} assets.")
+
+    @moviweb_cli.command("warm-posters")
+    @click.option("--workers", default=4, show_default=True, help="Posters fetched concurrently.")
+    @click.option("--limit", type=int, help="Maximal number of posters processed, all by default.")
+    def warm_posters(workers: int, limit: int | None):
+        """Fetch and resize the posters of stored movies missing in the poster cache."""
+        if not poster_cache:
+            raise click.ClickException("Poster proxy is disabled (POSTER_PROXY_ENABLED) or Pillow is not installed.")
+
+        poster_urls = islice((url for url in data_manager.iter_poster_urls() if not poster_cache.is_cached(url)),
+                             limit)
+        processed = failed = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # submitted in batches, so that the URLs are not all held in memory at once
+            while batch := list(islice(poster_urls, workers * 25)):
+                for is_cached in executor.map(poster_cache.prefetch, batch):
+                    failed += not is_cached
+                processed += len(batch)
+                click.echo(f"Processed {processed} posters...")
+
+        click.echo(f"Cached {processed - failed} of {processed} posters: {failed} failed.")
+
+    @moviweb_cli.command("rebuild-recommendations")
+    @click.option("--top-k", type=int, help="Similar movies kept per movie, RECOMMENDATIONS_TOP_K by default.")
+    def rebuild_recommendations(top_k: int | None):
+        """Recompute the similar movies of all movies from the movie lists of the users (requires numpy and scipy)."""
+        top_k = top_k or current_app.config["RECOMMENDATIONS_TOP_K"]
+        try:
+            summary = rebuild_similarities(data_manager, top_k)
+        except (RuntimeError, DatabaseError) as error:
+            raise click.ClickException(str(error)) from error
+
+        click.echo(f"Stored {summary['similarities']} similar movies from {summary['assignments']} assignments "
+                   f"(loaded in {summary['load_seconds']:.1f} s, computed in {summary['compute_seconds']:.1f} s, "
+                   f"stored in {summary['store_seconds']:.1f} s).")
+
+    return moviweb_cli
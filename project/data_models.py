@@ -1,9 +1,24 @@
+import time
+
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import ForeignKey, String
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import DDL, BigInteger, Engine, ForeignKey, Index, String, event, table, column, make_url
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+
+from utils.text import normalize_title
 
 db = SQLAlchemy()
 
+
+def version_stamp() -> int:
+    """
+    Returns the version stamp of a change happening now.
+
+    Returns:
+        int: The current time in milliseconds since the epoch.
+    """
+    return time.time_ns() // 1_000_000
+
+
 class User(db.Model):
     """
     Represents a user in the database.
@@ -15,6 +30,8 @@ class User(db.Model):
     Attributes:
         id (int): The unique identifier for the user (Primary Key).
         name (str): The name of the user (must be unique).
+        movies_version (int): Version stamp of the user's movie list (milliseconds since the epoch of its last change),
+                              used to answer conditional requests of the list.
         user_movies (list[UserMovie]): A list of movies associated with the user, stored in the UserMovie table.
 
     Methods:
@@ -26,6 +43,7 @@ class User(db.Model):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(nullable=False, unique=True)
+    movies_version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0, server_default="0")
     user_movies: Mapped[list["UserMovie"]] = relationship("UserMovie", back_populates="user",
                                                           cascade="all, delete-orphan")
 
@@ -47,10 +65,15 @@ class Movie(db.Model):
     Attributes:
         id (int): The unique identifier for the movie (Primary Key).
         name (str): The name of the movie (must be unique).
+        name_normalized (str): Case-folded, whitespace-collapsed name kept in sync with name for indexed lookups.
         director (str): The director of the movie.
         year (int): The release year of the movie.
         rating (float): The rating of the movie (e.g., from IMDb).
         poster_url (str): The URL of the movie's poster.
+        version (int): Version stamp of the movie details (milliseconds since the epoch of their last change),
+                       used as a key of rendered fragments of the movie.
+        enrichment_attempted_at (int): Version stamp of the last lookup of the missing details in the OMDb API,
+                                       None when never looked up, so that unknown details are not fetched on every run.
         user_movies (list[UserMovie]): A list of users who have interacted with the movie, stored in the UserMovie table.
 
     Methods:
@@ -62,13 +85,21 @@ class Movie(db.Model):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(nullable=False, unique=True)
+    name_normalized: Mapped[str] = mapped_column(nullable=False, index=True)
     director: Mapped[str] = mapped_column(nullable=True)
     year: Mapped[int] = mapped_column(nullable=True)
     rating: Mapped[float] = mapped_column(nullable=True)
     poster_url: Mapped[str] = mapped_column(nullable=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=version_stamp, server_default="0")
+    enrichment_attempted_at: Mapped[int] = mapped_column(BigInteger, nullable=True)
     user_movies: Mapped[list["UserMovie"]] = relationship("UserMovie", back_populates="movie",
                                                           cascade="all, delete-orphan")
 
+    @validates("name")
+    def _sync_name_normalized(self, key, name):
+        self.name_normalized = normalize_title(name) if name is not None else None
+        return name
+
     def __str__(self):
         return f"{self.name}"
 
@@ -98,6 +129,8 @@ class UserMovie(db.Model):
     """
 
     __tablename__ = "user_movies"
+    # the users of a movie are looked up by the recommendations, the primary key serves the lists of a user
+    __table_args__ = (Index("ix_user_movies_movie_id_user_id", "movie_id", "user_id"),)
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
     movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id"), primary_key=True)
@@ -110,3 +143,153 @@ class UserMovie(db.Model):
 
     def __repr__(self):
         return f"UserMovie(id={self.id}, user_id={self.user_id}, movie_id={self.movie_id}, user_note={self.user_note})"
+
+
+class MovieSimilarity(db.Model):
+    """
+    Represents a movie similar to another movie, one of its top-k most similar movies.
+
+    The similarity is the cosine similarity of the sets of users having the movies in their lists
+    ("users who saved this also saved"), precomputed from the user_movies table.
+
+    Attributes:
+        movie_id (int): The ID of the movie (Foreign Key to Movie).
+        similar_movie_id (int): The ID of the similar movie (Foreign Key to Movie).
+        score (float): The cosine similarity of the movies, between 0 and 1.
+    """
+
+    __tablename__ = "movie_similarities"
+
+    movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id"), primary_key=True)
+    similar_movie_id: Mapped[int] = mapped_column(ForeignKey("movies.id"), primary_key=True, index=True)
+    score: Mapped[float] = mapped_column(nullable=False)
+
+    def __repr__(self):
+        return f"MovieSimilarity(movie_id={self.movie_id}, similar_movie_id={self.similar_movie_id}, score={self.score})"
+
+
+class Stat(db.Model):
+    """
+    Represents a named aggregated counter (e.g. number of users) or version stamp in the database.
+
+    On SQLite the counters are maintained by triggers in the same transaction as the counted rows,
+    so reading a count is a primary key lookup instead of a full table scan.
+
+    Attributes:
+        name (str): The name of the counter (Primary Key), e.g. "users", "movies" or "users_version".
+        value (int): The current value of the counter.
+    """
+
+    __tablename__ = "stats"
+
+    name: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"Stat(name={self.name}, value={self.value})"
+
+
+# Full-text index of movies, kept in sync with the movies table by triggers (SQLite FTS5).
+movies_fts = table("movies_fts", column("rowid"))
+
+MOVIES_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+        name, director, year, content='movies', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6', detail='column')""",
+    """CREATE TRIGGER IF NOT EXISTS movies_fts_after_insert AFTER INSERT ON movies BEGIN
+        INSERT INTO movies_fts(rowid, name, director, year) VALUES (new.id, new.name, new.director, new.year);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movies_fts_after_delete AFTER DELETE ON movies BEGIN
+        INSERT INTO movies_fts(movies_fts, rowid, name, director, year)
+        VALUES ('delete', old.id, old.name, old.director, old.year);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS movies_fts_after_update AFTER UPDATE OF name, director, year ON movies BEGIN
+        INSERT INTO movies_fts(movies_fts, rowid, name, director, year)
+        VALUES ('delete', old.id, old.name, old.director, old.year);
+        INSERT INTO movies_fts(rowid, name, director, year) VALUES (new.id, new.name, new.director, new.year);
+    END""",
+    "INSERT INTO movies_fts(movies_fts) VALUES ('rebuild')",
+]
+
+for statement in MOVIES_FTS_DDL:
+    event.listen(Movie.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+event.listen(Movie.__table__, "before_drop", DDL("DROP TABLE IF EXISTS movies_fts").execute_if(dialect="sqlite"))
+
+
+# Trigram indexes of movies for substring and similarity search on PostgreSQL (pg_trgm),
+# text_pattern_ops keeps the LIKE 'title%' prefix lookups on an index regardless of the collation.
+# Creating the extension needs a superuser (or the database owner on PostgreSQL 13+), a less privileged role
+# needs it created beforehand, see README.md.
+_MOVIES_TRGM_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_movies_name_normalized_pattern ON movies (name_normalized text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_movies_name_normalized_trgm ON movies USING gin (name_normalized gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_movies_director_trgm ON movies USING gin (lower(director) gin_trgm_ops)",
+]
+
+for statement in _MOVIES_TRGM_DDL:
+    event.listen(Movie.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+# Row counters of the users and movies tables, kept in the stats table by triggers.
+_STATS_DDL = [
+    "INSERT OR IGNORE INTO stats (name, value) VALUES ('users', (SELECT COUNT(*) FROM users))",
+    "INSERT OR IGNORE INTO stats (name, value) VALUES ('movies', (SELECT COUNT(*) FROM movies))",
+]
+for counted_table in ("users", "movies"):
+    _STATS_DDL += [
+        f"""CREATE TRIGGER IF NOT EXISTS {counted_table}_count_after_insert AFTER INSERT ON {counted_table} BEGIN
+            UPDATE stats SET value = value + 1 WHERE name = '{counted_table}';
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {counted_table}_count_after_delete AFTER DELETE ON {counted_table} BEGIN
+            UPDATE stats SET value = value - 1 WHERE name = '{counted_table}';
+        END""",
+    ]
+
+for statement in _STATS_DDL:
+    event.listen(db.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+
+def set_sqlite_pragmas(engine: Engine, pragmas: dict):
+    """
+    Applies the pragmas to every new connection of a SQLite engine.
+
+    Pragmas such as busy_timeout, synchronous or cache_size are per connection settings,
+    so they are set by a "connect" event hook before the pool hands the connection out.
+    Engines of other databases are left untouched.
+
+    Args:
+        engine (Engine): The engine to configure.
+        pragmas (dict): Pragma names mapped to their values, e.g. {"journal_mode": "WAL"}.
+    """
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas_on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def get_engine_options(database_uri: str, pool_options: dict) -> dict:
+    """
+    Returns the engine options of a database, the connection pool options only where they apply.
+
+    An in-memory SQLite database lives in a single connection held by a static pool,
+    which rejects sizing options such as pool_size or max_overflow.
+
+    Args:
+        database_uri (str): The SQLAlchemy URI of the database.
+        pool_options (dict): The options of a sized connection pool, e.g. {"pool_size": 5}.
+
+    Returns:
+        dict: The engine options, empty for an in-memory SQLite database.
+    """
+    url = make_url(database_uri)
+    is_in_memory = url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+    return {} if is_in_memory else dict(pool_options)
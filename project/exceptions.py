@@ -8,4 +8,16 @@ class UserNotUniqueError(Exception):
 
 class MovieNotFoundError(Exception):
     """Raised when a requested resource is not found in the database."""
-    pass
\ No newline at end of file
+    pass
+
+class UserMovieNotFoundError(Exception):
+    """Raised when a movie is not assigned to the user."""
+    pass
+
+class OmdbUnavailableError(Exception):
+    """Raised when the OMDb API cannot be reached or fails to respond."""
+    pass
+
+class PosterUnavailableError(Exception):
+    """Raised when a movie poster cannot be fetched from its origin or decoded."""
+    pass
@@ -0,0 +1,321 @@
+import functools
+import hmac
+import ipaddress
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+from flask import Flask, Response, current_app, g, has_app_context, has_request_context, request, \
+    template_rendered, before_render_template
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger("instrumentation")
+
+# upper bounds (seconds) of the histogram buckets
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram in the Prometheus data model.
+
+    Attributes:
+        name (str): The metric name.
+        help_text (str): The description of the metric.
+        label_name (str | None): The name of the single label, None for an unlabeled histogram.
+        buckets (tuple): The upper bounds of the buckets in ascending order.
+    """
+
+    def __init__(self, name: str, help_text: str, label_name: str | None = None, buckets: tuple = DURATION_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, label: str | None = None):
+        """
+        Records one observation.
+
+        Args:
+            value (float): The observed value.
+            label (str | None): The value of the label.
+        """
+        with self._lock:
+            series = self._series.setdefault(label, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self) -> list[str]:
+        """
+        Renders the histogram in the Prometheus text exposition format.
+
+        Returns:
+            list[str]: The lines of the histogram.
+        """
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            all_series = {label: {**series, "buckets": list(series["buckets"])}
+                          for label, series in self._series.items()}
+
+        for label, series in sorted(all_series.items(), key=lambda item: item[0] or ""):
+            labels = f'{self.label_name}="{_escape_label(label)}",' if self.label_name else ""
+            for bound, count in zip(self.buckets, series["buckets"]):
+                lines.append(f'{self.name}_bucket{{{labels}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels}le="+Inf"}} {series["count"]}')
+            label_set = f"{{{labels.rstrip(',')}}}" if labels else ""
+            lines.append(f"{self.name}_sum{label_set} {series['sum']}")
+            lines.append(f"{self.name}_count{label_set} {series['count']}")
+        return lines
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestMetrics:
+    """
+    Time spent by one request in the database, the OMDb API and template rendering.
+
+    Attributes:
+        started_at (float): The perf_counter() value at the start of the request.
+        timings (Counter): Seconds spent per component ("db", "omdb", "render").
+        counts (Counter): Number of operations per component.
+        statements (Counter): Executions of each SQL statement, used to detect N+1 query patterns.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.timings = Counter()
+        self.counts = Counter()
+        self.statements = Counter()
+
+    def add(self, component: str, seconds: float):
+        """
+        Adds the duration of one operation of a component.
+
+        Args:
+            component (str): The component, e.g. "db".
+            seconds (float): The duration of the operation.
+        """
+        self.timings[component] += seconds
+        self.counts[component] += 1
+
+
+class Instrumentation:
+    """
+    Per-request performance instrumentation.
+
+    Times every SQL statement (SQLAlchemy cursor events of all engines), template rendering
+    and functions decorated with timed(), sends the totals in the Server-Timing header, logs
+    slow queries, repeated statements (N+1 patterns) and a summary of every request, and
+    aggregates histograms exposed in the Prometheus text format.
+    Histograms are aggregated per process, work outside of an application context is not recorded.
+
+    Attributes:
+        slow_query_seconds (float): Statements running longer are logged as slow.
+        n_plus_one_threshold (int): Statements executed this many times in one request are logged as N+1 patterns.
+        server_timing (bool): Whether the Server-Timing header is sent.
+        metrics_token (str | None): The bearer token of the metrics scrapers.
+        metrics_networks (tuple): The networks of the clients allowed to read the metrics without the token.
+        histograms (dict[str, Histogram]): The aggregated metrics keyed by their short name.
+    """
+
+    def __init__(self, slow_query_seconds: float = 0.1, n_plus_one_threshold: int = 10, server_timing: bool = True,
+                 metrics_token: str | None = None, metrics_networks: tuple[str, ...] = ()):
+        self.slow_query_seconds = slow_query_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.server_timing = server_timing
+        self.metrics_token = metrics_token
+        self.metrics_networks = tuple(ipaddress.ip_network(network) for network in metrics_networks)
+        self.histograms = {
+            "request": Histogram("moviweb_request_duration_seconds", "Duration of requests.", "endpoint"),
+            "db": Histogram("moviweb_db_query_duration_seconds", "Duration of SQL statements."),
+            "queries": Histogram("moviweb_db_queries_per_request", "SQL statements executed per request.",
+                                 "endpoint", COUNT_BUCKETS),
+            "omdb": Histogram("moviweb_omdb_request_duration_seconds", "Duration of OMDb lookups."),
+            "render": Histogram("moviweb_template_render_duration_seconds", "Duration of template rendering.",
+                                "template"),
+        }
+
+    def init_app(self, app: Flask):
+        """
+        Registers the request hooks, SQLAlchemy events and template signals.
+
+        Args:
+            app (Flask): The application.
+        """
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        before_render_template.connect(self._start_render, app)
+        template_rendered.connect(self._finish_render, app)
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(Engine, "handle_error", _handle_error)
+        app.extensions["instrumentation"] = self
+
+    def _record(self, component: str, seconds: float, label: str | None = None):
+        if component in self.histograms:
+            self.histograms[component].observe(seconds, label)
+        metrics = g.get("request_metrics") if has_request_context() else None
+        if metrics:
+            metrics.add(component, seconds)
+
+    def _record_query(self, statement: str, seconds: float):
+        self._record("db", seconds)
+        metrics = g.get("request_metrics") if has_request_context() else None
+        if metrics:
+            metrics.statements[statement] += 1
+        if seconds >= self.slow_query_seconds:
+            logger.warning(f"Slow query ({seconds * 1000:.1f} ms): {' '.join(statement.split())[:500]}")
+
+    def _start_request(self):
+        g.request_metrics = RequestMetrics()
+
+    def _start_render(self, app: Flask, template, context, **extra):
+        if has_request_context():
+            g.setdefault("render_started_at", []).append(time.perf_counter())
+
+    def _finish_render(self, app: Flask, template, context, **extra):
+        started = g.get("render_started_at") if has_request_context() else None
+        if started:
+            self._record("render", time.perf_counter() - started.pop(), template.name or "<string>")
+
+    def _finish_request(self, response: Response) -> Response:
+        metrics = g.pop("request_metrics", None)
+        if metrics is None:
+            return response
+
+        elapsed = time.perf_counter() - metrics.started_at
+        endpoint = request.endpoint or "unknown"
+        queries = metrics.counts["db"]
+        self.histograms["request"].observe(elapsed, endpoint)
+        self.histograms["queries"].observe(queries, endpoint)
+
+        for statement, executions in metrics.statements.items():
+            if executions >= self.n_plus_one_threshold:
+                logger.warning(f"Possible N+1 query in {endpoint}, executed {executions} times: "
+                               f"{' '.join(statement.split())[:500]}")
+
+        if self.server_timing:
+            timings = [f'{component};dur={seconds * 1000:.2f};desc="count={metrics.counts[component]}"'
+                       for component, seconds in sorted(metrics.timings.items())]
+            timings.append(f"total;dur={elapsed * 1000:.2f}")
+            response.headers.add("Server-Timing", ", ".join(timings))
+
+        logger.info(f"{request.method} {endpoint} {response.status_code} in {elapsed * 1000:.1f} ms: "
+                    f"{queries} queries in {metrics.timings['db'] * 1000:.1f} ms")
+        return response
+
+    def is_metrics_client(self) -> bool:
+        """
+        Checks whether the client of the current request may read the metrics.
+
+        Returns:
+            bool: True if the request has the bearer token or comes from one of the metrics networks.
+        """
+        authorization = request.headers.get("Authorization", "")
+        if self.metrics_token and hmac.compare_digest(authorization.encode(), f"Bearer {self.metrics_token}".encode()):
+            return True
+        try:
+            address = ipaddress.ip_address(request.remote_addr or "")
+        except ValueError:
+            return False
+        return any(address in network for network in self.metrics_networks)
+
+    def render_metrics(self) -> str:
+        """
+        Renders all histograms in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page.
+        """
+        lines = []
+        for histogram in self.histograms.values():
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+def _current_instrumentation() -> Instrumentation | None:
+    # the cursor events and timed functions report to the instrumentation of the current application
+    return current_app.extensions.get("instrumentation") if has_app_context() else None
+
+
+def timed(component: str) -> Callable:
+    """
+    Decorates a function, so that its duration is added to the component of the current request.
+
+    Args:
+        component (str): The component, e.g. "omdb", also the name of its histogram.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                instrumentation = _current_instrumentation()
+                if instrumentation:
+                    instrumentation._record(component, time.perf_counter() - started_at)
+
+        return wrapper
+
+    return decorator
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    instrumentation = _current_instrumentation()
+    if instrumentation:
+        instrumentation._record_query(statement, elapsed)
+
+
+def _handle_error(exception_context):
+    # a failed statement never reaches after_cursor_execute, its start time is dropped here
+    connection = exception_context.connection
+    if connection is not None and exception_context.execution_context is not None:
+        started = connection.info.get("query_started_at")
+        if started:
+            started.pop()
+
+
+def create_instrumentation(config) -> Instrumentation | None:
+    """
+    Creates the instrumentation from the application configuration.
+
+    Args:
+        config: The application configuration mapping.
+
+    Returns:
+        Instrumentation | None: The configured instrumentation, None when it is disabled.
+    """
+    if not config.get("INSTRUMENTATION_ENABLED"):
+        return None
+
+    return Instrumentation(
+        slow_query_seconds=config["SLOW_QUERY_MS"] / 1000,
+        n_plus_one_threshold=config["N_PLUS_ONE_THRESHOLD"],
+        server_timing=config["SERVER_TIMING_ENABLED"],
+        metrics_token=config.get("METRICS_TOKEN"),
+        metrics_networks=tuple(config.get("METRICS_ALLOWED_NETWORKS", ())),
+    )
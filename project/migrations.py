@@ -0,0 +1,123 @@
+import logging
+from typing import Callable
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Connection, inspect, text
+
+from project.data_models import MOVIES_FTS_DDL, Movie, UserMovie
+from utils.text import normalize_title
+
+logger = logging.getLogger("migrations")
+
+# rows of an existing table updated by one statement of a backfill
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _has_column(connection: Connection, table_name: str, column_name: str) -> bool:
+    return any(column["name"] == column_name for column in inspect(connection).get_columns(table_name))
+
+
+def _create_missing_index(connection: Connection, table, index_name: str) -> bool:
+    """ Creates an index of the models missing in the database, returns whether it was created. """
+    if any(index["name"] == index_name for index in inspect(connection).get_indexes(table.name)):
+        return False
+    next(index for index in table.indexes if index.name == index_name).create(connection)
+    return True
+
+
+def add_movies_name_normalized(connection: Connection) -> bool:
+    """
+    Adds the normalized title of the movies, fills it from the titles and indexes it.
+
+    The column gets an empty default, so that it can be added as NOT NULL to a table with rows,
+    the rows still holding the default are filled in batches, so an interrupted run is completed by the next one.
+    """
+    changed = False
+    if not _has_column(connection, "movies", "name_normalized"):
+        connection.execute(text("ALTER TABLE movies ADD COLUMN name_normalized VARCHAR NOT NULL DEFAULT ''"))
+        changed = True
+
+    last_id = 0
+    while rows := connection.execute(
+        text("SELECT id, name FROM movies WHERE name_normalized = '' AND id > :last_id ORDER BY id LIMIT :limit"),
+        {"last_id": last_id, "limit": BACKFILL_BATCH_SIZE}
+    ).all():
+        connection.execute(text("UPDATE movies SET name_normalized = :name_normalized WHERE id = :id"),
+                           [{"id": movie_id, "name_normalized": normalize_title(name)} for movie_id, name in rows])
+        last_id = rows[-1].id
+        changed = True
+
+    return _create_missing_index(connection, Movie.__table__, "ix_movies_name_normalized") or changed
+
+
+def add_movies_fts(connection: Connection) -> bool:
+    """ Creates the SQLite full-text index of the movies with its triggers and indexes the existing movies. """
+    if connection.dialect.name != "sqlite" or inspect(connection).has_table("movies_fts"):
+        return False
+    for statement in MOVIES_FTS_DDL:
+        connection.exec_driver_sql(statement)
+    return True
+
+
+def add_movies_enrichment_attempted_at(connection: Connection) -> bool:
+    """ Adds the stamp of the last OMDb lookup of the movies, all movies start as never looked up. """
+    if _has_column(connection, "movies", "enrichment_attempted_at"):
+        return False
+    connection.execute(text("ALTER TABLE movies ADD COLUMN enrichment_attempted_at BIGINT"))
+    return True
+
+
+def add_users_movies_version(connection: Connection) -> bool:
+    """ Adds the version stamp of the movie lists, the existing lists start at version 0. """
+    if _has_column(connection, "users", "movies_version"):
+        return False
+    connection.execute(text("ALTER TABLE users ADD COLUMN movies_version BIGINT NOT NULL DEFAULT 0"))
+    return True
+
+
+def add_movies_version(connection: Connection) -> bool:
+    """ Adds the version stamp of the movie details, the existing movies start at version 0. """
+    if _has_column(connection, "movies", "version"):
+        return False
+    connection.execute(text("ALTER TABLE movies ADD COLUMN version BIGINT NOT NULL DEFAULT 0"))
+    return True
+
+
+def add_user_movies_movie_id_index(connection: Connection) -> bool:
+    """ Indexes the users of each movie, looked up by the recommendations. """
+    return _create_missing_index(connection, UserMovie.__table__, "ix_user_movies_movie_id_user_id")
+
+
+# Steps bringing a database created by an earlier version up to date, in the order of the schema changes.
+# Every step checks the current schema first, so the steps can be run again on an up-to-date database.
+MIGRATIONS: list[tuple[str, Callable[[Connection], bool]]] = [
+    ("movies.name_normalized", add_movies_name_normalized),
+    ("movies_fts", add_movies_fts),
+    ("movies.enrichment_attempted_at", add_movies_enrichment_attempted_at),
+    ("users.movies_version", add_users_movies_version),
+    ("movies.version", add_movies_version),
+    ("ix_user_movies_movie_id_user_id", add_user_movies_movie_id_index),
+]
+
+
+def migrate(db: SQLAlchemy) -> list[str]:
+    """
+    Brings the schema of an existing database up to date with the models.
+
+    db.create_all() creates the missing tables only, it never changes an existing table,
+    so the columns, indexes and triggers added to existing tables are added by the MIGRATIONS steps.
+
+    Args:
+        db (SQLAlchemy): The database of the application, used inside an application context.
+
+    Returns:
+        list[str]: The names of the steps that changed the database.
+    """
+    applied = []
+    with db.engine.begin() as connection:
+        db.metadata.create_all(connection)
+        for name, step in MIGRATIONS:
+            if step(connection):
+                logger.info(f"Migration step {name} was applied.")
+                applied.append(name)
+    return applied
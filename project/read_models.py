@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+
+from project.data_models import Movie, UserMovie
+
+
+@dataclass(slots=True, frozen=True)
+class MovieCard:
+    """
+    Read-only view of a movie in a user's movie list, as shown on a movie card.
+
+    Unlike a Movie ORM instance it is not tracked by the session and holds
+    only the displayed values, so large lists are cheap to load and render.
+
+    Attributes:
+        id (int): The unique identifier of the movie.
+        name (str): The name of the movie.
+        director (str | None): The director of the movie.
+        year (int | None): The release year of the movie.
+        rating (float | None): The rating of the movie.
+        poster_url (str | None): The URL of the movie's poster.
+        version (int): The version stamp of the movie details.
+        user_note (str | None): The note of the user for the movie.
+    """
+    id: int
+    name: str
+    director: str | None
+    year: int | None
+    rating: float | None
+    poster_url: str | None
+    version: int
+    user_note: str | None
+
+
+# Selected columns in the order of the MovieCard fields
+MOVIE_CARD_COLUMNS = (Movie.id, Movie.name, Movie.director, Movie.year, Movie.rating, Movie.poster_url,
+                      Movie.version, UserMovie.user_note)
@@ -0,0 +1,204 @@
+import logging
+import time
+from typing import Iterator
+
+from flask import Flask
+
+from data_manager.data_manager_interface import DataManagerInterface
+from utils.background_queue import BackgroundQueue
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # NumPy and SciPy are optional, without them the similarities are only refreshed incrementally
+    np = sparse = None
+
+logger = logging.getLogger("recommendations")
+
+# movies whose similarities are computed in one sparse matrix product, bounds the memory of the product
+SIMILARITY_BLOCK_SIZE = 512
+
+
+def compute_similarities(user_ids, movie_ids, top_k: int, block_size: int = SIMILARITY_BLOCK_SIZE) -> tuple:
+    """
+    Computes the top-k most similar movies of every movie from the assignments of movies to users.
+
+    The assignments form a sparse binary user × movie matrix, its columns are scaled to unit length,
+    so that the product of its transpose with itself holds the cosine similarities of the movies
+    (common users / sqrt(users of the first movie * users of the second movie)).
+    The product is computed for blocks of movies and reduced to the top-k of each movie right away,
+    so the full movie × movie matrix is never held in memory.
+
+    Args:
+        user_ids: The user IDs of the assignments (array-like of integers).
+        movie_ids: The movie IDs of the assignments, in the order of user_ids.
+        top_k (int): The number of similar movies kept per movie.
+        block_size (int): The number of movies whose similarities are computed at once.
+
+    Returns:
+        tuple: The arrays of movie IDs, similar movie IDs and scores,
+        the most similar movie of each movie first.
+
+    Raises:
+        RuntimeError: If NumPy or SciPy is not installed.
+    """
+    if sparse is None:
+        raise RuntimeError("NumPy and SciPy are required to compute the similar movies.")
+
+    movies, movie_columns = np.unique(np.asarray(movie_ids, dtype=np.int64), return_inverse=True)
+    users, user_rows = np.unique(np.asarray(user_ids, dtype=np.int64), return_inverse=True)
+    # duplicates are summed by the constructor, so the values are reset to keep the matrix binary
+    matrix = sparse.csr_matrix(
+        (np.ones(len(movie_columns), dtype=np.float32), (user_rows, movie_columns)),
+        shape=(len(users), len(movies))
+    )
+    matrix.data[:] = 1
+    users_counts = np.asarray(matrix.sum(axis=0)).ravel()
+    normalized = (matrix @ sparse.diags((1 / np.sqrt(np.maximum(users_counts, 1))).astype(np.float32))).tocsc()
+    normalized_transposed = normalized.T.tocsr()
+
+    movie_indexes, similar_indexes, scores = [], [], []
+    for block_start in range(0, len(movies), block_size):
+        block = (normalized_transposed[block_start:block_start + block_size] @ normalized).tocsr()
+        block.sort_indices()
+        for row in range(block.shape[0]):
+            start, end = block.indptr[row], block.indptr[row + 1]
+            row_columns, row_scores = block.indices[start:end], block.data[start:end]
+            is_other = row_columns != block_start + row
+            row_columns, row_scores = row_columns[is_other], row_scores[is_other]
+            if len(row_scores) > top_k:
+                # all movies tied with the k-th score are kept, so the ties are cut by the movie ID below
+                kth_score = -np.partition(-row_scores, top_k - 1)[top_k - 1]
+                is_top = row_scores >= kth_score
+                row_columns, row_scores = row_columns[is_top], row_scores[is_top]
+            # the most similar first, ties by the lower movie ID
+            order = np.lexsort((row_columns, -row_scores))[:top_k]
+            movie_indexes.append(np.full(len(order), block_start + row))
+            similar_indexes.append(row_columns[order])
+            scores.append(row_scores[order])
+
+    if not movie_indexes:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    return (movies[np.concatenate(movie_indexes)], movies[np.concatenate(similar_indexes)],
+            np.minimum(np.concatenate(scores), 1))
+
+
+def _iter_similarities(movie_ids, similar_movie_ids, scores,
+                       chunk_size: int = 10_000) -> Iterator[tuple[int, int, float]]:
+    """ Converts the similarity arrays to (movie ID, similar movie ID, score) triples one chunk at a time. """
+    for start in range(0, len(movie_ids), chunk_size):
+        end = start + chunk_size
+        yield from zip(movie_ids[start:end].tolist(), similar_movie_ids[start:end].tolist(),
+                       scores[start:end].tolist())
+
+
+def rebuild_similarities(data_manager: DataManagerInterface, top_k: int) -> dict:
+    """
+    Recomputes the similar movies of all movies and replaces the stored ones.
+
+    The similarities are computed before the storing transaction starts,
+    so the database is locked only for the time of the inserts.
+
+    Args:
+        data_manager (DataManagerInterface): The data manager the assignments are read from and stored to.
+        top_k (int): The number of similar movies kept per movie.
+
+    Returns:
+        dict: The number of assignments, stored similar movies and the seconds spent loading,
+        computing and storing them.
+
+    Raises:
+        RuntimeError: If NumPy or SciPy is not installed.
+        DatabaseError: If storing the similarities fails.
+    """
+    if sparse is None:
+        raise RuntimeError("NumPy and SciPy are required to compute the similar movies.")
+
+    started_at = time.perf_counter()
+    pairs = np.fromiter(data_manager.iter_user_movie_pairs(), dtype=np.dtype((np.int64, 2)))
+    loaded_at = time.perf_counter()
+    similarities = compute_similarities(pairs[:, 0], pairs[:, 1], top_k)
+    computed_at = time.perf_counter()
+    stored = data_manager.replace_movie_similarities(_iter_similarities(*similarities))
+    stored_at = time.perf_counter()
+
+    return {
+        "assignments": len(pairs),
+        "similarities": stored,
+        "load_seconds": loaded_at - started_at,
+        "compute_seconds": computed_at - loaded_at,
+        "store_seconds": stored_at - computed_at,
+    }
+
+
+class SimilarityRefreshQueue(BackgroundQueue):
+    """
+    Queue of movie assignments whose similar movies are refreshed by a background worker.
+
+    Refreshing recomputes the co-occurrences of the assigned movie, which costs more than
+    the assignment itself, so it happens after the response instead of inside the request.
+    The worker wakes up with every accepted assignment, the remaining ones are refreshed at interpreter exit.
+    A refresh lost to an error or a restart is caught up by the next full rebuild.
+
+    Attributes:
+        top_k (int): The number of similar movies kept per movie.
+    """
+    thread_name = "similarity-refresher"
+
+    def __init__(self, app: Flask, data_manager: DataManagerInterface, top_k: int = 20):
+        super().__init__(app)
+        self.top_k = top_k
+        self._data_manager = data_manager
+
+    def enqueue(self, user_id: int, movie_id: int):
+        """
+        Accepts an assignment of a movie to a user to be refreshed by the worker.
+
+        Args:
+            user_id (int): The ID of the user.
+            movie_id (int): The ID of the assigned movie.
+        """
+        self._put((user_id, movie_id), None)
+
+    def refresh(self) -> int:
+        """
+        Refreshes the similar movies of all pending assignments.
+
+        Returns:
+            int: The number of refreshed assignments.
+        """
+        assignments = self._take_pending()
+
+        refreshed = 0
+        with self._app.app_context():
+            for user_id, movie_id in assignments:
+                try:
+                    self._data_manager.refresh_movie_similarities(user_id, movie_id, self.top_k)
+                    refreshed += 1
+                except Exception:
+                    logger.exception(f"Refreshing similar movies of movie with ID: {movie_id} failed.")
+        return refreshed
+
+    def _process_pending(self) -> int:
+        return self.refresh()
+
+
+def create_similarity_refresh_queue(app: Flask, data_manager: DataManagerInterface) -> SimilarityRefreshQueue | None:
+    """
+    Creates the refresh queue of the similar movies from the application configuration.
+
+    The queue is registered as the on_movie_assigned listener of the data manager,
+    so the assignments of every write path (a single movie, an import) are refreshed.
+
+    Args:
+        app (Flask): The application providing the configuration and the context of the worker.
+        data_manager (DataManagerInterface): The data manager refreshing the similarities.
+
+    Returns:
+        SimilarityRefreshQueue | None: The configured queue, None when the recommendations are disabled.
+    """
+    if not app.config.get("RECOMMENDATIONS_ENABLED"):
+        return None
+    queue = SimilarityRefreshQueue(app, data_manager, top_k=app.config["RECOMMENDATIONS_TOP_K"])
+    data_manager.on_movie_assigned = queue.enqueue
+    return queue
@@ -1,5 +1,8 @@
 document.addEventListener("DOMContentLoaded", () => {
     const MAX_NOTE_LENGTH = 120;
+    const TYPEAHEAD_DELAY_MS = 200;
+    const TYPEAHEAD_MIN_LENGTH = 2;
+    const NEXT_PAGE_PRELOAD_MARGIN = "400px";
 
     const hamburger = document.querySelector(".navbar-burger");
     const menu = document.querySelector("#main-menu");
@@ -17,6 +20,8 @@ document.addEventListener("DOMContentLoaded", () => {
     const saveNoteButton = document.querySelector("#save-note-button");
     const cancelNoteButton = document.querySelector("#cancel-note-button");
 
+    const similarMoviesSection = document.querySelector("#similar-movies-section");
+
     /**
      * Show the section with a note and hide all other sections.
      */
@@ -96,6 +101,11 @@ document.addEventListener("DOMContentLoaded", () => {
         // note cleanup
         addNoteToTextarea("");
         addNoteText("");
+        // similar movies cleanup
+        if (similarMoviesSection) {
+            similarMoviesSection.dataset.movieId = "";
+            setSimilarMovies([], null);
+        }
     }
 
     /**
@@ -187,6 +197,47 @@ document.addEventListener("DOMContentLoaded", () => {
         $modal.querySelector("#update-movie-button").href = updateButtonHref;
         $modal.querySelector("#delete-movie-button").href = deleteButtonHref;
         $modal.querySelector("#add-note-form").action = addNoteAction;
+
+        loadSimilarMovies(movieId, userId);
+    }
+
+    /**
+     * Replace the similar movies shown in the movie modal with links adding them to the user's list.
+     * The section is hidden when there are no similar movies.
+     * @param movies similar movies returned from the similar movies endpoint
+     * @param userId ID of the user whose list is shown
+     */
+    function setSimilarMovies(movies, userId) {
+        similarMoviesSection.querySelector("#similar-movies").replaceChildren(...movies.map((movie) => {
+            const $tag = document.createElement("a");
+            $tag.className = "tag is-link is-light";
+            $tag.href = `/users/${userId}/add_movie?${new URLSearchParams({title: movie.name})}`;
+            $tag.textContent = movie.year ? `${movie.name} (${movie.year})` : movie.name;
+            return $tag;
+        }));
+        similarMoviesSection.classList.toggle("is-hidden", movies.length === 0);
+    }
+
+    /**
+     * Fetch the movies most often saved together with the movie shown in the modal.
+     * @param movieId ID of the movie shown in the modal
+     * @param userId ID of the user whose list is shown
+     */
+    function loadSimilarMovies(movieId, userId) {
+        if (!similarMoviesSection) {
+            return;
+        }
+        similarMoviesSection.dataset.movieId = movieId;
+
+        fetch(`/api/movies/${movieId}/similar`)
+            .then(response => response.json())
+            .then(data => {
+                // ignore a late response when the modal shows another movie or was closed
+                if (similarMoviesSection.dataset.movieId === movieId) {
+                    setSimilarMovies(data.movies, userId);
+                }
+            })
+            .catch(error => console.error("Error:", error));
     }
 
     /**
@@ -247,10 +298,10 @@ document.addEventListener("DOMContentLoaded", () => {
                 if (data.success) {
                     showNoteSection()
                     addNoteText(data.note);
-                    // update the data-movie-note of js-modal-trigger
+                    // update the data-movie-note of the card holding the js-modal-trigger
                     const noteMovieId = this.getAttribute("data-movie-id");
                     const modalTrigger = document.querySelector(`.js-modal-trigger[data-movie-id="${noteMovieId}"]`);
-                    modalTrigger.setAttribute("data-movie-note", data.note);
+                    modalTrigger.closest(".js-movie-card").setAttribute("data-movie-note", data.note);
                 } else {
                     displayNoteValidation(data.error);
                 }
@@ -296,6 +347,113 @@ document.addEventListener("DOMContentLoaded", () => {
         addNoteToTextarea(noteText);
     }
 
+    /**
+     * Replace options of the datalist bound to the typeahead input with movie names.
+     * @param $input typeahead input element
+     * @param movies movies returned from the search endpoint
+     */
+    function setTypeaheadSuggestions($input, movies) {
+        const $datalist = document.getElementById($input.getAttribute("list"));
+        $datalist.replaceChildren(...movies.map((movie) => {
+            const $option = document.createElement("option");
+            $option.value = movie.name;
+            $option.label = movie.year ? `${movie.name} (${movie.year})` : movie.name;
+            return $option;
+        }));
+    }
+
+    /**
+     * Handle typing into a typeahead input: after a short pause search the local
+     * movie catalog and offer matching movies as suggestions.
+     * @param event input event of the typeahead input
+     */
+    function handleTypeahead(event) {
+        const $input = event.target;
+        const query = $input.value.trim();
+
+        clearTimeout($input.typeaheadTimeout);
+        if (query.length < TYPEAHEAD_MIN_LENGTH) {
+            setTypeaheadSuggestions($input, []);
+            return;
+        }
+
+        $input.typeaheadTimeout = setTimeout(() => {
+            const url = `${$input.dataset.typeaheadUrl}?${new URLSearchParams({q: query})}`;
+            fetch(url)
+                .then(response => response.json())
+                .then(data => setTypeaheadSuggestions($input, data.movies))
+                .catch(error => console.error("Error:", error));
+        }, TYPEAHEAD_DELAY_MS);
+    }
+
+    /**
+     * Fetch the next page of the card grid and append its cards to the grid.
+     * The link is updated to the following page, or removed after the last page.
+     * @param $link "Load more" link holding the URL of the next page
+     * @param observer intersection observer watching the link
+     */
+    function loadNextPage($link, observer) {
+        if ($link.classList.contains("is-loading")) {
+            return;
+        }
+        $link.classList.add("is-loading");
+
+        const url = new URL($link.href, window.location.href);
+        url.searchParams.set("partial", "1");
+
+        fetch(url)
+            .then(response => response.text().then(html => ({html, nextPageUrl: response.headers.get("X-Next-Page")})))
+            .then(({html, nextPageUrl}) => {
+                document.querySelector(".js-card-grid").insertAdjacentHTML("beforeend", html);
+                if (nextPageUrl) {
+                    $link.href = nextPageUrl;
+                    // re-observe, so that a link still in view triggers loading of the following page
+                    observer.unobserve($link);
+                    observer.observe($link);
+                } else {
+                    observer.disconnect();
+                    $link.parentNode.remove();
+                }
+            })
+            .catch(error => console.error("Error:", error))
+            .finally(() => $link.classList.remove("is-loading"));
+    }
+
+    /**
+     * Fetch the movies recommended to the user and show them in the recommendations section,
+     * the section stays hidden when there are no recommendations.
+     * @param $section section holding the URL of the recommendations
+     */
+    function loadRecommendations($section) {
+        fetch($section.dataset.recommendationsUrl)
+            .then(response => response.ok ? response.text() : "")
+            .then(html => {
+                if (html.trim()) {
+                    $section.innerHTML = html;
+                    $section.classList.remove("is-hidden");
+                }
+            })
+            .catch(error => console.error("Error:", error));
+    }
+
+    /**
+     * Load next pages of the card grid when the "Load more" link scrolls into view or is clicked.
+     * @param $link "Load more" link holding the URL of the next page
+     */
+    function setUpInfiniteScroll($link) {
+        const observer = new IntersectionObserver((entries) => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                loadNextPage($link, observer);
+            }
+        }, {rootMargin: NEXT_PAGE_PRELOAD_MARGIN});
+
+        observer.observe($link);
+        $link.addEventListener("click", (event) => {
+            event.preventDefault();
+            loadNextPage($link, observer);
+        });
+    }
+
     // *** EVENT LISTENERS ***
 
     hamburger.addEventListener("click", handleHamburgerMenuToggle);
@@ -305,6 +463,10 @@ document.addEventListener("DOMContentLoaded", () => {
     cancelNoteButton.addEventListener("click", handleCancelNote);
     editNoteButton.addEventListener("click", handleEditNote);
 
+    (document.querySelectorAll("[data-typeahead-url]") || []).forEach(($input) => {
+        $input.addEventListener("input", handleTypeahead);
+    });
+
     // *** MODAL EVENTS ***
 
     // remove notification from page upon clicking on the delete button
@@ -316,17 +478,24 @@ document.addEventListener("DOMContentLoaded", () => {
         });
     });
 
-    // add a click event on buttons to open a specific modal
-    (document.querySelectorAll(".js-modal-trigger") || []).forEach(($trigger) => {
-        const modalData = $trigger.dataset;
-        const modal = $trigger.dataset.target;
-        const $target = document.getElementById(modal);
-
-        $trigger.addEventListener("click", () => {
-            openModal($target, modalData);
-        });
+    // add a click event on buttons to open a specific modal,
+    // delegated to the document to cover cards appended by infinite scrolling;
+    // the cached card holds the movie data, the user's data and note are kept on the grid and the card
+    document.addEventListener("click", (event) => {
+        const $trigger = event.target.closest(".js-modal-trigger");
+        if ($trigger) {
+            const data = {
+                ...$trigger.closest(".js-card-grid").dataset,
+                ...$trigger.closest(".js-movie-card").dataset,
+                ...$trigger.dataset
+            };
+            openModal(document.getElementById($trigger.dataset.target), data);
+        }
     });
 
+    (document.querySelectorAll(".js-next-page") || []).forEach(setUpInfiniteScroll);
+    (document.querySelectorAll(".js-recommendations") || []).forEach(loadRecommendations);
+
     // add a click event on various child elements to close the parent modal
     (document.querySelectorAll(".modal-background, .modal-close") || [])
         .forEach(($close) => {
@@ -0,0 +1,246 @@
+"""
+Behaviour shared by all DataManagerInterface backends, every test runs once per backend
+(PostgreSQL only when MOVIWEB_TEST_POSTGRES_URI is set, see the any_data_manager fixture).
+"""
+import pytest
+
+from project.data_models import Movie, MovieSimilarity, User
+from project.exceptions import UserNotUniqueError
+from project.recommendations import rebuild_similarities
+
+
+def test_adding_users_and_counting_them(any_data_manager):
+    """
+    GIVEN an empty database
+    WHEN two users are added and adding a duplicate name is attempted
+    THEN the duplicate is rejected and both users are listed and counted
+    """
+    any_data_manager.add_user(User(name="Alice"))
+    any_data_manager.add_user(User(name="Bob"))
+
+    with pytest.raises(UserNotUniqueError):
+        any_data_manager.add_user(User(name="Alice"))
+
+    assert [user.name for user in any_data_manager.get_all_users()] == ["Alice", "Bob"]
+    assert any_data_manager.get_all_users_count() == 2
+
+
+def test_adding_movie_for_user_is_idempotent(any_data_manager):
+    """
+    GIVEN a user and a movie already stored for another user
+    WHEN the movie is added to the user twice
+    THEN it is assigned once and no duplicate movie is stored
+    """
+    alice, bob = User(name="Alice"), User(name="Bob")
+    any_data_manager.add_user(alice)
+    any_data_manager.add_user(bob)
+    any_data_manager.add_movie_for_user(alice.id, Movie(name="Heat", year=1995))
+
+    assert any_data_manager.add_movie_for_user(bob.id, Movie(name="Heat")) is True
+    assert any_data_manager.add_movie_for_user(bob.id, Movie(name="Heat")) is False
+    assert [movie.year for movie in any_data_manager.get_user_movies(bob.id)] == [1995]
+    assert any_data_manager.get_all_movies_count() == 1
+
+
+def test_importing_movies_skips_existing_ones(any_data_manager):
+    """
+    GIVEN a user with one movie
+    WHEN a list with the same and two new movies is imported
+    THEN only the new movies are added and assigned
+    """
+    user = User(name="Alice")
+    any_data_manager.add_user(user)
+    any_data_manager.add_movie_for_user(user.id, Movie(name="Heat"))
+
+    summary = any_data_manager.import_user_movies(
+        user.id, [{"name": "Heat"}, {"name": "Alien", "note": "scary"}, {"name": "Ran"}], chunk_size=2
+    )
+
+    assert summary == {"rows": 3, "movies_added": 2, "movies_assigned": 2}
+    assert [movie.name for movie in any_data_manager.iter_user_movies(user.id, batch_size=2)] == \
+           ["Heat", "Alien", "Ran"]
+
+
+def test_new_assignments_are_passed_to_listener(any_data_manager):
+    """
+    GIVEN a data manager with an assignment listener
+    WHEN movies are assigned to a user one at a time, again and by an import
+    THEN the listener receives every new assignment once
+    """
+    assignments = []
+    any_data_manager.on_movie_assigned = lambda user_id, movie_id: assignments.append((user_id, movie_id))
+    user, heat, alien = User(name="Alice"), Movie(name="Heat"), Movie(name="Alien")
+    any_data_manager.add_user(user)
+    any_data_manager.add_movie(alien)
+
+    any_data_manager.add_movie_for_user(user.id, heat)
+    any_data_manager.add_movie_for_user(user.id, Movie(name="Heat"))
+    any_data_manager.add_movie_to_user(user.id, alien)
+    any_data_manager.import_user_movies(user.id, [{"name": "Heat"}, {"name": "Ran"}])
+
+    ran = any_data_manager.get_movie_by_title("Ran")
+    assert assignments == [(user.id, heat.id), (user.id, alien.id), (user.id, ran.id)]
+
+
+def test_looking_up_movie_by_title(any_data_manager):
+    """
+    GIVEN movies whose titles share a prefix
+    WHEN movies are looked up by an exact title, a prefix and a substring
+    THEN the exact match, the first prefix match and the substring match are returned
+    """
+    for name in ("The Matrix Reloaded", "The Matrix", "The Shawshank Redemption"):
+        any_data_manager.add_movie(Movie(name=name))
+
+    assert any_data_manager.get_movie_by_title("THE matrix").name == "The Matrix"
+    assert any_data_manager.get_movie_by_title("the matrix r").name == "The Matrix Reloaded"
+    assert any_data_manager.get_movie_by_title("shawshank") is None
+    assert any_data_manager.get_movie_by_title("shawshank", allow_substring=True).name == "The Shawshank Redemption"
+
+
+def test_searching_movies_ranks_title_matches_first(any_data_manager):
+    """
+    GIVEN movies matching the search text in the title or the director
+    WHEN movies are searched
+    THEN title matches come first and unmatched movies are left out
+    """
+    any_data_manager.add_movie(Movie(name="Heat", director="Michael Mann"))
+    any_data_manager.add_movie(Movie(name="The Insider", director="Michael Mann"))
+    any_data_manager.add_movie(Movie(name="Manhunter", director="Michael Mann"))
+    any_data_manager.add_movie(Movie(name="Alien", director="Ridley Scott"))
+
+    assert [movie.name for movie in any_data_manager.search_movies("manh")] == ["Manhunter"]
+    assert [movie.name for movie in any_data_manager.search_movies("man")][:1] == ["Manhunter"]
+    assert {movie.name for movie in any_data_manager.search_movies("michael")} == {"Heat", "The Insider", "Manhunter"}
+
+
+def test_enrichment_queries_fill_only_missing_details(any_data_manager):
+    """
+    GIVEN an incomplete and a complete movie
+    WHEN incomplete movies are listed and their details updated
+    THEN only the incomplete movie is listed and its stored details are kept
+    """
+    incomplete = Movie(name="Heat", rating=9.9)
+    complete = Movie(name="Alien", director="Ridley Scott", year=1979, rating=8.5, poster_url="https://poster")
+    any_data_manager.add_movie(incomplete)
+    any_data_manager.add_movie(complete)
+
+    assert [movie.id for movie in any_data_manager.get_incomplete_movies(limit=10)] == [incomplete.id]
+
+    any_data_manager.update_movies_metadata([{"id": incomplete.id, "director": "Michael Mann", "rating": 8.3}])
+
+    assert any_data_manager.get_incomplete_movies(limit=10, after=incomplete.id) == []
+    stored = any_data_manager.get_movie_by_title("heat")
+    any_data_manager.db.session.refresh(stored)
+    assert (stored.director, stored.rating) == ("Michael Mann", 9.9)
+
+
+def test_version_stamps_change_with_listed_data(any_data_manager):
+    """
+    GIVEN two users sharing a movie
+    WHEN users are added and the shared movie, an assignment and a note change
+    THEN the users list version and the versions of the affected movie lists increase
+    """
+    assert any_data_manager.get_users_version() == 0
+    alice, bob = User(name="Alice"), User(name="Bob")
+    any_data_manager.add_user(alice)
+    users_version = any_data_manager.get_users_version()
+    any_data_manager.add_user(bob)
+    assert any_data_manager.get_users_version() > users_version
+    assert any_data_manager.get_user_movies_version(999) is None
+
+    heat = Movie(name="Heat")
+    any_data_manager.add_movie_for_user(alice.id, heat)
+    any_data_manager.add_movie_for_user(bob.id, Movie(name="Heat"))
+    versions = [any_data_manager.get_user_movies_version(user.id) for user in (alice, bob)]
+
+    any_data_manager.add_user_movie_note(alice.id, heat.id, "great")
+    assert any_data_manager.get_user_movies_version(alice.id) > versions[0]
+    assert any_data_manager.get_user_movies_version(bob.id) == versions[1]
+
+    any_data_manager.update_movie(Movie(id=heat.id, name="Heat (1995)"))
+    assert any_data_manager.get_user_movies_version(bob.id) > versions[1]
+
+
+def test_queued_changes_are_checked_and_versioned(any_data_manager):
+    """
+    GIVEN a user with one movie in the list
+    WHEN the assignments are checked and a change saved later is recorded
+    THEN only the listed movie is found and the version of the movie list increases
+    """
+    user, movie = User(name="Alice"), Movie(name="Heat")
+    any_data_manager.add_user(user)
+    any_data_manager.add_movie_for_user(user.id, movie)
+    version = any_data_manager.get_user_movies_version(user.id)
+
+    any_data_manager.mark_user_movies_changed(user.id)
+
+    assert any_data_manager.has_user_movie(user.id, movie.id)
+    assert not any_data_manager.has_user_movie(user.id, movie.id + 1)
+    assert any_data_manager.get_user_movies_version(user.id) > version
+
+
+def assign_lists(data_manager, lists: dict[str, list[str]], top_k: int) -> dict[str, int]:
+    """Adds the users with their movie lists, refreshing the similar movies after each assignment."""
+    movie_ids = {}
+    for user_name, movie_names in lists.items():
+        user = User(name=user_name)
+        data_manager.add_user(user)
+        for movie_name in movie_names:
+            movie = Movie(name=movie_name)
+            data_manager.add_movie_for_user(user.id, movie)
+            data_manager.refresh_movie_similarities(user.id, movie.id, top_k)
+            movie_ids[movie_name] = movie.id
+    return movie_ids
+
+
+def get_similarities(data_manager) -> dict[tuple[int, int], float]:
+    return dict(((movie_id, similar_movie_id), score) for movie_id, similar_movie_id, score in
+                data_manager.db.session.execute(
+                    data_manager.db.select(MovieSimilarity.movie_id, MovieSimilarity.similar_movie_id,
+                                           MovieSimilarity.score)
+                ))
+
+
+def test_recommendations_follow_co_occurrences(any_data_manager):
+    """
+    GIVEN three users whose lists share movies, with the similar movies refreshed after each assignment
+    WHEN the similar and recommended movies are listed and a movie is deleted
+    THEN movies saved by the same users rank first, listed movies are not recommended
+    and the deleted movie disappears from the similar movies
+    """
+    movie_ids = assign_lists(any_data_manager, {
+        "Alice": ["Heat", "Alien"],
+        "Bob": ["Heat", "Alien", "Ran"],
+        "Carol": ["Heat", "Ran", "Jaws"],
+    }, top_k=10)
+    alice = any_data_manager.get_all_users()[0]
+
+    assert [movie.name for movie in any_data_manager.get_similar_movies(movie_ids["Alien"])] == ["Heat", "Ran"]
+    assert [movie.name for movie in any_data_manager.get_recommended_movies(alice.id)] == ["Ran", "Jaws"]
+    assert [movie.name for movie in any_data_manager.get_recommended_movies(alice.id, limit=1)] == ["Ran"]
+
+    any_data_manager.delete_movie(movie_ids["Ran"])
+
+    assert [movie.name for movie in any_data_manager.get_similar_movies(movie_ids["Alien"])] == ["Heat"]
+    assert [movie.name for movie in any_data_manager.get_recommended_movies(alice.id)] == ["Jaws"]
+
+
+def test_incremental_refresh_matches_full_rebuild(any_data_manager):
+    """
+    GIVEN movie lists whose similar movies were refreshed after each assignment
+    WHEN the similar movies of all movies are rebuilt from scratch
+    THEN the rebuild stores the same similar movies and scores, at most top_k per movie
+    """
+    pytest.importorskip("scipy")
+    assign_lists(any_data_manager, {
+        "Alice": ["Heat", "Alien", "Ran"],
+        "Bob": ["Heat", "Alien", "Jaws", "Up"],
+        "Carol": ["Heat", "Ran", "Jaws"],
+        "Dave": ["Alien", "Up"],
+    }, top_k=2)
+    incremental = get_similarities(any_data_manager)
+
+    summary = rebuild_similarities(any_data_manager, top_k=2)
+
+    assert summary["assignments"] == 12 and summary["similarities"] == 10
+    assert get_similarities(any_data_manager) == pytest.approx(incremental)
@@ -0,0 +1,133 @@
+import logging
+
+import pytest
+from flask import Flask, render_template_string
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from project.data_models import db, User
+from project.instrumentation import Histogram, Instrumentation, timed
+
+
+@pytest.fixture
+def instrumented_app():
+    """
+    Creates an application with an in-memory database, instrumented with the slow query threshold at zero
+    and the metrics available to the 10.0.0.0/8 network and the "secret" token.
+    """
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
+    db.init_app(app)
+    instrumentation = Instrumentation(slow_query_seconds=0, n_plus_one_threshold=3, server_timing=True,
+                                      metrics_token="secret", metrics_networks=("10.0.0.0/8",))
+    instrumentation.init_app(app)
+
+    @timed("omdb")
+    def lookup():
+        return "found"
+
+    @app.route("/users")
+    def users():
+        # one query per user on purpose, the N+1 pattern
+        names = [db.session.get(User, user_id) for user_id in range(1, 5)]
+        return render_template_string("{{ names|length }} {{ lookup() }}", names=names, lookup=lookup)
+
+    with app.app_context():
+        db.create_all()
+        yield app, instrumentation
+        db.session.remove()
+        db.drop_all()
+
+
+def test_request_timings_are_sent_and_logged(instrumented_app, caplog):
+    """
+    GIVEN an instrumented application with a route querying the database in a loop
+    WHEN the route is requested
+    THEN the Server-Timing header contains the database, OMDb and rendering timings
+    and the slow queries and the repeated query are logged
+    """
+    app, _ = instrumented_app
+
+    with caplog.at_level(logging.INFO, logger="instrumentation"):
+        response = app.test_client().get("/users")
+
+    server_timing = response.headers["Server-Timing"]
+    assert 'db;dur=' in server_timing and 'desc="count=4"' in server_timing
+    assert "omdb;dur=" in server_timing and "render;dur=" in server_timing and "total;dur=" in server_timing
+    assert any(message.startswith("Slow query") for message in caplog.messages)
+    assert any(message.startswith("Possible N+1 query in users, executed 4 times") for message in caplog.messages)
+    assert any(message.startswith("GET users 200") for message in caplog.messages)
+
+
+def test_metrics_aggregate_requests(instrumented_app):
+    """
+    GIVEN an instrumented application
+    WHEN a route is requested twice
+    THEN the histograms count both requests and their queries
+    """
+    app, instrumentation = instrumented_app
+    client = app.test_client()
+
+    client.get("/users")
+    client.get("/users")
+    metrics = instrumentation.render_metrics()
+
+    assert 'moviweb_request_duration_seconds_count{endpoint="users"} 2' in metrics
+    assert 'moviweb_db_queries_per_request_bucket{endpoint="users",le="5"} 2' in metrics
+    assert 'moviweb_omdb_request_duration_seconds_count 2' in metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    GIVEN a labeled histogram
+    WHEN values are observed
+    THEN the buckets are cumulative and the label values are escaped
+    """
+    histogram = Histogram("test_seconds", "Test.", "path", buckets=(1, 5))
+
+    for value in (0.5, 3, 10):
+        histogram.observe(value, 'a"b')
+
+    assert histogram.render() == [
+        "# HELP test_seconds Test.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{path="a\\"b",le="1"} 1',
+        'test_seconds_bucket{path="a\\"b",le="5"} 2',
+        'test_seconds_bucket{path="a\\"b",le="+Inf"} 3',
+        'test_seconds_sum{path="a\\"b"} 13.5',
+        'test_seconds_count{path="a\\"b"} 3',
+    ]
+
+
+def test_failed_statements_do_not_leak_start_times(instrumented_app):
+    """
+    GIVEN an instrumented application
+    WHEN a statement fails and another one succeeds on the same connection
+    THEN no start time of the failed statement is left on the connection
+    """
+    with db.engine.connect() as connection:
+        with pytest.raises(OperationalError):
+            connection.execute(text("SELECT * FROM missing_table"))
+        connection.execute(text("SELECT 1"))
+
+        assert connection.info["query_started_at"] == []
+
+
+@pytest.mark.parametrize("remote_addr, authorization, is_allowed", [
+    ("10.1.2.3", None, True),
+    ("192.0.2.1", "Bearer secret", True),
+    ("192.0.2.1", "Bearer wrong", False),
+    ("192.0.2.1", None, False),
+    ("127.0.0.1", None, False),
+])
+def test_metrics_are_available_to_configured_clients(instrumented_app, remote_addr, authorization, is_allowed):
+    """
+    GIVEN an instrumentation with the metrics network and token configured
+    WHEN the metrics clients are checked for requests of several addresses and tokens
+    THEN only clients of the network or with the token are allowed
+    """
+    app, instrumentation = instrumented_app
+    headers = {"Authorization": authorization} if authorization else {}
+
+    with app.test_request_context(environ_base={"REMOTE_ADDR": remote_addr}, headers=headers):
+        assert instrumentation.is_metrics_client() is is_allowed
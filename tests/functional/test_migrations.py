@@ -0,0 +1,109 @@
+import pytest
+from flask import Flask
+from sqlalchemy import inspect, text
+
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, Movie
+from project.migrations import migrate
+
+# the schema and rows of a database created by the first version of the application
+BASELINE_SCHEMA = [
+    """CREATE TABLE users (
+        id INTEGER NOT NULL, name VARCHAR NOT NULL, PRIMARY KEY (id), UNIQUE (name))""",
+    """CREATE TABLE movies (
+        id INTEGER NOT NULL, name VARCHAR NOT NULL, director VARCHAR, year INTEGER, rating FLOAT, poster_url VARCHAR,
+        PRIMARY KEY (id), UNIQUE (name))""",
+    """CREATE TABLE user_movies (
+        user_id INTEGER NOT NULL, movie_id INTEGER NOT NULL, user_note VARCHAR(120), PRIMARY KEY (user_id, movie_id),
+        FOREIGN KEY(user_id) REFERENCES users (id), FOREIGN KEY(movie_id) REFERENCES movies (id))""",
+    "INSERT INTO users (id, name) VALUES (1, 'Martin'), (2, 'Lucy')",
+    """INSERT INTO movies (id, name, director, year) VALUES
+        (1, 'The  Matrix', 'Lana Wachowski', 1999), (2, 'Heat', 'Michael Mann', 1995), (3, 'Heat 2', NULL, NULL)""",
+    "INSERT INTO user_movies (user_id, movie_id, user_note) VALUES (1, 1, 'Red pill'), (1, 2, NULL), (2, 2, NULL)",
+]
+
+
+@pytest.fixture
+def baseline_app(tmp_path):
+    """
+    Creates an application bound to a SQLite file holding the schema and rows of the first version.
+
+    Yields:
+        Flask: The application with an active application context.
+    """
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'baseline.db'}"
+    db.init_app(app)
+    with app.app_context():
+        with db.engine.begin() as connection:
+            for statement in BASELINE_SCHEMA:
+                connection.execute(text(statement))
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_migrate_backfills_normalized_titles(baseline_app):
+    """
+    GIVEN a database created by the first version, without the normalized titles
+    WHEN it is migrated twice
+    THEN the titles are normalized and indexed by the first run and the second run changes nothing
+    """
+    applied = migrate(db)
+
+    assert "movies.name_normalized" in applied
+    assert migrate(db) == []
+    assert "ix_movies_name_normalized" in {index["name"] for index in inspect(db.engine).get_indexes("movies")}
+    assert "ix_user_movies_movie_id_user_id" in {
+        index["name"] for index in inspect(db.engine).get_indexes("user_movies")
+    }
+    assert dict(db.session.execute(text("SELECT id, name_normalized FROM movies")).all()) == {
+        1: "the matrix", 2: "heat", 3: "heat 2"
+    }
+
+
+def test_migrate_indexes_existing_movies_for_search(baseline_app):
+    """
+    GIVEN a database created by the first version, without the full-text index
+    WHEN it is migrated and a movie is added afterwards
+    THEN the existing and the added movies are found in the full-text index
+    """
+    migrate(db)
+    with db.engine.begin() as connection:
+        connection.execute(text("INSERT INTO movies (name, name_normalized) VALUES ('Heated', 'heated')"))
+
+    assert db.session.execute(
+        text("SELECT rowid FROM movies_fts WHERE movies_fts MATCH 'heat*' ORDER BY rowid")
+    ).scalars().all() == [2, 3, 4]
+
+
+def test_migrate_adds_movie_list_versions(baseline_app):
+    """
+    GIVEN a database created by the first version, without the version stamps of the movie lists
+    WHEN it is migrated
+    THEN the existing movie lists start at version 0
+    """
+    applied = migrate(db)
+
+    assert "users.movies_version" in applied
+    assert dict(db.session.execute(text("SELECT id, movies_version FROM users")).all()) == {1: 0, 2: 0}
+
+
+def test_migrated_database_is_used_by_the_data_manager(baseline_app):
+    """
+    GIVEN a database created by the first version
+    WHEN it is migrated and used by the data manager
+    THEN the existing movies are listed and searched and the changed movies get new version stamps
+    """
+    migrate(db)
+    data_manager = SQLiteDataManager(db, counters_ttl=0)
+
+    data_manager.add_movie_for_user(2, Movie(name="Alien"))
+    movies = data_manager.get_user_movies(1)
+
+    assert "movies.version" not in migrate(db)
+    assert [movie.name for movie in movies] == ["The  Matrix", "Heat"]
+    assert [movie.version for movie in movies] == [0, 0]
+    assert [movie.name for movie in data_manager.search_movies("heat")] == ["Heat", "Heat 2"]
+    assert data_manager.get_movie_by_title("alien").version > 0
+    assert data_manager.get_user_movies_version(2) > data_manager.get_user_movies_version(1) == 0
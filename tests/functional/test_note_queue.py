@@ -0,0 +1,72 @@
+import pytest
+from flask import current_app
+
+from data_manager.note_queue import NoteWriteBehindQueue
+from project.data_models import Movie, User, UserMovie
+from project.exceptions import UserMovieNotFoundError
+
+
+@pytest.fixture
+def user_with_movies(data_manager):
+    """Creates a user with two assigned movies."""
+    user = User(name="Alice")
+    data_manager.add_user(user)
+    for name in ("Heat", "Alien"):
+        data_manager.add_movie_for_user(user.id, Movie(name=name))
+    return user
+
+
+def get_notes(data_manager, user_id: int) -> dict:
+    data_manager.db.session.expire_all()
+    return dict(data_manager.db.session.execute(
+        data_manager.db.select(UserMovie.movie_id, UserMovie.user_note).filter(UserMovie.user_id == user_id)
+    ).all())
+
+
+def test_flush_coalesces_notes_into_one_batch(data_manager, user_with_movies, monkeypatch):
+    """
+    GIVEN a note queue
+    WHEN several notes of two movies are enqueued and the queue is flushed
+    THEN the last note of each movie is saved in a single batch
+    """
+    batches = []
+    update_user_movie_notes = data_manager.update_user_movie_notes
+    monkeypatch.setattr(data_manager, "update_user_movie_notes",
+                        lambda notes: batches.append(dict(notes)) or update_user_movie_notes(notes))
+    note_queue = NoteWriteBehindQueue(current_app._get_current_object(), data_manager, flush_interval=60)
+
+    for note in ("g", "go", "good"):
+        note_queue.enqueue(user_with_movies.id, 1, note)
+    note_queue.enqueue(user_with_movies.id, 2, "scary")
+    assert note_queue.pending_count() == 2
+
+    assert note_queue.flush() == 2
+    note_queue.stop()
+
+    assert batches == [{(user_with_movies.id, 1): "good", (user_with_movies.id, 2): "scary"}]
+    assert get_notes(data_manager, user_with_movies.id) == {1: "good", 2: "scary"}
+
+
+def test_stop_flushes_pending_notes(data_manager, user_with_movies):
+    """
+    GIVEN a note queue with a long flush interval and a pending note
+    WHEN the queue is stopped (as at shutdown)
+    THEN the pending note is saved
+    """
+    note_queue = NoteWriteBehindQueue(current_app._get_current_object(), data_manager, flush_interval=60)
+    note_queue.enqueue(user_with_movies.id, 1, "saved at shutdown")
+
+    note_queue.stop()
+
+    assert note_queue.pending_count() == 0
+    assert get_notes(data_manager, user_with_movies.id)[1] == "saved at shutdown"
+
+
+def test_adding_note_to_unassigned_movie_raises(data_manager, user_with_movies):
+    """
+    GIVEN a user
+    WHEN a note is added to a movie not assigned to the user
+    THEN UserMovieNotFoundError is raised
+    """
+    with pytest.raises(UserMovieNotFoundError):
+        data_manager.add_user_movie_note(user_with_movies.id, 999, "note")
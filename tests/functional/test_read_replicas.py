@@ -0,0 +1,129 @@
+import shutil
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine
+
+from data_manager.read_replicas import ReadReplicaRouter
+from data_manager.sqlite_data_manager import SQLiteDataManager
+from project.data_models import db, Movie, User
+
+
+@pytest.fixture
+def replicated_app(tmp_path):
+    """
+    Creates an application whose primary SQLite file holds one movie and whose read replica is a copy of it.
+
+    Yields:
+        tuple[Flask, SQLiteDataManager]: The application and its data manager routing reads to the replica.
+    """
+    primary_path, replica_path = tmp_path / "primary.db", tmp_path / "replica.db"
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{primary_path}"
+    app.config["SECRET_KEY"] = "test"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(Movie(name="Heat"))
+        db.session.commit()
+        db.session.remove()
+    shutil.copyfile(primary_path, replica_path)
+
+    read_router = ReadReplicaRouter([create_engine(f"sqlite:///{replica_path}")], sticky_seconds=60)
+    read_router.init_app(app)
+    yield app, SQLiteDataManager(db, counters_ttl=0, read_router=read_router)
+    for engine in read_router.engines:
+        engine.dispose()
+
+
+def test_reads_use_replica_until_client_writes(replicated_app):
+    """
+    GIVEN a primary and a lagging read replica
+    WHEN a movie is added and the movies are read before and after the write
+    THEN reads before the write see the replica and reads after it see the primary
+    """
+    app, data_manager = replicated_app
+
+    with app.app_context():
+        data_manager.add_movie(Movie(name="Alien"))
+
+    with app.app_context():
+        assert data_manager.get_movie_by_title("alien") is None
+        data_manager.add_movie(Movie(name="Ran"))
+        assert data_manager.get_movie_by_title("alien").name == "Alien"
+        assert data_manager.get_all_movies_count() == 3
+
+
+def test_client_reads_its_writes_in_following_requests(replicated_app):
+    """
+    GIVEN a primary and a lagging read replica
+    WHEN one client adds a movie and then two clients count the movies in following requests
+    THEN the writing client reads from the primary and the other client from the replica
+    """
+    app, data_manager = replicated_app
+    app.add_url_rule("/count", "count", lambda: str(data_manager.get_all_movies_count()))
+    app.add_url_rule("/add", "add", lambda: str(data_manager.add_movie(Movie(name="Alien"))), methods=["POST"])
+    writer, reader = app.test_client(), app.test_client()
+
+    writer.post("/add")
+
+    assert writer.get("/count").text == "2"
+    assert reader.get("/count").text == "1"
+
+
+def test_writing_client_bypasses_cached_counts(replicated_app):
+    """
+    GIVEN a primary, a lagging read replica and counts cached in-process
+    WHEN the other client counts the movies from the replica between the write and the writing client's count
+    THEN the writing client reads the count from the primary instead of the cached replica count
+    """
+    app, data_manager = replicated_app
+    caching_data_manager = SQLiteDataManager(db, counters_ttl=60, read_router=data_manager._read_router)
+    app.add_url_rule("/count", "count", lambda: str(caching_data_manager.get_all_movies_count()))
+    app.add_url_rule("/add", "add", lambda: str(caching_data_manager.add_movie(Movie(name="Alien"))), methods=["POST"])
+    writer, reader = app.test_client(), app.test_client()
+
+    writer.post("/add")
+
+    assert reader.get("/count").text == "1"
+    assert writer.get("/count").text == "2"
+
+
+def test_client_recording_queued_write_reads_primary(replicated_app):
+    """
+    GIVEN a primary and a lagging read replica
+    WHEN one client records a change of a movie list saved later, e.g. a queued note,
+    and then two clients count the movies in following requests
+    THEN the recording client reads from the primary and the other client from the replica
+    """
+    app, data_manager = replicated_app
+    with app.app_context():
+        user = User(name="Martin")
+        data_manager.add_user(user)
+        user_id = user.id
+    app.add_url_rule("/count", "count", lambda: str(data_manager.get_all_movies_count()))
+    app.add_url_rule("/mark", "mark", lambda: str(data_manager.mark_user_movies_changed(user_id)), methods=["POST"])
+    writer, reader = app.test_client(), app.test_client()
+    with app.app_context():
+        data_manager.add_movie(Movie(name="Alien"))
+
+    writer.post("/mark")
+
+    assert writer.get("/count").text == "2"
+    assert reader.get("/count").text == "1"
+
+
+def test_writes_are_not_recorded_without_replicas():
+    """
+    GIVEN a router without read replicas
+    WHEN a client writes
+    THEN no write time is stored in the session cookie
+    """
+    app = Flask(__name__)
+    app.config["SECRET_KEY"] = "test"
+    read_router = ReadReplicaRouter([])
+    app.add_url_rule("/add", "add", lambda: str(read_router.mark_write()), methods=["POST"])
+
+    response = app.test_client().post("/add")
+
+    assert "Set-Cookie" not in response.headers
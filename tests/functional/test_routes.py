@@ -0,0 +1,471 @@
+import io
+import json
+
+import pytest
+from limits import parse
+
+from project.data_models import User, Movie
+from project.recommendations import create_similarity_refresh_queue
+from utils.avatars import avatar_key
+from utils.limiter_storage import SQLiteStorage
+
+
+@pytest.fixture
+def user_with_movie(app_module, client):
+    """Adds a user with one movie in the list and returns the IDs of the user and the movie."""
+    with app_module.app.app_context():
+        user = User(name="Martin")
+        app_module.data_manager.add_user(user)
+        movie = Movie(name="Heat", director="Michael Mann", year=1995)
+        app_module.data_manager.add_movie_for_user(user.id, movie)
+        return user.id, movie.id
+
+
+def test_movie_list_is_not_sent_again_while_unchanged(client, user_with_movie):
+    """
+    GIVEN a user's movie list requested once
+    WHEN it is requested again with the received ETag
+    THEN 304 Not Modified is sent without a body and with the same ETag
+    """
+    user_id, _ = user_with_movie
+    response = client.get(f"/users/{user_id}")
+
+    revalidated = client.get(f"/users/{user_id}", headers={"If-None-Match": response.headers["ETag"]})
+
+    assert response.status_code == 200
+    assert "Heat" in response.text
+    assert "no-cache" in response.headers["Cache-Control"]
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert revalidated.headers["ETag"] == response.headers["ETag"]
+
+
+def test_changed_movie_list_is_sent_again(app_module, client, user_with_movie):
+    """
+    GIVEN a user's movie list requested once
+    WHEN a movie is added to the list and the list is requested again with the received ETag
+    THEN the list is rendered again with a new ETag
+    """
+    user_id, _ = user_with_movie
+    response = client.get(f"/users/{user_id}")
+    with app_module.app.app_context():
+        app_module.data_manager.add_movie_for_user(user_id, Movie(name="Alien"))
+
+    revalidated = client.get(f"/users/{user_id}", headers={"If-None-Match": response.headers["ETag"]})
+
+    assert revalidated.status_code == 200
+    assert "Alien" in revalidated.text
+    assert revalidated.headers["ETag"] != response.headers["ETag"]
+
+
+def test_movie_list_pages_have_their_own_etags(client, user_with_movie):
+    """
+    GIVEN a user's movie list requested once
+    WHEN another page of the list is requested with the received ETag
+    THEN the page is rendered, the ETag covers the query of the request
+    """
+    user_id, _ = user_with_movie
+    response = client.get(f"/users/{user_id}")
+
+    other_page = client.get(f"/users/{user_id}?partial=1", headers={"If-None-Match": response.headers["ETag"]})
+
+    assert other_page.status_code == 200
+    assert other_page.headers["ETag"] != response.headers["ETag"]
+
+
+@pytest.fixture
+def user_with_movies(app_module, client):
+    """Adds a user with three movies in the list and returns the ID of the user and the movie names."""
+    names = ["Heat", "Alien", "Ran"]
+    with app_module.app.app_context():
+        user = User(name="Martin")
+        app_module.data_manager.add_user(user)
+        for name in names:
+            app_module.data_manager.add_movie_for_user(user.id, Movie(name=name))
+        return user.id, names
+
+
+def test_movie_list_pages_link_the_next_page(client, user_with_movies):
+    """
+    GIVEN a user with three movies in the list
+    WHEN the list is scrolled by partial pages of two movies, following the X-Next-Page header
+    THEN the first page links the page after its last movie and the last page links no next page
+    """
+    user_id, names = user_with_movies
+
+    first_page = client.get(f"/users/{user_id}?partial=1&limit=2")
+    last_page = client.get(first_page.headers["X-Next-Page"] + "&partial=1")
+
+    assert first_page.status_code == last_page.status_code == 200
+    assert [name in first_page.text for name in names] == [True, True, False]
+    assert "<html" not in first_page.text
+    assert first_page.headers["X-Next-Page"].startswith(f"/users/{user_id}?")
+    assert [name in last_page.text for name in names] == [False, False, True]
+    assert "X-Next-Page" not in last_page.headers
+
+
+def test_streamed_movie_list_matches_rendered_page(client, user_with_movies):
+    """
+    GIVEN a user with three movies in the list
+    WHEN the list is requested rendered as one page and streamed
+    THEN the streamed body is the rendered page
+    """
+    user_id, names = user_with_movies
+
+    page = client.get(f"/users/{user_id}")
+    streamed = client.get(f"/users/{user_id}?stream=1")
+
+    assert streamed.status_code == 200
+    assert streamed.is_streamed
+    assert all(name in streamed.text for name in names)
+    assert streamed.text == page.text
+
+
+def test_movie_list_of_unknown_user_is_not_found(client):
+    """
+    GIVEN an empty database
+    WHEN the movie list of a user is requested
+    THEN 404 Not Found is sent
+    """
+    response = client.get("/users/1")
+
+    assert response.status_code == 404
+
+
+def test_users_list_is_not_sent_again_while_unchanged(app_module, client):
+    """
+    GIVEN the users list requested once
+    WHEN it is requested again with the received ETag, before and after a user is added
+    THEN 304 Not Modified is sent before and the rendered list after the user is added
+    """
+    response = client.get("/users")
+    etag = response.headers["ETag"]
+
+    unchanged = client.get("/users", headers={"If-None-Match": etag})
+    with app_module.app.app_context():
+        app_module.data_manager.add_user(User(name="Lucy"))
+    changed = client.get("/users", headers={"If-None-Match": etag})
+
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert "Lucy" in changed.text
+
+
+def test_note_of_listed_movie_is_accepted(app_module, client, user_with_movie):
+    """
+    GIVEN a user with a movie in the list and notes saved write-behind
+    WHEN a note of the movie is posted
+    THEN it is accepted with 202 and saved by the next flush
+    """
+    user_id, movie_id = user_with_movie
+
+    response = client.post(f"/users/{user_id}/add_note/{movie_id}", data={"note": "Great heist"})
+    app_module.note_queue.flush()
+
+    assert response.status_code == 202
+    assert response.json == {"success": True, "note": "Great heist"}
+    with app_module.app.app_context():
+        assert [movie.user_note for movie in app_module.data_manager.get_user_movies(user_id)] == ["Great heist"]
+
+
+def test_queued_note_changes_movie_list_version_at_once(app_module, client, user_with_movie):
+    """
+    GIVEN a user's movie list requested once and notes saved write-behind
+    WHEN a note is posted and the list is revalidated with the received ETag before the note is flushed
+    THEN the list is rendered again with a new ETag
+    """
+    user_id, movie_id = user_with_movie
+    response = client.get(f"/users/{user_id}")
+
+    accepted = client.post(f"/users/{user_id}/add_note/{movie_id}", data={"note": "Great heist"})
+    revalidated = client.get(f"/users/{user_id}", headers={"If-None-Match": response.headers["ETag"]})
+    app_module.note_queue.flush()
+
+    assert accepted.status_code == 202
+    assert revalidated.status_code == 200
+    assert revalidated.headers["ETag"] != response.headers["ETag"]
+
+
+@pytest.mark.parametrize("user_offset, movie_offset", [(0, 1), (1, 0)])
+def test_note_of_unlisted_movie_is_not_found(app_module, client, user_with_movie, user_offset, movie_offset):
+    """
+    GIVEN a user with a movie in the list and notes saved write-behind
+    WHEN a note of another movie or of another user is posted
+    THEN 404 Not Found is sent and no note is queued
+    """
+    user_id, movie_id = user_with_movie
+
+    response = client.post(f"/users/{user_id + user_offset}/add_note/{movie_id + movie_offset}",
+                           data={"note": "Great heist"})
+
+    assert response.status_code == 404
+    assert response.json == {"success": False, "error": "Movie is not in users list"}
+    assert app_module.note_queue.pending_count() == 0
+
+
+def test_timings_and_metrics_are_not_exposed_by_default(app_module, client, monkeypatch):
+    """
+    GIVEN the application with the default instrumentation settings
+    WHEN a page and the metrics are requested without and with the metrics token
+    THEN no Server-Timing header is sent and the metrics are sent only with the token
+    """
+    monkeypatch.setattr(app_module.instrumentation, "metrics_token", "secret")
+
+    page = client.get("/users")
+    forbidden = client.get("/metrics")
+    allowed = client.get("/metrics", headers={"Authorization": "Bearer secret"})
+
+    assert "Server-Timing" not in page.headers
+    assert forbidden.status_code == 403
+    assert allowed.status_code == 200
+    assert 'moviweb_request_duration_seconds_count{endpoint="list_users"}' in allowed.text
+
+
+def test_movie_list_is_exported_as_csv_and_json_lines(client, user_with_movie):
+    """
+    GIVEN a user with a movie in the list
+    WHEN the list is exported as CSV and as JSON Lines
+    THEN both downloads hold the header (CSV) and one row with the movie
+    """
+    user_id, _ = user_with_movie
+
+    # the streamed downloads keep their request context until they are closed
+    with client.get(f"/users/{user_id}/export.csv") as csv_export:
+        csv_text = csv_export.text
+    with client.get(f"/users/{user_id}/export.jsonl") as jsonl_export:
+        jsonl_text = jsonl_export.text
+
+    assert csv_export.mimetype == "text/csv"
+    assert csv_export.headers["Content-Disposition"] == f"attachment; filename=movies-{user_id}.csv"
+    assert csv_text.splitlines() == ["name,director,year,rating,poster_url,note", "Heat,Michael Mann,1995,,,"]
+    assert jsonl_export.mimetype == "application/x-ndjson"
+    assert [json.loads(line) for line in jsonl_text.splitlines()] == [
+        {"name": "Heat", "director": "Michael Mann", "year": 1995, "rating": None, "poster_url": None, "note": None}
+    ]
+
+
+def test_unsupported_export_format_is_not_found(client, user_with_movie):
+    """
+    GIVEN a user with a movie in the list
+    WHEN the list is exported in an unsupported format
+    THEN 404 Not Found is sent
+    """
+    user_id, _ = user_with_movie
+
+    response = client.get(f"/users/{user_id}/export.xml")
+
+    assert response.status_code == 404
+
+
+def test_letterboxd_export_is_imported(app_module, client, user_with_movie):
+    """
+    GIVEN a user with a movie in the list
+    WHEN a Letterboxd CSV export with the listed movie and a new one is imported
+    THEN the rows, the added and the newly assigned movies are counted
+    and the Letterboxd star rating is kept as the note instead of the movie rating
+    """
+    user_id, _ = user_with_movie
+    letterboxd_csv = (b"Date,Name,Year,Letterboxd URI,Rating\n"
+                      b"2024-01-01,Heat,1995,https://boxd.it/1,4.5\n"
+                      b"2024-01-02,Alien,1979,https://boxd.it/2,4\n")
+
+    response = client.post(f"/users/{user_id}/import", data={"file": (io.BytesIO(letterboxd_csv), "watched.csv")})
+
+    assert response.status_code == 200
+    assert response.json == {"success": True, "rows": 2, "movies_added": 1, "movies_assigned": 1}
+    with app_module.app.app_context():
+        movies = {movie.name: movie for movie in app_module.data_manager.get_user_movies(user_id)}
+    assert movies["Alien"].user_note == "Rated 4/5 on Letterboxd"
+    assert movies["Alien"].rating is None
+    assert movies["Alien"].year == 1979
+
+
+@pytest.mark.parametrize("filename, content, error", [
+    ("movies.csv", b"name\nAm\xe9lie\n", "can't decode"),
+    ("movies.jsonl", b'{"name": "Heat"}\n[1]\n', "Line 2 is not a JSON object."),
+    ("movies.txt", b"name\nHeat\n", "Unsupported file format, use CSV or JSON Lines"),
+])
+def test_malformed_import_is_rejected(client, user_with_movie, filename, content, error):
+    """
+    GIVEN a user with a movie in the list
+    WHEN a file that is not valid UTF-8, has an invalid JSON line or an unsupported format is imported
+    THEN 400 Bad Request is sent with the error
+    """
+    user_id, _ = user_with_movie
+
+    response = client.post(f"/users/{user_id}/import", data={"file": (io.BytesIO(content), filename)})
+
+    assert response.status_code == 400
+    assert response.json["success"] is False
+    assert error in response.json["error"]
+
+
+@pytest.mark.parametrize("width", [100, 0])
+def test_poster_of_unsupported_width_is_not_found(client, user_with_movie, width):
+    """
+    GIVEN a movie
+    WHEN its poster is requested in a width that is not one of POSTER_WIDTHS
+    THEN 404 Not Found is sent
+    """
+    _, movie_id = user_with_movie
+
+    response = client.get(f"/posters/{movie_id}/{width}")
+
+    assert response.status_code == 404
+
+
+def test_poster_of_private_origin_is_redirected_unfetched(app_module, client, monkeypatch):
+    """
+    GIVEN a movie whose poster URL points to a loopback address
+    WHEN its poster is requested through the proxy
+    THEN the client is redirected to the original URL and the proxy does not request it
+    """
+    poster_url = "http://127.0.0.1:8080/heat.jpg"
+    with app_module.app.app_context():
+        movie = Movie(name="Heat", poster_url=poster_url)
+        app_module.data_manager.add_movie(movie)
+        movie_id = movie.id
+    requested_urls = []
+    monkeypatch.setattr(app_module.poster_cache.session, "get", lambda url, **kwargs: requested_urls.append(url))
+
+    response = client.get(f"/posters/{movie_id}/{app_module.poster_cache.widths[0]}")
+
+    assert response.status_code == 302
+    assert response.headers["Location"] == poster_url
+    assert requested_urls == []
+
+
+def test_avatar_is_served_as_immutable_svg(app_module, client):
+    """
+    GIVEN a user
+    WHEN the user's avatar is requested
+    THEN an SVG image is sent with the caching headers of an immutable public resource
+    """
+    with app_module.app.app_context():
+        user = User(name="Lucy")
+        app_module.data_manager.add_user(user)
+        user_id = user.id
+
+    response = client.get(f"/users/{user_id}/avatar.svg")
+
+    assert response.status_code == 200
+    assert response.mimetype == "image/svg+xml"
+    assert response.text.startswith("<svg")
+    assert response.cache_control.public
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == app_module.IMMUTABLE_MAX_AGE
+    assert "ETag" in response.headers
+
+
+def test_users_page_inlines_avatar_sprite_once(app_module, client):
+    """
+    GIVEN two users
+    WHEN the users list is requested
+    THEN one hidden SVG sprite holds one symbol per user, referenced by the user cards
+    """
+    with app_module.app.app_context():
+        for name in ("Lucy", "Martin"):
+            app_module.data_manager.add_user(User(name=name))
+
+    response = client.get("/users")
+
+    assert response.text.count('style="display: none"') == 1
+    for name in ("Lucy", "Martin"):
+        key = avatar_key(name)
+        assert response.text.count(f'<symbol id="avatar-{key}"') == 1
+        assert f'<use href="#avatar-{key}">' in response.text
+    assert "/avatar.svg" not in response.text
+
+
+@pytest.fixture
+def similarity_queue(app_module, monkeypatch):
+    """Enables the recommendations with a similarity refresh queue listening to the assignments of the data manager."""
+    monkeypatch.setitem(app_module.app.config, "RECOMMENDATIONS_ENABLED", True)
+    monkeypatch.setattr(app_module.data_manager, "on_movie_assigned", None)
+    queue = create_similarity_refresh_queue(app_module.app, app_module.data_manager)
+    yield queue
+    queue.stop()
+
+
+def add_user_with_movies(app_module, name: str, movie_names: list[str]) -> int:
+    """Adds a user with the movies in the list and returns the ID of the user."""
+    with app_module.app.app_context():
+        user = User(name=name)
+        app_module.data_manager.add_user(user)
+        for movie_name in movie_names:
+            app_module.data_manager.add_movie_for_user(user.id, Movie(name=movie_name))
+        return user.id
+
+
+def test_similar_movies_follow_imported_lists(app_module, client, similarity_queue):
+    """
+    GIVEN a user who saved two movies and the similar movies refreshed after every assignment
+    WHEN another user imports a list with one of the movies and a new one
+    THEN the new movie becomes similar to the shared movie
+    """
+    add_user_with_movies(app_module, "Martin", ["Heat", "Alien"])
+    lucy_id = add_user_with_movies(app_module, "Lucy", [])
+    similarity_queue.stop()
+    with app_module.app.app_context():
+        heat_id = app_module.data_manager.get_movie_by_title("Heat").id
+
+    before = client.get(f"/api/movies/{heat_id}/similar")
+    client.post(f"/users/{lucy_id}/import", data={"file": (io.BytesIO(b"name\nHeat\nRan\n"), "movies.csv")})
+    similarity_queue.stop()
+    after = client.get(f"/api/movies/{heat_id}/similar")
+
+    assert [movie["name"] for movie in before.json["movies"]] == ["Alien"]
+    assert sorted(movie["name"] for movie in after.json["movies"]) == ["Alien", "Ran"]
+
+
+def test_movies_saved_by_similar_users_are_recommended(app_module, client, similarity_queue):
+    """
+    GIVEN a user who saved two movies and another user who saved one of them
+    WHEN the recommendations of the other user are requested
+    THEN the movie saved only by the first user is recommended
+    """
+    add_user_with_movies(app_module, "Martin", ["Heat", "Alien"])
+    lucy_id = add_user_with_movies(app_module, "Lucy", ["Heat"])
+    similarity_queue.stop()
+
+    response = client.get(f"/users/{lucy_id}/recommendations")
+
+    assert response.status_code == 200
+    assert "Recommended for Lucy" in response.text
+    assert "Alien" in response.text
+    assert "Heat" not in response.text
+
+
+def test_recommendations_are_not_found_while_disabled(client, user_with_movie):
+    """
+    GIVEN the application with the recommendations disabled
+    WHEN the recommendations of a user and the similar movies of a movie are requested
+    THEN 404 Not Found is sent for both
+    """
+    user_id, movie_id = user_with_movie
+
+    assert client.get(f"/users/{user_id}/recommendations").status_code == 404
+    assert client.get(f"/api/movies/{movie_id}/similar").status_code == 404
+
+
+@pytest.mark.parametrize("method, path, limit_setting", [
+    ("GET", "/add_user", "ADD_USER_RATE_LIMIT"),
+    ("POST", "/users/1/add_note/1", "ADD_NOTE_RATE_LIMIT"),
+])
+def test_route_limits_are_counted_in_sqlite_storage(app_module, client, monkeypatch, method, path, limit_setting):
+    """
+    GIVEN the rate limits enabled with the SQLite storage of RATELIMIT_STORAGE_URI
+    WHEN a route is requested once more than its configured limit allows
+    THEN the requests within the limit are answered and the last one gets 429 Too Many Requests
+    """
+    monkeypatch.setattr(app_module.limiter, "enabled", True)
+    app_module.limiter.reset()
+    allowed_requests = parse(app_module.app.config[limit_setting]).amount
+
+    statuses = [client.open(path, method=method, data={"note": "Great heist"}).status_code
+                for _ in range(allowed_requests + 1)]
+    app_module.limiter.reset()
+
+    assert isinstance(app_module.limiter.storage, SQLiteStorage)
+    assert 429 not in statuses[:-1]
+    assert statuses[-1] == 429
@@ -0,0 +1,322 @@
+from omdb.client import OmdbClient
+from omdb.enrichment import enrich_incomplete_movies
+from omdb.stub_server import OmdbStubServer
+from project.data_models import Movie, User, Stat
+
+
+def test_get_movie_by_title_prefers_exact_match(data_manager):
+    """
+    GIVEN movies whose titles share a prefix
+    WHEN a movie is looked up by a differently formatted exact title
+    THEN the exact match is returned
+    """
+    data_manager.add_movie(Movie(name="The Matrix Reloaded"))
+    data_manager.add_movie(Movie(name="The Matrix"))
+
+    assert data_manager.get_movie_by_title("  the   MATRIX ").name == "The Matrix"
+
+
+def test_get_movie_by_title_falls_back_to_prefix_match(data_manager):
+    """
+    GIVEN movies whose titles share a prefix
+    WHEN a movie is looked up by the shared prefix
+    THEN the first matching title in normalized order is returned
+    """
+    data_manager.add_movie(Movie(name="The Matrix Revolutions"))
+    data_manager.add_movie(Movie(name="The Matrix Reloaded"))
+
+    assert data_manager.get_movie_by_title("the matrix").name == "The Matrix Reloaded"
+
+
+def test_get_movie_by_title_uses_substring_match_only_on_request(data_manager):
+    """
+    GIVEN a movie
+    WHEN it is looked up by a part of its title
+    THEN it is found only when the substring match is allowed
+    """
+    data_manager.add_movie(Movie(name="The Shawshank Redemption"))
+
+    assert data_manager.get_movie_by_title("shawshank") is None
+    assert data_manager.get_movie_by_title("shawshank", allow_substring=True).name == "The Shawshank Redemption"
+    assert data_manager.get_movie_by_title("%", allow_substring=True) is None
+
+
+def test_update_movie_keeps_normalized_title_in_sync(data_manager):
+    """
+    GIVEN a saved movie
+    WHEN its title is updated
+    THEN the movie is found by the new title
+    """
+    movie = Movie(name="Gladiator")
+    data_manager.add_movie(movie)
+
+    data_manager.update_movie(Movie(id=movie.id, name="Gladiator II"))
+
+    assert data_manager.get_movie_by_title("gladiator ii").id == movie.id
+
+
+def test_search_movies_ranks_title_matches_first(data_manager):
+    """
+    GIVEN movies matching the search text in the title or the director
+    WHEN movies are searched by a partially typed word
+    THEN movies matching in the title are ranked first
+    """
+    data_manager.add_movie(Movie(name="Gladiator", director="Ridley Scott", year=2000))
+    data_manager.add_movie(Movie(name="Alien", director="Ridley Scott", year=1979))
+    data_manager.add_movie(Movie(name="Scott Pilgrim vs. the World", director="Edgar Wright", year=2010))
+
+    movies = data_manager.search_movies("scot")
+
+    assert [movie.name for movie in movies][0] == "Scott Pilgrim vs. the World"
+    assert len(movies) == 3
+    assert len(data_manager.search_movies("scot", limit=1, offset=1)) == 1
+
+
+def test_search_movies_ranks_all_matches_and_pages_consistently(data_manager):
+    """
+    GIVEN many movies sharing a common title word, the exactly matching title added last,
+    and movies matching the words in the director only
+    WHEN the words are searched one page at a time
+    THEN the exact title comes first, the director matches last
+    and the pages follow one order without duplicates or gaps
+    """
+    for index in range(150):
+        data_manager.add_movie(Movie(name=f"The Return {index}"))
+    data_manager.add_movie(Movie(name="The Return"))
+    for index in range(30):
+        data_manager.add_movie(Movie(name=f"Other {index}", director="The Return Crew"))
+
+    pages = [data_manager.search_movies("the return", limit=25, offset=offset) for offset in range(0, 200, 25)]
+    names = [movie.name for page in pages for movie in page]
+
+    assert names[0] == "The Return"
+    assert names[151:] == [f"Other {index}" for index in range(30)]
+    assert len(names) == len(set(names)) == 181
+    assert names == [movie.name for movie in data_manager.search_movies("the return", limit=200)]
+
+
+def test_search_index_follows_updates_and_deletes(data_manager):
+    """
+    GIVEN a saved movie
+    WHEN the movie is renamed and then deleted
+    THEN the search index follows both changes
+    """
+    movie = Movie(name="Whiplash")
+    data_manager.add_movie(movie)
+
+    data_manager.update_movie(Movie(id=movie.id, name="Interstellar"))
+    assert data_manager.search_movies("whiplash") == []
+    assert [found.id for found in data_manager.search_movies("inter")] == [movie.id]
+
+    data_manager.delete_movie(movie.id)
+    assert data_manager.search_movies("inter") == []
+
+
+def test_search_treats_operators_as_words(data_manager):
+    """
+    GIVEN a saved movie
+    WHEN searched with FTS5 syntax characters or an empty text
+    THEN no error is raised
+    """
+    data_manager.add_movie(Movie(name="The Matrix"))
+
+    assert data_manager.search_movies('"matrix" (*') != []
+    assert data_manager.search_movies("  ") == []
+
+
+def test_get_all_users_pages_by_keyset_cursor(data_manager):
+    """
+    GIVEN several users
+    WHEN users are retrieved page by page, each page starting after the last ID of the previous one
+    THEN all users are returned exactly once in ID order
+    """
+    for name in ["Martin", "Lucy", "Anna", "Tom", "Eva"]:
+        data_manager.add_user(User(name=name))
+
+    first_page = data_manager.get_all_users(limit=2)
+    second_page = data_manager.get_all_users(limit=2, after=first_page[-1].id)
+    last_page = data_manager.get_all_users(limit=2, after=second_page[-1].id)
+
+    names = [user.name for user in first_page + second_page + last_page]
+    assert names == ["Martin", "Lucy", "Anna", "Tom", "Eva"]
+    assert data_manager.get_all_users(limit=2, after=last_page[-1].id) == []
+
+
+def test_get_user_movies_pages_by_keyset_cursor(data_manager):
+    """
+    GIVEN a user with several movies
+    WHEN the user's movies are retrieved page by page
+    THEN the pages hold the user's movies in movie ID order with their notes
+    """
+    user = User(name="Martin")
+    data_manager.add_user(user)
+    movies = [Movie(name=name) for name in ["Alien", "Gladiator", "Whiplash"]]
+    for movie in movies:
+        data_manager.add_movie(movie)
+        data_manager.add_movie_to_user(user.id, movie)
+    data_manager.add_user_movie_note(user.id, movies[2].id, "Great drums")
+
+    first_page = data_manager.get_user_movies(user.id, limit=2)
+    second_page = data_manager.get_user_movies(user.id, limit=2, after=first_page[-1].id)
+
+    assert [movie.name for movie in first_page] == ["Alien", "Gladiator"]
+    assert [(movie.name, movie.user_note) for movie in second_page] == [("Whiplash", "Great drums")]
+
+
+def test_iter_user_movies_yields_movies_in_batches(data_manager):
+    """
+    GIVEN a user with more movies than the batch size
+    WHEN the user's movies are iterated
+    THEN all movies are yielded in movie ID order with their notes
+    """
+    user = User(name="Martin")
+    data_manager.add_user(user)
+    for index in range(5):
+        movie = Movie(name=f"Movie {index}")
+        data_manager.add_movie(movie)
+        data_manager.add_movie_to_user(user.id, movie)
+    data_manager.add_user_movie_note(user.id, movie.id, "Last one")
+
+    movies = list(data_manager.iter_user_movies(user.id, batch_size=2))
+
+    assert [movie.name for movie in movies] == [f"Movie {index}" for index in range(5)]
+    assert movies[-1].user_note == "Last one"
+
+
+def test_counts_follow_added_and_deleted_rows(data_manager):
+    """
+    GIVEN an empty database
+    WHEN users and movies are added and a movie is deleted
+    THEN the cached counts reflect every change
+    """
+    assert data_manager.get_all_users_count() == 0
+    assert data_manager.get_all_movies_count() == 0
+
+    data_manager.add_user(User(name="Martin"))
+    alien, gladiator = Movie(name="Alien"), Movie(name="Gladiator")
+    data_manager.add_movie(alien)
+    data_manager.add_movie(gladiator)
+    data_manager.delete_movie(alien.id)
+
+    assert data_manager.get_all_users_count() == 1
+    assert data_manager.get_all_movies_count() == 1
+
+
+def test_stats_table_is_maintained_by_triggers(data_manager):
+    """
+    GIVEN the stats table
+    WHEN rows are inserted and deleted bypassing the data manager
+    THEN the stored counters follow the number of rows
+    """
+    db = data_manager.db
+    db.session.add_all([User(name="Martin"), User(name="Lucy"), Movie(name="Alien")])
+    db.session.commit()
+    db.session.execute(db.delete(User).filter(User.name == "Lucy"))
+    db.session.commit()
+
+    stats = dict(db.session.execute(db.select(Stat.name, Stat.value)).all())
+    assert stats == {"users": 1, "movies": 1}
+
+
+def test_add_movie_for_user_reuses_movies_and_reports_existing_pairing(data_manager):
+    """
+    GIVEN two users
+    WHEN the same movie is added to both users and again to the first one
+    THEN a single movie is stored and the repeated assignment is reported
+    """
+    martin, lucy = User(name="Martin"), User(name="Lucy")
+    data_manager.add_user(martin)
+    data_manager.add_user(lucy)
+
+    first_movie = Movie(name="Alien", director="Ridley Scott")
+    assert data_manager.add_movie_for_user(martin.id, first_movie) is True
+    second_movie = Movie(name="Alien")
+    assert data_manager.add_movie_for_user(lucy.id, second_movie) is True
+    assert data_manager.add_movie_for_user(martin.id, Movie(name="Alien")) is False
+
+    assert second_movie.id == first_movie.id
+    assert data_manager.get_all_movies_count() == 1
+    assert [movie.director for movie in data_manager.get_user_movies(lucy.id)] == ["Ridley Scott"]
+
+
+def test_import_user_movies_in_chunks(data_manager):
+    """
+    GIVEN a user with one movie and an imported list overlapping with it
+    WHEN the list is imported in chunks
+    THEN only new movies are added, new assignments are counted and progress is reported per chunk
+    """
+    user = User(name="Martin")
+    data_manager.add_user(user)
+    data_manager.add_movie_for_user(user.id, Movie(name="Alien"))
+    rows = [{"name": "Alien"}, {"name": "Heat", "note": "x" * 200}, {"name": "Heat"}, {"name": "Ronin"}]
+    progress = []
+
+    summary = data_manager.import_user_movies(user.id, rows, chunk_size=2, on_progress=progress.append)
+
+    assert summary == {"rows": 4, "movies_added": 2, "movies_assigned": 2}
+    assert progress == [2, 4]
+    assert data_manager.get_all_movies_count() == 3
+    assert len(data_manager.get_user_movies(user.id)[1].user_note) == 120
+
+
+def test_enrichment_fills_only_missing_movie_details(data_manager, omdb_stub):
+    """
+    GIVEN an incomplete movie known to the OMDb stub, an unknown movie and a complete movie
+    WHEN incomplete movies are enriched twice
+    THEN only missing details of the known movie are filled, the complete movie is not fetched
+    and the second run does not fetch the movies OMDb already answered
+    """
+    matrix = Movie(name="The Matrix", rating=9.9)
+    unknown = Movie(name="Unknown")
+    complete = Movie(name="Heat", director="Michael Mann", year=1995, rating=8.3, poster_url="https://poster")
+    for movie in (matrix, unknown, complete):
+        data_manager.add_movie(movie)
+    client = OmdbClient("key", base_url=omdb_stub.url)
+
+    summary = enrich_incomplete_movies(data_manager, client, workers=2, rate_limit=100, batch_size=1)
+    second_summary = enrich_incomplete_movies(data_manager, client, workers=2, rate_limit=100)
+
+    data_manager.db.session.expire_all()
+    assert summary == {"processed": 2, "updated": 1, "not_found": 1, "mismatched": 0, "failed": 0}
+    assert (matrix.director, matrix.year, matrix.rating) == ("Lana Wachowski, Lilly Wachowski", 1999, 9.9)
+    assert second_summary["processed"] == 0
+    assert omdb_stub.request_count == 2
+
+
+def test_enrichment_skips_details_of_other_movies(data_manager):
+    """
+    GIVEN movies whose OMDb lookup returns another title or another year
+    WHEN incomplete movies are enriched
+    THEN their details are left empty and the movies are counted as mismatched
+    """
+    remake = Movie(name="The Matrix", year=2031)
+    fuzzy = Movie(name="Heat")
+    for movie in (remake, fuzzy):
+        data_manager.add_movie(movie)
+    omdb_movies = {
+        "The Matrix": {"Title": "The Matrix", "Year": "1999", "Director": "Lana Wachowski", "imdbRating": "8.7"},
+        "Heat": {"Title": "Heat Wave", "Year": "2022", "Director": "Someone Else", "imdbRating": "4.1"},
+    }
+
+    with OmdbStubServer(omdb_movies) as omdb_stub:
+        summary = enrich_incomplete_movies(data_manager, OmdbClient("key", base_url=omdb_stub.url), rate_limit=100)
+
+    data_manager.db.session.expire_all()
+    assert summary == {"processed": 2, "updated": 0, "not_found": 0, "mismatched": 2, "failed": 0}
+    assert (remake.director, fuzzy.director, fuzzy.rating) == (None, None, None)
+
+
+def test_update_movie_changes_movie_version(data_manager):
+    """
+    GIVEN a saved movie
+    WHEN its details are updated
+    THEN its version stamp increases
+    """
+    movie = Movie(name="Heat")
+    data_manager.add_movie(movie)
+    version = movie.version
+
+    data_manager.update_movie(Movie(id=movie.id, name="Heat", director="Michael Mann"))
+    data_manager.db.session.refresh(movie)
+
+    assert movie.version > version
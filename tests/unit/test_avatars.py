@@ -0,0 +1,47 @@
+import os
+
+from utils.avatars import AvatarCache, avatar_color, avatar_initials, avatar_key, render_avatar_svg, \
+    render_avatar_symbol
+
+
+def test_avatar_is_deterministic_per_name():
+    """
+    GIVEN two user names
+    WHEN their avatars are rendered repeatedly
+    THEN each name always gets the same avatar and key, different names get different keys
+    """
+    assert render_avatar_svg("Alice Smith") == render_avatar_svg("Alice Smith")
+    assert avatar_color("Alice Smith") == avatar_color("Alice Smith")
+    assert avatar_key("Alice Smith") != avatar_key("Bob")
+    assert f'id="avatar-{avatar_key("Bob")}"' in render_avatar_symbol("Bob")
+
+
+def test_avatar_initials_contain_no_markup():
+    """
+    GIVEN user names with several words, markup and no letters
+    WHEN their initials and avatars are rendered
+    THEN up to two upper-cased initials of letters and digits are shown, the name itself never is
+    """
+    assert avatar_initials("john ronald tolkien") == "JR"
+    assert avatar_initials("...") == "?"
+    assert ">X</text>" in render_avatar_svg("<b> x")
+    assert "<b>" not in render_avatar_svg("<b> x")
+
+
+def test_avatar_cache_writes_file_once(tmp_path):
+    """
+    GIVEN an empty avatar cache directory
+    WHEN the avatar of a user name is requested twice
+    THEN one SVG file named by the avatar key is written and reused
+    """
+    cache = AvatarCache(str(tmp_path))
+
+    path = cache.get_path("Alice")
+    modified_at = os.stat(path).st_mtime_ns
+
+    assert cache.get_path("Alice") == path
+    assert AvatarCache(str(tmp_path)).get_path("Alice") == path
+    assert os.stat(path).st_mtime_ns == modified_at
+    assert os.listdir(tmp_path) == [f"{avatar_key('Alice')}.svg"]
+    with open(path, encoding="utf-8") as file:
+        assert file.read() == render_avatar_svg("Alice")
@@ -0,0 +1,62 @@
+import threading
+
+from flask import Flask
+
+from utils.background_queue import BackgroundQueue
+
+
+class RecordingQueue(BackgroundQueue):
+    """ Queue recording its batches, the worker wakes up after three pending items. """
+
+    def __init__(self):
+        super().__init__(Flask(__name__), wait_interval=60, max_batch=3)
+        self.batches = []
+        self.processed = threading.Event()
+
+    def _process_pending(self) -> int:
+        batch = self._take_pending()
+        if batch:
+            self.batches.append(batch)
+            self.processed.set()
+        return len(batch)
+
+
+def test_background_queue_batches_items_by_key():
+    """
+    Test the batches of the BackgroundQueue.
+
+    This test verifies that a repeated key replaces the pending item, that the worker processes
+    the pending items once max_batch keys are pending and that stopping processes the remaining items.
+    """
+    queue = RecordingQueue()
+    queue._put("a", 1)
+    queue._put("a", 2)
+    queue._put("b", 3)
+    assert queue.pending_count() == 2
+
+    queue._put("c", 4)
+    assert queue.processed.wait(timeout=5)
+    queue._put("d", 5)
+    queue.stop()
+
+    assert queue.batches == [{"a": 2, "b": 3, "c": 4}, {"d": 5}]
+    assert queue.pending_count() == 0
+
+
+def test_background_queue_keeps_newer_items_of_failed_batch():
+    """
+    Test returning the items of a failed batch to the BackgroundQueue.
+
+    This test verifies that the returned items are pending again,
+    except for the keys whose newer item was accepted meanwhile.
+    """
+    queue = RecordingQueue()
+    queue._put("a", 1)
+    queue._put("b", 2)
+    failed_batch = queue._take_pending()
+    queue._put("a", 3)
+
+    queue._return_pending(failed_batch)
+    queue.stop()
+
+    assert queue.batches == [{"a": 3, "b": 2}]
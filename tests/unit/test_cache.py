@@ -0,0 +1,91 @@
+import time
+
+from omdb.cache import OmdbResponseCache
+from utils.cache import LRUCache, SQLiteCache, TieredCache
+from utils.text import normalize_title
+
+FOUND_RESPONSE = {"Response": "True", "Title": "The Matrix", "Director": "Lana Wachowski"}
+NOT_FOUND_RESPONSE = {"Response": "False", "Error": "Movie not found!"}
+LIMIT_RESPONSE = {"Response": "False", "Error": "Request limit reached!"}
+
+
+def test_normalize_title():
+    """
+    Test the function normalize_title with differently formatted titles.
+
+    This test verifies that the `normalize_title()` function case-folds the title,
+    strips it and collapses runs of whitespace.
+    """
+    assert normalize_title("The Matrix") == "the matrix"
+    assert normalize_title("  The \t  MATRIX \n") == "the matrix"
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """
+    Test the LRUCache eviction.
+
+    This test verifies that the least recently used entry is evicted
+    once the cache exceeds its maximal size and that reads refresh the entry.
+    """
+    cache = LRUCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries_and_counts_lookups():
+    """
+    Test the LRUCache expiry and hit/miss counters.
+
+    This test verifies that entries are not returned after their TTL
+    and that hits and misses are counted.
+    """
+    cache = LRUCache(max_size=10, ttl=60)
+    cache.set("short", "value", ttl=0.01)
+    cache.set("long", "value")
+    time.sleep(0.02)
+
+    assert cache.get("short") is None
+    assert cache.get("long") == "value"
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_tiered_cache_promotes_persistent_entries(tmp_path):
+    """
+    Test the TieredCache lookup order.
+
+    This test verifies that an entry present only in the persistent tier
+    is served and promoted to the memory tier.
+    """
+    persistent = SQLiteCache(str(tmp_path / "cache.db"))
+    persistent.set("key", {"value": 1}, ttl=60)
+    cache = TieredCache(LRUCache(), persistent)
+
+    assert cache.get("key") == {"value": 1}
+    assert cache.memory.get("key") == {"value": 1}
+    assert cache.get("missing") is None
+
+
+def test_omdb_cache_uses_normalized_titles_and_skips_errors():
+    """
+    Test the OmdbResponseCache keys and cached responses.
+
+    This test verifies that found and not found responses are cached under the
+    normalized title with their respective TTL and other errors are not cached.
+    """
+    cache = OmdbResponseCache(LRUCache(), ttl=60, negative_ttl=0.01)
+    cache.set("The  Matrix", FOUND_RESPONSE)
+    cache.set("Unknown title", NOT_FOUND_RESPONSE)
+    cache.set("Gladiator", LIMIT_RESPONSE)
+
+    assert cache.get("the matrix") == FOUND_RESPONSE
+    assert cache.get("unknown TITLE") == NOT_FOUND_RESPONSE
+    assert cache.get("Gladiator") is None
+
+    time.sleep(0.02)
+    assert cache.get("Unknown title") is None
@@ -0,0 +1,53 @@
+from jinja2 import Environment
+
+from utils.cache import LRUCache, SQLiteCache, TieredCache
+from utils.fragment_cache import FragmentCacheExtension
+
+TEMPLATE = '{% cache "card", movie.id, movie.version %}<p>{{ movie.name }}</p>{% endcache %}{{ note }}'
+
+
+def create_environment(cache) -> Environment:
+    environment = Environment(autoescape=True, extensions=[FragmentCacheExtension])
+    environment.fragment_cache = cache
+    return environment
+
+
+def test_cached_fragment_is_reused_until_version_changes():
+    """
+    GIVEN a template with a cached fragment keyed by the movie ID and version
+    WHEN the movie name changes without and with a version change
+    THEN the cached fragment is reused until the version changes, content outside the fragment is always rendered
+    """
+    template = create_environment(LRUCache()).from_string(TEMPLATE)
+
+    assert template.render(movie={"id": 1, "version": 1, "name": "Heat"}, note="a") == "<p>Heat</p>a"
+    assert template.render(movie={"id": 1, "version": 1, "name": "Changed"}, note="b") == "<p>Heat</p>b"
+    assert template.render(movie={"id": 1, "version": 2, "name": "Changed"}, note="c") == "<p>Changed</p>c"
+
+
+def test_fragments_from_persistent_tier_are_not_escaped_twice(tmp_path):
+    """
+    GIVEN a fragment with escaped content stored in the persistent cache tier
+    WHEN it is rendered by another process with an empty memory tier
+    THEN the stored HTML is output as it was rendered
+    """
+    persistent = SQLiteCache(str(tmp_path / "fragments.db"))
+    movie = {"id": 1, "version": 1, "name": "Tom & Jerry"}
+    create_environment(TieredCache(LRUCache(), persistent)).from_string(TEMPLATE).render(movie=movie)
+
+    rendered = create_environment(TieredCache(LRUCache(), persistent)).from_string(TEMPLATE).render(movie=movie)
+
+    assert rendered == "<p>Tom &amp; Jerry</p>"
+
+
+def test_fragment_is_rendered_without_cache():
+    """
+    GIVEN an environment without a fragment cache
+    WHEN a template with a cache tag is rendered
+    THEN the fragment body is rendered every time
+    """
+    template = create_environment(None).from_string(TEMPLATE)
+
+    template.render(movie={"id": 1, "version": 1, "name": "Heat"})
+
+    assert template.render(movie={"id": 1, "version": 1, "name": "Changed"}) == "<p>Changed</p>"
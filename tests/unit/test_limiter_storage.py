@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+
+import pytest
+from limits import parse
+from limits.errors import ConfigurationError
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+
+from utils.limiter_storage import SQLiteStorage
+
+
+def test_moving_window_is_shared_by_storages_of_one_file(tmp_path):
+    """
+    Test the moving window of two SQLite storages opened on the same file, like two workers.
+
+    This test verifies that the entries acquired through either storage count against one limit
+    and that the window statistics report the oldest entry.
+    """
+    uri = f"sqlite:///{tmp_path / 'limits.db'}"
+    first, second = storage_from_string(uri), storage_from_string(uri)
+    limit = parse("3 per minute")
+
+    hits = [MovingWindowRateLimiter(storage).hit(limit, "add_user") for storage in (first, second, first, second)]
+    reset_time, remaining = MovingWindowRateLimiter(second).get_window_stats(limit, "add_user")
+
+    assert isinstance(first, SQLiteStorage)
+    assert hits == [True, True, True, False]
+    assert remaining == 0
+    assert time.time() < reset_time <= time.time() + 60
+    assert MovingWindowRateLimiter(first).hit(limit, "other")
+
+
+def test_moving_window_entries_expire(tmp_path):
+    """
+    Test the expiry of moving window entries.
+
+    This test verifies that entries leave the window after its length,
+    that a cost above the limit is never acquired and that clear removes the key.
+    """
+    storage = SQLiteStorage(f"sqlite:///{tmp_path / 'limits.db'}")
+
+    assert storage.acquire_entry("key", limit=2, expiry=1, amount=2)
+    assert not storage.acquire_entry("key", limit=2, expiry=1)
+    assert not storage.acquire_entry("fresh", limit=2, expiry=1, amount=3)
+    time.sleep(1.05)
+    assert storage.get_moving_window("key", limit=2, expiry=1)[1] == 0
+    assert storage.acquire_entry("key", limit=2, expiry=1)
+
+    storage.clear("key")
+    assert storage.get_moving_window("key", limit=2, expiry=1)[1] == 0
+
+
+def test_moving_window_is_atomic_across_threads(tmp_path):
+    """
+    Test concurrent acquisitions through separate connections of one storage file.
+
+    This test verifies that exactly the limit of entries is acquired when many threads hit the same key.
+    """
+    uri = f"sqlite:///{tmp_path / 'limits.db'}"
+    storages = [SQLiteStorage(uri) for _ in range(4)]
+    acquired = []
+
+    def hit(storage):
+        for _ in range(25):
+            acquired.append(storage.acquire_entry("note", limit=30, expiry=60))
+
+    threads = [threading.Thread(target=hit, args=(storage,)) for storage in storages for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert acquired.count(True) == 30
+    assert storages[0].get_moving_window("note", limit=30, expiry=60)[1] == 30
+
+
+def test_fixed_window_counter_restarts_after_expiry(tmp_path):
+    """
+    Test the fixed window counters incremented by the upsert.
+
+    This test verifies that increments accumulate within the window, an expired counter restarts
+    and reset removes all counters.
+    """
+    storage = SQLiteStorage(f"sqlite:///{tmp_path / 'limits.db'}")
+
+    assert storage.incr("key", expiry=1) == 1
+    assert storage.incr("key", expiry=1, amount=2) == 3
+    assert storage.get("key") == 3
+    time.sleep(1.05)
+    assert storage.get("key") == 0
+    assert storage.incr("key", expiry=1) == 1
+    assert storage.get_expiry("key") > time.time()
+
+    assert storage.reset() == 1
+    assert storage.get("key") == 0 and storage.check()
+
+
+def test_sqlite_storage_requires_file_path():
+    """
+    Test the SQLite storage with an in-memory URI.
+
+    This test verifies that a URI without a file is rejected, since it could not be shared by workers.
+    """
+    with pytest.raises(ConfigurationError):
+        storage_from_string("sqlite://")
+
+
+def test_redis_storage_moving_window():
+    """
+    Test the moving window in a Redis compatible server: the one MOVIWEB_TEST_REDIS_URI points to
+    (e.g. a disposable local Redis, Valkey or KeyDB), otherwise the in-process fakeredis stand-in when installed.
+
+    This test verifies that the limit is enforced through the Redis storage of the limits package.
+    """
+    pytest.importorskip("redis")
+    uri = os.getenv("MOVIWEB_TEST_REDIS_URI")
+    if uri:
+        storage = storage_from_string(uri)
+    else:
+        fakeredis = pytest.importorskip("fakeredis", reason="MOVIWEB_TEST_REDIS_URI is not set.")
+        import redis
+        pool = redis.ConnectionPool(connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer())
+        storage = storage_from_string("redis://localhost", connection_pool=pool)
+    storage.reset()
+    limit = parse("2 per minute")
+
+    assert [MovingWindowRateLimiter(storage).hit(limit, "add_user") for _ in range(3)] == [True, True, False]
+    assert FixedWindowRateLimiter(storage).hit(limit, "fixed")
+    storage.reset()
@@ -0,0 +1,98 @@
+import io
+
+import pytest
+
+from utils.movie_io import get_file_format, read_movie_rows, write_movie_rows
+
+
+class ListedMovie:
+    """Movie with an attached user note, as yielded by the data manager."""
+
+    def __init__(self, name, director=None, year=None, rating=None, poster_url=None, user_note=None):
+        self.name = name
+        self.director = director
+        self.year = year
+        self.rating = rating
+        self.poster_url = poster_url
+        self.user_note = user_note
+
+
+def test_read_letterboxd_csv():
+    """
+    Test the function read_movie_rows with a Letterboxd CSV export.
+
+    This test verifies that the `read_movie_rows()` function maps the export columns
+    to movie fields, keeps the user's star rating in the note instead of the movie rating
+    and skips rows without a movie name.
+    """
+    stream = io.StringIO("Date,Name,Year,Letterboxd URI,Rating\n2024-01-01,Alien,1979,https://boxd.it/1,4.5\n"
+                         "2024-01-02,Heat,1995,https://boxd.it/2,\n,,,,\n")
+
+    assert list(read_movie_rows(stream, "csv")) == [
+        {"name": "Alien", "director": None, "year": 1979, "rating": None, "poster_url": None,
+         "note": "Rated 4.5/5 on Letterboxd"},
+        {"name": "Heat", "director": None, "year": 1995, "rating": None, "poster_url": None, "note": None},
+    ]
+
+
+def test_read_imdb_jsonl():
+    """
+    Test the function read_movie_rows with JSON Lines using IMDb column names.
+
+    This test verifies that the `read_movie_rows()` function matches column names case-insensitively
+    and drops invalid numbers and URLs.
+    """
+    stream = io.StringIO('{"Title": "Heat", "Directors": "Michael Mann", "IMDb Rating": "8.3", "Year": "N/A", '
+                         '"Poster": "N/A"}\n\n')
+
+    assert list(read_movie_rows(stream, "jsonl")) == [{
+        "name": "Heat", "director": "Michael Mann", "year": None, "rating": 8.3, "poster_url": None, "note": None
+    }]
+
+
+@pytest.mark.parametrize("line, message", [
+    ("[1, 2]", "Line 2 is not a JSON object."),
+    ('{"name": ', "Line 2 is not valid JSON"),
+])
+def test_read_jsonl_rejects_invalid_lines(line, message):
+    """
+    Test the function read_movie_rows with JSON Lines holding a line that is not an object.
+
+    This test verifies that the `read_movie_rows()` function raises ValueError naming the line.
+    """
+    stream = io.StringIO('{"name": "Heat"}\n' + line + "\n")
+
+    with pytest.raises(ValueError, match=message):
+        list(read_movie_rows(stream, "jsonl"))
+
+
+def test_write_movie_rows():
+    """
+    Test the function write_movie_rows with CSV and JSON Lines formats.
+
+    This test verifies that the `write_movie_rows()` function writes a CSV header
+    followed by a line per movie, and a JSON object per line for JSON Lines.
+    """
+    movies = [ListedMovie("Alien", year=1979, user_note="Scary, but good")]
+
+    assert "".join(write_movie_rows(movies, "csv")).splitlines() == [
+        "name,director,year,rating,poster_url,note",
+        "Alien,,1979,,,\"Scary, but good\"",
+    ]
+    assert list(write_movie_rows(movies, "jsonl")) == [
+        '{"name": "Alien", "director": null, "year": 1979, "rating": null, "poster_url": null, '
+        '"note": "Scary, but good"}\n'
+    ]
+
+
+def test_get_file_format():
+    """
+    Test the function get_file_format with different file names.
+
+    This test verifies that the `get_file_format()` function derives the format from the extension
+    and returns the default for unsupported extensions.
+    """
+    assert get_file_format("export.CSV") == "csv"
+    assert get_file_format("export.json") == "jsonl"
+    assert get_file_format("export.xml", default="csv") == "csv"
+    assert get_file_format("export") is None
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from omdb.cache import OmdbResponseCache
+from omdb.client import OmdbClient, AsyncOmdbClient
+from omdb.enrichment import RateLimiter
+from project.exceptions import OmdbUnavailableError
+from utils.cache import LRUCache
+
+
+def test_fetching_known_and_unknown_movie(omdb_stub):
+    """
+    GIVEN an OmdbClient pointed to the OMDb stub
+    WHEN a known and an unknown title are fetched
+    THEN the movie data and the "Movie not found!" response are returned
+    """
+    client = OmdbClient("key", base_url=omdb_stub.url)
+
+    assert client.fetch_movie_data("the matrix")["Title"] == "The Matrix"
+    assert client.fetch_movie_data("unknown")["Error"] == "Movie not found!"
+
+
+def test_fetching_retries_unavailable_api(omdb_stub):
+    """
+    GIVEN an OMDb stub failing the first two requests with 503
+    WHEN a title is fetched with two retries allowed
+    THEN the third attempt succeeds
+    """
+    omdb_stub.fail_first = 2
+    client = OmdbClient("key", base_url=omdb_stub.url, retries=2, backoff_factor=0)
+
+    assert client.fetch_movie_data("The Matrix")["Response"] == "True"
+    assert omdb_stub.request_count == 3
+
+
+def test_fetching_raises_when_retries_are_exhausted(omdb_stub):
+    """
+    GIVEN an OMDb stub failing more requests than retries allowed
+    WHEN a title is fetched
+    THEN OmdbUnavailableError is raised
+    """
+    omdb_stub.fail_first = 5
+    client = OmdbClient("key", base_url=omdb_stub.url, retries=1, backoff_factor=0)
+
+    with pytest.raises(OmdbUnavailableError):
+        client.fetch_movie_data("The Matrix")
+
+
+def test_fetching_times_out_on_slow_api(omdb_stub):
+    """
+    GIVEN an OMDb stub answering slower than the read timeout
+    WHEN a title is fetched
+    THEN OmdbUnavailableError is raised instead of blocking
+    """
+    omdb_stub.delay = 0.5
+    client = OmdbClient("key", base_url=omdb_stub.url, timeout=(1, 0.1), retries=0)
+
+    with pytest.raises(OmdbUnavailableError):
+        client.fetch_movie_data("The Matrix")
+
+
+def test_concurrent_lookups_are_coalesced(omdb_stub):
+    """
+    GIVEN a slow OMDb stub
+    WHEN the same title is fetched concurrently from several threads
+    THEN a single request reaches the API and all threads get the result
+    """
+    omdb_stub.delay = 0.2
+    client = OmdbClient("key", base_url=omdb_stub.url)
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        results = list(executor.map(client.fetch_movie_data, ["The Matrix"] * 5))
+
+    assert all(result["Title"] == "The Matrix" for result in results)
+    assert omdb_stub.request_count == 1
+
+
+def test_cached_lookups_skip_api(omdb_stub):
+    """
+    GIVEN an OmdbClient with a response cache
+    WHEN the same title is fetched twice
+    THEN only the first lookup reaches the API
+    """
+    cache = OmdbResponseCache(LRUCache(), ttl=60, negative_ttl=60)
+    client = OmdbClient("key", base_url=omdb_stub.url, cache=cache)
+
+    client.fetch_movie_data("The Matrix")
+    client.fetch_movie_data("the  matrix")
+
+    assert omdb_stub.request_count == 1
+
+
+def test_async_lookups_are_coalesced(omdb_stub):
+    """
+    GIVEN an AsyncOmdbClient and a slow OMDb stub
+    WHEN the same title is fetched concurrently in the event loop
+    THEN a single request reaches the API
+    """
+    omdb_stub.delay = 0.2
+    client = AsyncOmdbClient(OmdbClient("key", base_url=omdb_stub.url))
+
+    async def fetch_all():
+        return await asyncio.gather(*(client.fetch_movie_data("The Matrix") for _ in range(5)))
+
+    results = asyncio.run(fetch_all())
+
+    assert all(result["Title"] == "The Matrix" for result in results)
+    assert omdb_stub.request_count == 1
+
+
+def test_rate_limiter_spaces_calls():
+    """
+    GIVEN a RateLimiter allowing 50 calls per second
+    WHEN five calls are acquired
+    THEN they take at least four intervals
+    """
+    rate_limiter = RateLimiter(50)
+    started_at = time.monotonic()
+
+    for _ in range(5):
+        rate_limiter.acquire()
+
+    assert time.monotonic() - started_at >= 4 / 50
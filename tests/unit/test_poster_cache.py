@@ -0,0 +1,172 @@
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from project.exceptions import PosterUnavailableError
+from utils.poster_cache import PosterCache
+
+
+# the local poster origins of the tests, posters are fetched only from public addresses by default
+LOCAL_NETWORKS = ("127.0.0.0/8",)
+REDIRECTS = {"/redirect.png": "/poster.png", "/metadata.png": "http://169.254.169.254/latest/meta-data/"}
+
+
+class PosterOriginServer:
+    """
+    Local poster origin serving one 600x900 PNG at /poster.png, redirecting the REDIRECTS paths
+    and answering 404 for other paths.
+    """
+
+    def __init__(self, delay: float = 0):
+        image = Image.new("RGB", (600, 900), (200, 30, 30))
+        content = io.BytesIO()
+        image.save(content, "PNG")
+        self.content = content.getvalue()
+        self.delay = delay
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/"
+
+    def _handler_class(self):
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with origin._lock:
+                    origin.request_count += 1
+                time.sleep(origin.delay)
+
+                if self.path in REDIRECTS:
+                    self.send_response(302)
+                    self.send_header("Location", REDIRECTS[self.path])
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                if self.path != "/poster.png":
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(origin.content)))
+                self.end_headers()
+                self.wfile.write(origin.content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def poster_origin():
+    with PosterOriginServer(delay=0.05) as origin:
+        yield origin
+
+
+def test_poster_is_fetched_once_and_resized_to_all_widths(tmp_path, poster_origin):
+    """
+    GIVEN an empty poster cache and a poster origin
+    WHEN all widths of a poster are requested, several of them concurrently
+    THEN the origin is requested once and WebP files of the requested widths are served without upscaling
+    """
+    cache = PosterCache(str(tmp_path), widths=(160, 320, 1000), trusted_networks=LOCAL_NETWORKS)
+    poster_url = poster_origin.url + "poster.png"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        paths = list(executor.map(lambda width: cache.get(poster_url, width), [160, 320, 160, 1000]))
+
+    assert poster_origin.request_count == 1
+    assert cache.is_cached(poster_url)
+    for path, width in zip(paths, [160, 320, 160, 600]):
+        with Image.open(path) as image:
+            assert image.format == "WEBP"
+            assert image.size == (width, width * 3 // 2)
+
+
+def test_unavailable_poster_is_not_requested_again(tmp_path, poster_origin):
+    """
+    GIVEN a poster URL answered with 404 by its origin
+    WHEN the poster is requested twice
+    THEN PosterUnavailableError is raised both times and the origin is requested only once
+    """
+    cache = PosterCache(str(tmp_path), trusted_networks=LOCAL_NETWORKS)
+    poster_url = poster_origin.url + "missing.png"
+
+    for _ in range(2):
+        with pytest.raises(PosterUnavailableError):
+            cache.get(poster_url, 160)
+
+    assert poster_origin.request_count == 1
+    assert cache.prefetch(poster_url) is False
+
+
+def test_warm_caches_poster_in_background(tmp_path, poster_origin):
+    """
+    GIVEN an empty poster cache
+    WHEN a poster is warmed
+    THEN all its widths are cached once the background job finishes
+    """
+    cache = PosterCache(str(tmp_path), trusted_networks=LOCAL_NETWORKS)
+    poster_url = poster_origin.url + "poster.png"
+
+    assert cache.warm(poster_url).result(timeout=5) is True
+    assert cache.is_cached(poster_url)
+    cache.close()
+
+
+@pytest.mark.parametrize("poster_url", [
+    "{origin}poster.png",
+    "http://localhost:1/poster.png",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/poster.png",
+    "http://10.0.0.1/poster.png",
+    "file:///etc/passwd",
+])
+def test_posters_of_non_public_addresses_are_not_requested(tmp_path, poster_origin, poster_url):
+    """
+    GIVEN a poster cache without trusted networks
+    WHEN a poster of a loopback, link-local, private or non-HTTP URL is requested
+    THEN PosterUnavailableError is raised without requesting the URL
+    """
+    cache = PosterCache(str(tmp_path))
+
+    with pytest.raises(PosterUnavailableError):
+        cache.get(poster_url.format(origin=poster_origin.url), 160)
+
+    assert poster_origin.request_count == 0
+
+
+def test_redirects_are_checked_before_they_are_followed(tmp_path, poster_origin):
+    """
+    GIVEN a trusted poster origin redirecting to its own poster and to a link-local address
+    WHEN the posters behind both redirects are requested
+    THEN the redirect to the origin is followed and the redirect to the link-local address is not
+    """
+    cache = PosterCache(str(tmp_path), trusted_networks=LOCAL_NETWORKS)
+
+    cache.get(poster_origin.url + "redirect.png", 160)
+    with pytest.raises(PosterUnavailableError, match="non-public address"):
+        cache.get(poster_origin.url + "metadata.png", 160)
+
+    assert cache.is_cached(poster_origin.url + "redirect.png")
+    assert poster_origin.request_count == 3
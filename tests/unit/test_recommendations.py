@@ -0,0 +1,59 @@
+import math
+import random
+
+import pytest
+
+from project.recommendations import compute_similarities
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+
+def brute_force_similarities(pairs: set[tuple[int, int]], top_k: int) -> dict[tuple[int, int], float]:
+    users_by_movie = {}
+    for user_id, movie_id in pairs:
+        users_by_movie.setdefault(movie_id, set()).add(user_id)
+
+    similarities = {}
+    for movie_id, users in users_by_movie.items():
+        scores = [
+            (len(users & other_users) / math.sqrt(len(users) * len(other_users)), other_movie_id)
+            for other_movie_id, other_users in users_by_movie.items()
+            if other_movie_id != movie_id and users & other_users
+        ]
+        for score, other_movie_id in sorted(scores, key=lambda item: (-item[0], item[1]))[:top_k]:
+            similarities[(movie_id, other_movie_id)] = score
+    return similarities
+
+
+def test_compute_similarities_matches_brute_force():
+    """
+    Test the blockwise sparse computation on random assignments with duplicates.
+
+    This test verifies that the kept similar movies and scores equal the cosine similarities
+    computed pair by pair, whatever the block size, and that the most similar movie comes first.
+    """
+    rng = random.Random(5)
+    assignments = [(rng.randint(1, 40), rng.randint(100, 160)) for _ in range(600)]
+    expected = brute_force_similarities(set(assignments), top_k=5)
+    user_ids, movie_ids = zip(*assignments)
+
+    for block_size in (7, 512):
+        movies, similar_movies, scores = compute_similarities(user_ids, movie_ids, top_k=5, block_size=block_size)
+        computed = {(int(movie), int(similar)): float(score)
+                    for movie, similar, score in zip(movies, similar_movies, scores)}
+
+        assert computed.keys() == expected.keys()
+        assert computed == pytest.approx(expected, rel=1e-5)
+        for movie in np.unique(movies):
+            assert np.all(np.diff(scores[movies == movie]) <= 0)
+
+
+def test_compute_similarities_without_co_occurrences():
+    """
+    Test the computation for movies that share no user.
+
+    This test verifies that no similarity is returned, for assignments without common users and without assignments.
+    """
+    assert all(len(array) == 0 for array in compute_similarities([1, 2], [10, 20], top_k=3))
+    assert all(len(array) == 0 for array in compute_similarities([], [], top_k=3))
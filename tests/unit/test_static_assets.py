@@ -0,0 +1,69 @@
+import gzip
+import os
+
+from flask import Flask
+
+from utils.static_assets import StaticAssets, build_assets
+
+
+def create_static_folder(path) -> str:
+    path.mkdir()
+    (path / "css").mkdir()
+    (path / "js").mkdir()
+    (path / "fonts").mkdir()
+    (path / "images").mkdir()
+    (path / "css" / "style.css").write_text('@font-face {\n    src: url("/static/fonts/Font.ttf");\n}\n')
+    (path / "js" / "script.js").write_text("function hello() {\n    return 1;\n}\n")
+    (path / "fonts" / "Font.ttf").write_bytes(b"font" * 100)
+    (path / "images" / "background.webp").write_bytes(b"webp")
+    return str(path)
+
+
+def test_build_fingerprints_minifies_and_precompresses(tmp_path):
+    """
+    GIVEN a static folder with a stylesheet referencing a font, a script and an image
+    WHEN the assets are built
+    THEN minified fingerprinted copies with gzip siblings of compressible files are written
+    and the stylesheet references the fingerprinted font
+    """
+    static_folder = create_static_folder(tmp_path / "static")
+    output_dir = str(tmp_path / "dist")
+
+    manifest = build_assets(static_folder, output_dir)
+
+    assert set(manifest) == {"css/style.css", "js/script.js", "fonts/Font.ttf", "images/background.webp"}
+    assert manifest["css/style.css"].startswith("css/style.") and manifest["css/style.css"] != "css/style.css"
+    with open(os.path.join(output_dir, manifest["css/style.css"]), encoding="utf-8") as file:
+        assert file.read() == f'@font-face{{src:url("/assets/{manifest["fonts/Font.ttf"]}")}}'
+    with open(os.path.join(output_dir, manifest["fonts/Font.ttf"]) + ".gz", "rb") as file:
+        assert gzip.decompress(file.read()) == b"font" * 100
+    assert not os.path.exists(os.path.join(output_dir, manifest["images/background.webp"]) + ".gz")
+    assert build_assets(static_folder, output_dir) == manifest
+
+
+def test_assets_are_served_precompressed_with_immutable_caching(tmp_path):
+    """
+    GIVEN built assets
+    WHEN the stylesheet is requested with and without gzip accepted
+    THEN the matching variant is sent with immutable caching headers, unbuilt paths fall back to the static folder
+    """
+    static_folder = create_static_folder(tmp_path / "static")
+    build_assets(static_folder, str(tmp_path / "dist"))
+    app = Flask(__name__, static_folder=static_folder)
+    assets = StaticAssets(str(tmp_path / "dist"))
+    app.add_url_rule("/assets/<path:filename>", "asset", lambda filename: assets.send(filename, max_age=60))
+    client = app.test_client()
+
+    with app.test_request_context():
+        url = assets.url("css/style.css")
+        assert assets.url("js/missing.js") == "/static/js/missing.js"
+
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = client.get(url)
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == plain.data
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Cache-Control"] == "public, max-age=60, immutable"
+    assert plain.headers["Vary"] == "Accept-Encoding"
+    assert client.get("/assets/manifest.json").status_code == 404
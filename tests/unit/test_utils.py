@@ -1,3 +1,4 @@
+from utils.text import build_fts_query, split_search_text, contains_search_words
 from utils.validation import get_valid_number_or_none, get_valid_url_or_none
 
 
@@ -66,3 +67,33 @@ def test_get_invalid_url():
     assert get_valid_url_or_none("abc://abc.com") is None
     assert get_valid_url_or_none("www.example.com") is None
     assert get_valid_url_or_none("https:/example.com") is None
+
+
+def test_build_fts_query():
+    """
+    Test the function build_fts_query with typed search texts.
+
+    This test verifies that the `build_fts_query()` function quotes every word,
+    matches the last word as a prefix unless it is followed by a space,
+    ignores a single trailing character and drops FTS5 syntax characters.
+    """
+    assert build_fts_query("Matrix rel") == '"matrix" "rel"*'
+    assert build_fts_query("matrix ") == '"matrix"'
+    assert build_fts_query("matrix r") == '"matrix"'
+    assert build_fts_query('"matrix" OR (*') == '"matrix" "or"*'
+    assert build_fts_query(" - ") == ""
+
+
+def test_contains_search_words():
+    """
+    Test the function contains_search_words with typed search texts.
+
+    This test verifies that the `contains_search_words()` function requires every word of the search text,
+    matches the last typed word as a prefix and compares the words case-folded and without diacritics.
+    """
+    assert split_search_text("Matrix rel") == (["matrix", "rel"], True)
+    assert split_search_text("matrix r") == (["matrix"], False)
+    assert contains_search_words("The Matrix Reloaded", *split_search_text("matrix rel"))
+    assert not contains_search_words("The Matrix Reloaded", *split_search_text("matrix rel "))
+    assert not contains_search_words("The Matrix", *split_search_text("matrix rel"))
+    assert contains_search_words("Amélie", *split_search_text("AMELIE "))
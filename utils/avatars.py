@@ -0,0 +1,167 @@
+import colorsys
+import hashlib
+import os
+import tempfile
+from functools import lru_cache
+
+from markupsafe import escape
+
+from utils.cache import LRUCache
+
+AVATAR_MIMETYPE = "image/svg+xml"
+AVATAR_VIEWBOX = "0 0 256 256"
+# part of the avatar keys, change it with the drawing, so that cached avatars are replaced
+AVATAR_STYLE_VERSION = "1"
+
+
+def avatar_key(name: str) -> str:
+    """
+    Returns the key identifying the avatar of a user name, used in file names, URLs and element IDs.
+
+    Args:
+        name (str): The user name.
+
+    Returns:
+        str: 16 hexadecimal characters derived from the name and the avatar style version.
+
+    Example:
+        >>> avatar_key("Alice") == avatar_key("Alice")
+        True
+    """
+    return hashlib.sha256(f"{AVATAR_STYLE_VERSION}:{name}".encode()).hexdigest()[:16]
+
+
+def avatar_initials(name: str) -> str:
+    """
+    Returns the initials shown in the avatar of a user name.
+
+    Args:
+        name (str): The user name.
+
+    Returns:
+        str: The upper-cased first letters of up to two words, "?" for names without letters.
+
+    Example:
+        >>> avatar_initials("john ronald tolkien")
+        'JR'
+    """
+    initials = "".join(word[0] for word in name.split() if word[0].isalnum())[:2]
+    return initials.upper() or "?"
+
+
+def avatar_color(name: str) -> str:
+    """
+    Returns the background color of the avatar of a user name.
+
+    The hue is derived from the hash of the name, saturation and lightness are fixed,
+    so that the white initials are readable on every color.
+
+    Args:
+        name (str): The user name.
+
+    Returns:
+        str: The color as a "#rrggbb" hex string.
+    """
+    hue = int.from_bytes(hashlib.sha256(name.encode()).digest()[:2], "big") / 0xFFFF
+    red, green, blue = colorsys.hls_to_rgb(hue, 0.42, 0.55)
+    return f"#{round(red * 255):02x}{round(green * 255):02x}{round(blue * 255):02x}"
+
+
+def render_avatar_shapes(name: str) -> str:
+    """
+    Renders the shapes of the avatar of a user name, drawn in the AVATAR_VIEWBOX coordinates.
+
+    Args:
+        name (str): The user name.
+
+    Returns:
+        str: The SVG circle and text elements.
+    """
+    return (f'<circle cx="128" cy="128" r="128" fill="{avatar_color(name)}"/>'
+            f'<text x="50%" y="50%" dy=".35em" fill="#fff" font-family="Open Sans, Arial, sans-serif" '
+            f'font-size="104" text-anchor="middle">{escape(avatar_initials(name))}</text>')
+
+
+def render_avatar_svg(name: str) -> str:
+    """
+    Renders the avatar of a user name as a standalone SVG document.
+
+    Args:
+        name (str): The user name.
+
+    Returns:
+        str: The SVG document.
+    """
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{AVATAR_VIEWBOX}" width="256" height="256">'
+            f'{render_avatar_shapes(name)}</svg>')
+
+
+@lru_cache(maxsize=4096)
+def render_avatar_symbol(name: str) -> str:
+    """
+    Renders the avatar of a user name as a symbol of an inline SVG sprite, referenced by "#avatar-<key>".
+
+    Args:
+        name (str): The user name.
+
+    Returns:
+        str: The SVG symbol element.
+    """
+    return f'<symbol id="avatar-{avatar_key(name)}" viewBox="{AVATAR_VIEWBOX}">{render_avatar_shapes(name)}</symbol>'
+
+
+class AvatarCache:
+    """
+    Memoizes rendered avatar SVG documents in memory and as files in a directory.
+
+    The files are named by the avatar key, so they can be sent as static files
+    and stay valid across restarts and processes.
+
+    Attributes:
+        directory (str): The directory holding the SVG files.
+        memory (LRUCache): The in-process cache of the file paths keyed by the avatar key.
+    """
+
+    def __init__(self, directory: str, max_size: int = 4096):
+        self.directory = directory
+        self.memory = LRUCache(max_size=max_size)
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, name: str) -> str:
+        """
+        Returns the path of the SVG file of the avatar of a user name, rendering it when missing.
+
+        Args:
+            name (str): The user name.
+
+        Returns:
+            str: The path of the SVG file.
+        """
+        key = avatar_key(name)
+        path = self.memory.get(key)
+        if path:
+            return path
+
+        path = os.path.join(self.directory, f"{key}.svg")
+        if not os.path.exists(path):
+            # written to a temporary file first, so that concurrent readers never see a partial file
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(render_avatar_svg(name))
+            os.replace(temp_path, path)
+
+        self.memory.set(key, path)
+        return path
+
+
+def create_avatar_cache(config) -> AvatarCache:
+    """
+    Creates the avatar cache from the application configuration.
+
+    Args:
+        config: The application configuration mapping.
+
+    Returns:
+        AvatarCache: The avatar cache storing the files in AVATAR_CACHE_DIR.
+    """
+    return AvatarCache(config["AVATAR_CACHE_DIR"], max_size=config["AVATAR_CACHE_MAX_SIZE"])
@@ -0,0 +1,120 @@
+import atexit
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from flask import Flask
+
+
+class BackgroundQueue(ABC):
+    """
+    Base class of the queues of pending work processed in batches by a background worker thread.
+
+    Pending items are kept in memory keyed by what they change, a repeated key replaces the pending item.
+    The worker processes all pending items every wait_interval seconds, or as soon as max_batch items
+    are pending. The remaining items are processed when the queue is stopped, which happens at interpreter exit.
+
+    Each process has its own queue and worker, started with the first item accepted by the process
+    (so that it also runs in workers forked after the application was imported).
+
+    Attributes:
+        wait_interval (float | None): Seconds between the batches, None to wait for max_batch pending items.
+        max_batch (int): The number of pending items waking the worker up early.
+    """
+    # the name of the worker thread
+    thread_name = "background-queue"
+
+    def __init__(self, app: Flask, wait_interval: float | None = None, max_batch: int = 1):
+        self.wait_interval = wait_interval
+        self.max_batch = max_batch
+        self._app = app
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def _put(self, key, item):
+        """
+        Accepts an item to be processed by the next batch, replacing the pending item of the key.
+
+        Args:
+            key: The key of the item, e.g. the IDs of the changed row.
+            item: The item.
+        """
+        if self._pid != os.getpid():
+            self.start()
+
+        with self._lock:
+            self._pending[key] = item
+            if len(self._pending) >= self.max_batch:
+                self._wake_up.set()
+
+    def _take_pending(self) -> dict:
+        """
+        Takes all pending items out of the queue.
+
+        Returns:
+            dict: The pending items by their keys.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def _return_pending(self, items: dict):
+        """
+        Puts back items of a failed batch, unless a newer item of the key was accepted meanwhile.
+
+        Args:
+            items (dict): The items by their keys.
+        """
+        with self._lock:
+            self._pending = {**items, **self._pending}
+
+    def pending_count(self) -> int:
+        """
+        Counts the items waiting for the worker.
+
+        Returns:
+            int: The number of pending keys.
+        """
+        with self._lock:
+            return len(self._pending)
+
+    @abstractmethod
+    def _process_pending(self) -> int:
+        """
+        Processes the pending items in one batch.
+
+        Returns:
+            int: The number of processed items.
+        """
+        pass
+
+    def start(self):
+        """ Starts the background worker of the current process and registers the final batch at interpreter exit. """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """ Stops the background worker and processes the remaining items. """
+        self._stopping.set()
+        self._wake_up.set()
+        if self._thread and self._pid == os.getpid():
+            self._thread.join()
+        self._thread = None
+        self._pid = None
+        self._process_pending()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake_up.wait(self.wait_interval)
+            self._wake_up.clear()
+            self._process_pending()
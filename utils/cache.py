@@ -0,0 +1,293 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class LRUCache:
+    """
+    Thread-safe in-process cache with least-recently-used eviction and per-entry TTL.
+
+    Attributes:
+        max_size (int): The maximal number of entries kept before the least recently used one is evicted.
+        ttl (float | None): The default time to live of an entry in seconds, None for entries without expiry.
+        hits (int): The number of successful lookups.
+        misses (int): The number of lookups of missing or expired entries.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Retrieves a value stored under the key and marks it as recently used.
+
+        Args:
+            key (str): The key of the entry.
+            default (Any): The value returned when the entry is missing or expired.
+
+        Returns:
+            Any: The cached value, otherwise the default.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        """
+        Stores a value under the key, evicting the least recently used entry when the cache is full.
+
+        Args:
+            key (str): The key of the entry.
+            value (Any): The value to store.
+            ttl (float | None): The time to live in seconds, the cache default is used when not provided.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        """
+        Removes the entry stored under the key if present.
+
+        Args:
+            key (str): The key of the entry.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """ Removes all entries and resets the hit and miss counters. """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the cache usage statistics.
+
+        Returns:
+            dict: The number of hits, misses and currently stored entries.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """
+    Persistent cache storing JSON serializable values in a SQLite file.
+
+    The file can be shared by multiple processes (e.g. gunicorn workers),
+    each connection is kept per thread.
+
+    Attributes:
+        path (str): The path of the SQLite cache file.
+        ttl (float | None): The default time to live of an entry in seconds, None for entries without expiry.
+        hits (int): The number of successful lookups.
+        misses (int): The number of lookups of missing or expired entries.
+    """
+
+    def __init__(self, path: str, ttl: float | None = None):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Retrieves a value stored under the key.
+
+        Args:
+            key (str): The key of the entry.
+            default (Any): The value returned when the entry is missing or expired.
+
+        Returns:
+            Any: The cached value, otherwise the default.
+        """
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(row[0])
+
+    def get_with_ttl(self, key: str) -> tuple[Any, float | None] | None:
+        """
+        Retrieves a value stored under the key together with its remaining time to live.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            tuple[Any, float | None] | None: The cached value and remaining TTL in seconds, otherwise None.
+        """
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (key, now)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        value, expires_at = row
+        return json.loads(value), (expires_at - now if expires_at is not None else None)
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        """
+        Stores a JSON serializable value under the key.
+
+        Args:
+            key (str): The key of the entry.
+            value (Any): The value to store.
+            ttl (float | None): The time to live in seconds, the cache default is used when not provided.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at)
+            )
+
+    def delete(self, key: str):
+        """
+        Removes the entry stored under the key if present.
+
+        Args:
+            key (str): The key of the entry.
+        """
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        """ Removes all entries and resets the hit and miss counters. """
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache")
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the cache usage statistics.
+
+        Returns:
+            dict: The number of hits, misses and currently stored entries.
+        """
+        size = self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "size": size}
+
+
+class TieredCache:
+    """
+    Two level cache with an in-process LRU in front of a persistent SQLite tier.
+
+    Lookups missing the memory tier are served from the persistent tier and promoted
+    to the memory tier for the rest of their lifetime. Writes go to both tiers.
+
+    Attributes:
+        memory (LRUCache): The in-process tier.
+        persistent (SQLiteCache): The persistent tier shared between processes.
+    """
+
+    def __init__(self, memory: LRUCache, persistent: SQLiteCache):
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Retrieves a value from the memory tier, falling back to the persistent tier.
+
+        Args:
+            key (str): The key of the entry.
+            default (Any): The value returned when the entry is missing in both tiers.
+
+        Returns:
+            Any: The cached value, otherwise the default.
+        """
+        missing = object()
+        value = self.memory.get(key, missing)
+        if value is not missing:
+            return value
+
+        stored = self.persistent.get_with_ttl(key)
+        if stored is None:
+            return default
+
+        value, remaining_ttl = stored
+        self.memory.set(key, value, ttl=remaining_ttl)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None):
+        """
+        Stores a value in both tiers.
+
+        Args:
+            key (str): The key of the entry.
+            value (Any): The JSON serializable value to store.
+            ttl (float | None): The time to live in seconds, the tier defaults are used when not provided.
+        """
+        self.memory.set(key, value, ttl=ttl)
+        self.persistent.set(key, value, ttl=ttl)
+
+    def delete(self, key: str):
+        """
+        Removes the entry from both tiers.
+
+        Args:
+            key (str): The key of the entry.
+        """
+        self.memory.delete(key)
+        self.persistent.delete(key)
+
+    def clear(self):
+        """ Removes all entries from both tiers. """
+        self.memory.clear()
+        self.persistent.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns the usage statistics of both tiers.
+
+        Returns:
+            dict: The statistics of the memory and the persistent tier.
+        """
+        return {"memory": self.memory.stats(), "persistent": self.persistent.stats()}
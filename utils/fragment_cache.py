@@ -0,0 +1,73 @@
+import logging
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from utils.cache import LRUCache, SQLiteCache, TieredCache
+
+logger = logging.getLogger("fragment_cache")
+
+
+class FragmentCacheExtension(Extension):
+    """
+    Jinja extension adding the {% cache %} tag, which caches the rendered HTML of its body.
+
+    The key is built from the tag arguments, which have to identify the rendered data
+    including its version, e.g. {% cache "movie-card", movie.id, movie.version %}...{% endcache %}.
+    The body is rendered normally while the environment has no fragment_cache assigned.
+
+    Environment attributes:
+        fragment_cache: The cache of the rendered fragments (LRUCache, TieredCache or compatible), None to disable.
+        fragment_cache_prefix (str): Prefix of all keys, e.g. a fingerprint of the templates.
+    """
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None, fragment_cache_prefix="")
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key_parts = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            key_parts.append(parser.parse_expression())
+
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_render_cached", [nodes.List(key_parts)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_cached(self, key_parts: list, caller) -> Markup:
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+
+        key = ":".join([self.environment.fragment_cache_prefix, *map(str, key_parts)])
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = caller()
+            cache.set(key, str(fragment))
+        # fragments read from a persistent tier are plain strings, they were escaped when rendered
+        return Markup(fragment)
+
+
+def create_fragment_cache(config) -> LRUCache | TieredCache | None:
+    """
+    Creates the rendered fragment cache from the application configuration.
+
+    Args:
+        config: The application configuration mapping.
+
+    Returns:
+        LRUCache | TieredCache | None: The configured cache, None when fragment caching is disabled.
+    """
+    if not config.get("FRAGMENT_CACHE_ENABLED"):
+        return None
+
+    cache = LRUCache(max_size=config["FRAGMENT_CACHE_MAX_SIZE"], ttl=config["FRAGMENT_CACHE_TTL"])
+    if config.get("FRAGMENT_CACHE_DB_PATH"):
+        cache = TieredCache(cache, SQLiteCache(config["FRAGMENT_CACHE_DB_PATH"], ttl=config["FRAGMENT_CACHE_TTL"]))
+        logger.info(f"Fragment cache persisted to: {config['FRAGMENT_CACHE_DB_PATH']}")
+
+    return cache
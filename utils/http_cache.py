@@ -0,0 +1,44 @@
+import hashlib
+import os
+
+
+def fingerprint_files(*directories: str) -> str:
+    """
+    Computes a fingerprint of the content of all files in the directories.
+
+    Pages rendered from the files change with a deployment even when the data does not,
+    so the fingerprint is a part of their ETags.
+
+    Args:
+        *directories (str): The directories searched recursively.
+
+    Returns:
+        str: The hexadecimal SHA-256 digest of the file paths and contents.
+    """
+    digest = hashlib.sha256()
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for file_name in sorted(files):
+                path = os.path.join(root, file_name)
+                digest.update(os.path.relpath(path, directory).encode())
+                with open(path, "rb") as file:
+                    digest.update(file.read())
+    return digest.hexdigest()
+
+
+def make_etag(*parts) -> str:
+    """
+    Derives an ETag value from the parts identifying a representation.
+
+    Args:
+        *parts: The parts, e.g. the data version stamp and the request path with its query.
+
+    Returns:
+        str: The hexadecimal digest of the parts (without quotes).
+
+    Example:
+        >>> make_etag("v1", 42, "/users?limit=60")
+        '49e3af6e96e93d7cef851959'
+    """
+    return hashlib.sha256(":".join(str(part) for part in parts).encode()).hexdigest()[:24]
@@ -0,0 +1,221 @@
+import os
+import sqlite3
+import threading
+import time
+
+from limits.errors import ConfigurationError
+from limits.storage import MovingWindowSupport, Storage
+
+# expired counters and window entries of keys that are not hit again are purged at most this often (seconds)
+PURGE_INTERVAL = 60
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """
+    Rate limit storage keeping the counters in a SQLite file shared by all processes of a host.
+
+    Registered for "sqlite:///relative/path.db" and "sqlite:////absolute/path.db" storage URIs,
+    so that Flask-Limiter uses it with e.g. RATELIMIT_STORAGE_URI=sqlite:////var/lib/moviweb/rate_limits.db.
+    Fixed window counters are incremented by a single upsert, a moving window entry is acquired
+    in one write transaction (BEGIN IMMEDIATE), so that concurrent workers never exceed a limit.
+    A window entry stores the acquired amount, so a hit costs one row whatever its cost.
+
+    Attributes:
+        path (str): The path of the SQLite file.
+        timeout (float): The seconds a connection waits for the write lock held by another process.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, timeout: float = 5, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        # the path follows the scheme after one slash, like the SQLAlchemy SQLite URLs
+        self.path = uri.split("://", 1)[1][1:]
+        if not self.path or self.path == ":memory:":
+            raise ConfigurationError("The SQLite rate limit storage requires a file path, e.g. sqlite:///limits.db")
+        self.timeout = timeout
+        self._local = threading.local()
+        self._next_purge = 0.0
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_counters "
+            "(key TEXT PRIMARY KEY, value INTEGER NOT NULL, expires_at REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_entries "
+            "(key TEXT NOT NULL, expires_at REAL NOT NULL, amount INTEGER NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_rate_limit_entries_key_expires_at ON rate_limit_entries (key, expires_at)"
+        )
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # autocommit mode, the write transactions are started explicitly
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _purge_expired(self, connection: sqlite3.Connection, now: float):
+        """ Deletes the expired rows of all keys, at most once per PURGE_INTERVAL, inside a write transaction. """
+        if now < self._next_purge:
+            return
+        self._next_purge = now + PURGE_INTERVAL
+        connection.execute("DELETE FROM rate_limit_counters WHERE expires_at <= ?", (now,))
+        connection.execute("DELETE FROM rate_limit_entries WHERE expires_at <= ?", (now,))
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """
+        Increments the fixed window counter of the key, an expired counter starts a new window.
+
+        Args:
+            key (str): The rate limit key.
+            expiry (int): The length of the window in seconds.
+            amount (int): The number added to the counter.
+
+        Returns:
+            int: The counter value after the increment.
+        """
+        now = time.time()
+        connection = self._connection()
+        self._purge_expired(connection, now)
+        return connection.execute(
+            "INSERT INTO rate_limit_counters (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "value = CASE WHEN expires_at > ? THEN value + excluded.value ELSE excluded.value END, "
+            "expires_at = CASE WHEN expires_at > ? THEN expires_at ELSE excluded.expires_at END "
+            "RETURNING value",
+            (key, amount, now + expiry, now, now)
+        ).fetchone()[0]
+
+    def get(self, key: str) -> int:
+        """
+        Args:
+            key (str): The rate limit key.
+
+        Returns:
+            int: The fixed window counter value of the key, 0 when missing or expired.
+        """
+        row = self._connection().execute(
+            "SELECT value FROM rate_limit_counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        """
+        Args:
+            key (str): The rate limit key.
+
+        Returns:
+            float: The timestamp the fixed window of the key ends, now when missing.
+        """
+        row = self._connection().execute(
+            "SELECT expires_at FROM rate_limit_counters WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        """
+        Acquires entries in the moving window of the key if the limit allows it.
+
+        Args:
+            key (str): The rate limit key.
+            limit (int): The number of entries allowed in the window.
+            expiry (int): The length of the window in seconds.
+            amount (int): The number of entries to acquire.
+
+        Returns:
+            bool: True if the entries were acquired, False if the limit is reached.
+        """
+        if amount > limit:
+            return False
+
+        now = time.time()
+        connection = self._connection()
+        # the write lock is taken before counting, so no other process can acquire in between
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._purge_expired(connection, now)
+            connection.execute("DELETE FROM rate_limit_entries WHERE key = ? AND expires_at <= ?", (key, now))
+            acquired = connection.execute(
+                "SELECT COALESCE(SUM(amount), 0) FROM rate_limit_entries WHERE key = ?", (key,)
+            ).fetchone()[0]
+            if acquired + amount > limit:
+                connection.execute("COMMIT")
+                return False
+            connection.execute(
+                "INSERT INTO rate_limit_entries (key, expires_at, amount) VALUES (?, ?, ?)",
+                (key, now + expiry, amount)
+            )
+            connection.execute("COMMIT")
+            return True
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> tuple[float, int]:
+        """
+        Args:
+            key (str): The rate limit key.
+            limit (int): The number of entries allowed in the window.
+            expiry (int): The length of the window in seconds.
+
+        Returns:
+            tuple[float, int]: The timestamp of the oldest entry in the window (now when empty)
+            and the number of acquired entries.
+        """
+        now = time.time()
+        oldest_expiry, acquired = self._connection().execute(
+            "SELECT MIN(expires_at), COALESCE(SUM(amount), 0) FROM rate_limit_entries "
+            "WHERE key = ? AND expires_at > ?",
+            (key, now)
+        ).fetchone()
+        return (oldest_expiry - expiry, acquired) if acquired else (now, 0)
+
+    def check(self) -> bool:
+        """
+        Returns:
+            bool: True if the SQLite file can be queried.
+        """
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def reset(self) -> int:
+        """
+        Removes the counters and window entries of all keys.
+
+        Returns:
+            int: The number of removed rows.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        removed = connection.execute("DELETE FROM rate_limit_counters").rowcount
+        removed += connection.execute("DELETE FROM rate_limit_entries").rowcount
+        connection.execute("COMMIT")
+        return removed
+
+    def clear(self, key: str):
+        """
+        Removes the counter and window entries of the key.
+
+        Args:
+            key (str): The rate limit key.
+        """
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        connection.execute("DELETE FROM rate_limit_counters WHERE key = ?", (key,))
+        connection.execute("DELETE FROM rate_limit_entries WHERE key = ?", (key,))
+        connection.execute("COMMIT")
@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+from typing import Iterable, Iterator, TextIO
+
+from utils.validation import get_valid_number_or_none, get_valid_url_or_none
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+EXPORT_FIELDS = ("name", "director", "year", "rating", "poster_url", "note")
+
+# Column names used by Letterboxd and IMDb list exports mapped to movie fields
+_FIELD_ALIASES = {
+    "name": ("name", "title", "original title", "film"),
+    "director": ("director", "directors"),
+    "year": ("year", "release year"),
+    "rating": ("rating", "imdb rating", "imdbrating"),
+    "poster_url": ("poster_url", "poster", "poster url"),
+    "note": ("note", "user_note", "review", "description"),
+}
+# Letterboxd exports are recognized by this column, their "Rating" is the user's 0.5-5 stars, not the movie rating
+_LETTERBOXD_COLUMN = "letterboxd uri"
+
+
+def _get_field(row: dict, field: str) -> str:
+    """
+    Returns the stripped value of the first column matching the field or its aliases.
+    """
+    for alias in _FIELD_ALIASES[field]:
+        value = row.get(alias)
+        if value not in (None, ""):
+            return str(value).strip()
+    return ""
+
+
+def parse_movie_row(row: dict) -> dict | None:
+    """
+    Converts a row of an imported movie list to movie fields.
+
+    Column names are matched case-insensitively, including the column names used by
+    Letterboxd and IMDb exports. Invalid numbers and URLs are dropped. The star rating
+    of a Letterboxd export is the user's own rating, it is kept in the note instead of the movie rating.
+
+    Args:
+        row (dict): The imported row.
+
+    Returns:
+        dict | None: The movie fields, None when the row has no movie name.
+    """
+    row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+    name = _get_field(row, "name")
+    if not name:
+        return None
+
+    note = _get_field(row, "note")
+    if _LETTERBOXD_COLUMN in row:
+        stars = str(row.pop("rating", None) or "").strip()
+        if stars and not note:
+            note = f"Rated {stars}/5 on Letterboxd"
+
+    return {
+        "name": name,
+        "director": _get_field(row, "director") or None,
+        "year": get_valid_number_or_none(_get_field(row, "year"), int),
+        "rating": get_valid_number_or_none(_get_field(row, "rating"), float),
+        "poster_url": get_valid_url_or_none(_get_field(row, "poster_url")),
+        "note": note or None,
+    }
+
+
+def read_movie_rows(stream: TextIO, file_format: str) -> Iterator[dict]:
+    """
+    Lazily reads movie fields from a CSV or JSON Lines stream.
+
+    Args:
+        stream (TextIO): The text stream to read.
+        file_format (str): The format of the stream, "csv" or "jsonl".
+
+    Returns:
+        Iterator[dict]: The movie fields of every row with a movie name.
+
+    Raises:
+        ValueError: If the format is not supported or a JSON line is invalid or not an object.
+    """
+    if file_format == "csv":
+        rows = csv.DictReader(stream)
+    elif file_format == "jsonl":
+        rows = _read_json_lines(stream)
+    else:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+    for row in rows:
+        movie_row = parse_movie_row(row)
+        if movie_row:
+            yield movie_row
+
+
+def _read_json_lines(stream: TextIO) -> Iterator[dict]:
+    """ Parses the JSON objects of the non-blank lines, a line that is not an object raises ValueError with its number. """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Line {line_number} is not valid JSON: {error.msg}.") from error
+        if not isinstance(row, dict):
+            raise ValueError(f"Line {line_number} is not a JSON object.")
+        yield row
+
+
+def write_movie_rows(movies: Iterable, file_format: str) -> Iterator[str]:
+    """
+    Lazily serializes movies with their user notes to CSV or JSON Lines.
+
+    Args:
+        movies (Iterable): Movies with a user_note attribute (e.g. MovieCard).
+        file_format (str): The output format, "csv" or "jsonl".
+
+    Returns:
+        Iterator[str]: The serialized lines, starting with the header for CSV.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if file_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported format: {file_format}")
+
+    if file_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        yield buffer.getvalue()
+
+    for movie in movies:
+        values = (movie.name, movie.director, movie.year, movie.rating, movie.poster_url, movie.user_note)
+        if file_format == "csv":
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(values)
+            yield buffer.getvalue()
+        else:
+            yield json.dumps(dict(zip(EXPORT_FIELDS, values))) + "\n"
+
+
+def get_file_format(filename: str, default: str | None = None) -> str | None:
+    """
+    Derives the movie list format from the file name extension.
+
+    Args:
+        filename (str): The name of the file.
+        default (str | None): The format returned when the extension is not supported.
+
+    Returns:
+        str | None: "csv" or "jsonl" if supported, otherwise the default.
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension == "json":
+        extension = "jsonl"
+    return extension if extension in SUPPORTED_FORMATS else default
@@ -0,0 +1,301 @@
+import hashlib
+import io
+import ipaddress
+import logging
+import os
+import socket
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from project.exceptions import PosterUnavailableError
+from utils.cache import LRUCache
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional, without it posters are linked from their origin
+    Image = ImageOps = None
+
+logger = logging.getLogger("poster_cache")
+
+POSTER_MIMETYPE = "image/webp"
+# redirects followed when fetching an original, each target is checked like the poster URL
+MAX_REDIRECTS = 5
+
+
+class PosterCache:
+    """
+    On-disk cache of movie posters resized to the widths used by the pages.
+
+    The original image is fetched from its origin once, resized to all widths and stored
+    as WebP files named after the SHA-256 hash of the poster URL, so a changed poster URL
+    never serves a stale image and movies sharing a poster share its files.
+    Concurrent requests for the same poster share a single fetch and posters that failed
+    to load are not requested from their origin again for failure_ttl seconds.
+
+    Poster URLs come from OMDb and from users, so originals are fetched only from public addresses
+    (and the trusted networks): the host and every redirect target are resolved and checked before
+    they are requested, so that the server cannot be made to request its internal services.
+
+    Attributes:
+        directory (str): The directory holding the resized posters.
+        widths (tuple[int, ...]): The widths (in pixels) the posters are resized to, in ascending order.
+        timeout (tuple[float, float]): The connect and read timeout of origin requests in seconds.
+        max_bytes (int): The maximal size of an original image.
+        quality (int): The WebP quality (0-100).
+        session (requests.Session): The pooled HTTP session used to fetch the originals.
+        trusted_networks (tuple): Non-public networks the originals may be fetched from, e.g. a local poster server.
+    """
+
+    def __init__(self, directory: str, widths: tuple[int, ...] = (160, 320, 480),
+                 timeout: tuple[float, float] = (3.05, 10), max_bytes: int = 10 * 1024 * 1024, quality: int = 80,
+                 pool_size: int = 10, failure_ttl: float = 10 * 60, warm_workers: int = 2,
+                 trusted_networks: tuple[str, ...] = ()):
+        self.directory = directory
+        self.widths = tuple(sorted(widths))
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.trusted_networks = tuple(ipaddress.ip_network(network) for network in trusted_networks)
+        self._failures = LRUCache(max_size=1024, ttl=failure_ttl)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._warm_workers = warm_workers
+        self._executor = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, poster_url: str, width: int) -> str:
+        """
+        Returns the path of a resized poster in the cache directory, whether it exists or not.
+
+        Args:
+            poster_url (str): The URL of the original poster.
+            width (int): One of the cached widths.
+
+        Returns:
+            str: The path of the WebP file.
+        """
+        key = hashlib.sha256(poster_url.encode()).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}-{width}.webp")
+
+    def get(self, poster_url: str, width: int) -> str:
+        """
+        Returns the path of a resized poster, fetching and resizing the original on a cache miss.
+
+        Args:
+            poster_url (str): The URL of the original poster.
+            width (int): One of the cached widths.
+
+        Returns:
+            str: The path of the WebP file.
+
+        Raises:
+            ValueError: If the width is not one of the cached widths.
+            PosterUnavailableError: If the original cannot be fetched or decoded.
+        """
+        if width not in self.widths:
+            raise ValueError(f"Unsupported poster width: {width}")
+
+        path = self.path_for(poster_url, width)
+        if os.path.exists(path):
+            return path
+
+        if self._failures.get(poster_url):
+            raise PosterUnavailableError(f"Poster is unavailable: {poster_url}")
+
+        with self._lock:
+            future = self._in_flight.get(poster_url)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._in_flight[poster_url] = future
+
+        if not is_leader:
+            future.result()
+            return path
+
+        try:
+            self._store(poster_url, self._fetch(poster_url))
+            future.set_result(None)
+            return path
+        except PosterUnavailableError as error:
+            self._failures.set(poster_url, True)
+            logger.warning(str(error))
+            future.set_exception(error)
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[poster_url]
+
+    def is_cached(self, poster_url: str) -> bool:
+        """
+        Checks whether all widths of a poster are stored.
+
+        Args:
+            poster_url (str): The URL of the original poster.
+
+        Returns:
+            bool: True if no width of the poster has to be fetched.
+        """
+        return all(os.path.exists(self.path_for(poster_url, width)) for width in self.widths)
+
+    def warm(self, poster_url: str) -> Future:
+        """
+        Fetches and resizes a poster in a background thread unless it is already cached.
+
+        Args:
+            poster_url (str): The URL of the original poster.
+
+        Returns:
+            Future: The future of the background job, resolved with True when the poster was cached.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._warm_workers,
+                                                    thread_name_prefix="poster-warmer")
+        return self._executor.submit(self.prefetch, poster_url)
+
+    def prefetch(self, poster_url: str) -> bool:
+        """
+        Fetches and resizes a poster unless it is already cached.
+
+        Args:
+            poster_url (str): The URL of the original poster.
+
+        Returns:
+            bool: True if the poster is cached, False if it is unavailable.
+        """
+        try:
+            self.get(poster_url, self.widths[-1])
+            return True
+        except PosterUnavailableError:
+            return False
+
+    def _fetch(self, poster_url: str) -> bytes:
+        url = poster_url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                self._check_origin(url)
+                # redirects are followed here, so that every target is checked before it is requested
+                with self.session.get(url, timeout=self.timeout, stream=True, allow_redirects=False) as response:
+                    if response.is_redirect:
+                        url = urljoin(url, response.headers["Location"])
+                        continue
+                    if response.status_code != 200:
+                        raise PosterUnavailableError(
+                            f"Poster origin responded with status: {response.status_code} for {poster_url}"
+                        )
+
+                    content = io.BytesIO()
+                    for chunk in response.iter_content(64 * 1024):
+                        content.write(chunk)
+                        if content.tell() > self.max_bytes:
+                            raise PosterUnavailableError(f"Poster is larger than {self.max_bytes} bytes: {poster_url}")
+                    return content.getvalue()
+        except requests.exceptions.RequestException as error:
+            raise PosterUnavailableError(f"Fetching poster failed: {str(error)}") from error
+
+        raise PosterUnavailableError(f"Poster origin redirected more than {MAX_REDIRECTS} times: {poster_url}")
+
+    def _check_origin(self, url: str):
+        """
+        Checks that a URL may be requested: an HTTP(S) URL whose host resolves only to public addresses
+        (not private, loopback, link-local, reserved or multicast ones) or to addresses of the trusted networks.
+
+        Args:
+            url (str): The URL of the original poster or of a redirect target.
+
+        Raises:
+            PosterUnavailableError: If the URL must not be requested.
+        """
+        parts = urlsplit(url)
+        try:
+            if parts.scheme not in ("http", "https") or not parts.hostname:
+                raise PosterUnavailableError(f"Poster URL is not an HTTP(S) URL: {url}")
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            addresses = {info[4][0] for info in socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)}
+        except (OSError, UnicodeError, ValueError) as error:
+            raise PosterUnavailableError(f"Poster host cannot be resolved: {url}") from error
+
+        for address in addresses:
+            # the scope of an IPv6 link-local address follows "%"
+            ip = ipaddress.ip_address(address.split("%")[0])
+            if ip.version == 6 and ip.ipv4_mapped:
+                ip = ip.ipv4_mapped
+            is_public = ip.is_global and not ip.is_multicast
+            if not is_public and not any(ip in network for network in self.trusted_networks):
+                raise PosterUnavailableError(f"Poster host resolves to a non-public address {address}: {url}")
+
+    def _store(self, poster_url: str, content: bytes):
+        try:
+            with Image.open(io.BytesIO(content)) as original:
+                image = ImageOps.exif_transpose(original)
+                if image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+
+                for width in self.widths:
+                    resized = image
+                    # smaller originals are not upscaled
+                    if image.width > width:
+                        resized = image.resize((width, round(image.height * width / image.width)),
+                                               Image.Resampling.LANCZOS)
+                    self._write(self.path_for(poster_url, width), resized)
+        except (OSError, ValueError, Image.DecompressionBombError) as error:
+            raise PosterUnavailableError(f"Poster cannot be decoded: {poster_url}") from error
+
+    def _write(self, path: str, image):
+        # written to a temporary file first, so a poster is never served half-written
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                image.save(file, "WEBP", quality=self.quality, method=4)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def close(self):
+        """ Waits for the background jobs and closes all pooled connections. """
+        if self._executor:
+            self._executor.shutdown(wait=True)
+        self.session.close()
+
+
+def create_poster_cache(config) -> PosterCache | None:
+    """
+    Creates the poster cache from the application configuration.
+
+    Args:
+        config: The application configuration mapping.
+
+    Returns:
+        PosterCache | None: The configured cache, None when the poster proxy is disabled or Pillow is not installed.
+    """
+    if not config.get("POSTER_PROXY_ENABLED"):
+        return None
+
+    if Image is None:
+        logger.warning("Pillow is not installed, posters are linked from their origin.")
+        return None
+
+    return PosterCache(
+        directory=config["POSTER_CACHE_DIR"],
+        widths=tuple(config["POSTER_WIDTHS"]),
+        timeout=(config["POSTER_CONNECT_TIMEOUT"], config["POSTER_READ_TIMEOUT"]),
+        max_bytes=config["POSTER_MAX_BYTES"],
+        quality=config["POSTER_WEBP_QUALITY"],
+        warm_workers=config["POSTER_WARM_WORKERS"],
+        trusted_networks=tuple(config.get("POSTER_TRUSTED_NETWORKS", ())),
+    )
@@ -0,0 +1,200 @@
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import tempfile
+
+import rcssmin
+import rjsmin
+from flask import abort, request, send_file, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional, without it only the gzip siblings are built
+    brotli = None
+
+logger = logging.getLogger("static_assets")
+
+MANIFEST_NAME = "manifest.json"
+# bundles built into one minified file each, keyed by the path they are requested by
+ASSET_BUNDLES = {
+    "css/style.css": ["css/style.css"],
+    "js/script.js": ["js/script.js"],
+}
+# directories of the static folder copied with fingerprinted names
+COPIED_DIRECTORIES = ["fonts", "images"]
+MINIFIERS = {".css": rcssmin.cssmin, ".js": rjsmin.jsmin}
+# already compressed formats (e.g. WebP) gain nothing from gzip or Brotli
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".ttf", ".otf", ".json"}
+ENCODING_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+_STATIC_URL_RE = re.compile(r"""url\((["']?)/static/([^"')]+)\1\)""")
+
+
+def fingerprinted_name(path: str, content: bytes) -> str:
+    """
+    Inserts the hash of the content into a file name.
+
+    Args:
+        path (str): The relative path of the file.
+        content (bytes): The content of the file.
+
+    Returns:
+        str: The path with 12 hexadecimal characters of the SHA-256 of the content before the extension.
+
+    Example:
+        >>> fingerprinted_name("css/style.css", b"")
+        'css/style.e3b0c44298fc.css'
+    """
+    base, extension = os.path.splitext(path)
+    return f"{base}.{hashlib.sha256(content).hexdigest()[:12]}{extension}"
+
+
+def _write_atomic(path: str, content: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as file:
+        file.write(content)
+    os.replace(temp_path, path)
+
+
+def _write_asset(output_dir: str, path: str, content: bytes) -> str:
+    name = fingerprinted_name(path, content)
+    target = os.path.join(output_dir, name)
+    _write_atomic(target, content)
+
+    if os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS:
+        # mtime=0 keeps the gzip output reproducible between builds
+        _write_atomic(target + ENCODING_EXTENSIONS["gzip"], gzip.compress(content, compresslevel=9, mtime=0))
+        if brotli:
+            _write_atomic(target + ENCODING_EXTENSIONS["br"], brotli.compress(content, quality=11))
+    return name
+
+
+def build_assets(static_folder: str, output_dir: str, url_prefix: str = "/assets/") -> dict:
+    """
+    Builds the fingerprinted, minified and precompressed static assets and their manifest.
+
+    Fonts and images are copied first, so that the "/static/..." URLs in the stylesheets
+    can be rewritten to their fingerprinted names. Compressible files get .gz (and .br
+    with Brotli installed) siblings. Files of previous builds are kept, so that pages
+    rendered before a deployment can still load them.
+
+    Args:
+        static_folder (str): The static folder with the source files.
+        output_dir (str): The directory the assets and the manifest are written to.
+        url_prefix (str): The URL prefix the built assets are served from.
+
+    Returns:
+        dict: The manifest mapping the source paths to the fingerprinted paths.
+    """
+    manifest = {}
+
+    for directory in COPIED_DIRECTORIES:
+        for root, _, files in os.walk(os.path.join(static_folder, directory)):
+            for file_name in sorted(files):
+                source = os.path.join(root, file_name)
+                path = os.path.relpath(source, static_folder).replace(os.sep, "/")
+                with open(source, "rb") as file:
+                    manifest[path] = _write_asset(output_dir, path, file.read())
+
+    def rewrite_url(match: re.Match) -> str:
+        path = manifest.get(match.group(2))
+        return f'url("{url_prefix}{path}")' if path else match.group(0)
+
+    for path, sources in ASSET_BUNDLES.items():
+        parts = []
+        for source in sources:
+            with open(os.path.join(static_folder, source), encoding="utf-8") as file:
+                parts.append(file.read())
+        content = "\n".join(parts)
+
+        extension = os.path.splitext(path)[1]
+        if extension == ".css":
+            content = _STATIC_URL_RE.sub(rewrite_url, content)
+        if extension in MINIFIERS:
+            content = MINIFIERS[extension](content)
+        manifest[path] = _write_asset(output_dir, path, content.encode())
+
+    _write_atomic(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode())
+    logger.info(f"Built {len(manifest)} assets into: {output_dir}")
+    return manifest
+
+
+class StaticAssets:
+    """
+    Resolves and serves the built static assets.
+
+    Assets missing in the manifest (e.g. before the first build) are linked
+    from the static folder unminified.
+
+    Attributes:
+        directory (str): The directory of the built assets.
+        endpoint (str): The endpoint serving the built assets.
+        manifest (dict): The source paths mapped to the fingerprinted paths.
+    """
+
+    def __init__(self, directory: str, endpoint: str = "asset"):
+        self.directory = directory
+        self.endpoint = endpoint
+        self.manifest = {}
+        self.load_manifest()
+
+    def load_manifest(self):
+        """ Reads the manifest written by the last build. """
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME), encoding="utf-8") as file:
+                self.manifest = json.load(file)
+        except FileNotFoundError:
+            logger.warning("Static assets are not built, run: flask moviweb build-assets")
+            self.manifest = {}
+
+    def url(self, path: str) -> str:
+        """
+        Returns the URL of a static asset.
+
+        Args:
+            path (str): The path of the asset in the static folder, e.g. "css/style.css".
+
+        Returns:
+            str: The URL of the fingerprinted asset, or of the source file when the asset is not built.
+        """
+        built_path = self.manifest.get(path)
+        if built_path:
+            return url_for(self.endpoint, filename=built_path)
+        return url_for("static", filename=path)
+
+    def send(self, filename: str, max_age: int):
+        """
+        Sends a built asset, precompressed when the client accepts Brotli or gzip.
+
+        Args:
+            filename (str): The fingerprinted path of the asset.
+            max_age (int): The number of seconds the asset is cached for.
+
+        Returns:
+            Response: The asset with immutable caching headers.
+        """
+        path = safe_join(self.directory, filename)
+        if not path or filename == MANIFEST_NAME or not os.path.isfile(path):
+            abort(404, description="Asset not found!")
+
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        encoding = None
+        for candidate in ("br", "gzip"):
+            if request.accept_encodings[candidate] and os.path.isfile(path + ENCODING_EXTENSIONS[candidate]):
+                encoding = candidate
+                path += ENCODING_EXTENSIONS[candidate]
+                break
+
+        response = send_file(path, mimetype=mimetype, max_age=max_age, conditional=True, etag=True)
+        if encoding:
+            response.content_encoding = encoding
+        if os.path.splitext(filename)[1] in COMPRESSIBLE_EXTENSIONS:
+            response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
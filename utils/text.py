@@ -0,0 +1,123 @@
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalizes a movie title for lookups and cache keys.
+
+    The title is case-folded, stripped and runs of whitespace are collapsed
+    into a single space, so that "The  Matrix " and "the matrix" share the same key.
+
+    Args:
+        title (str): The title to normalize.
+
+    Returns:
+        str: The normalized title.
+
+    Example:
+        >>> normalize_title("  The   Matrix ")
+        'the matrix'
+    """
+    return _WHITESPACE_RE.sub(" ", title).strip().casefold()
+
+
+def split_words(text: str) -> list[str]:
+    """
+    Splits a search text into case-folded words, punctuation is dropped.
+
+    Args:
+        text (str): The search text.
+
+    Returns:
+        list[str]: The words of the text.
+
+    Example:
+        >>> split_words("Matrix: Reloaded")
+        ['matrix', 'reloaded']
+    """
+    return _WORD_RE.findall(text.casefold())
+
+
+def split_search_text(text: str) -> tuple[list[str], bool]:
+    """
+    Splits a user provided search text into the words it is matched by.
+
+    The last word is used as a prefix, so that a partially typed word matches as well,
+    a single typed character is ignored until more of the word is typed.
+
+    Args:
+        text (str): The search text.
+
+    Returns:
+        tuple[list[str], bool]: The words and whether the last word is matched as a prefix.
+
+    Example:
+        >>> split_search_text("matrix rel")
+        (['matrix', 'rel'], True)
+    """
+    words = split_words(text)
+    is_last_word_complete = text[-1:].isspace()
+    if words and not is_last_word_complete and len(words[-1]) == 1:
+        words.pop()
+        is_last_word_complete = True
+    return words, bool(words) and not is_last_word_complete
+
+
+def build_fts_query(text: str) -> str:
+    """
+    Builds a SQLite FTS5 query matching all words of a user provided search text.
+
+    Every word is quoted, so that FTS5 operators in the text are treated as plain words.
+    The words are split by split_search_text.
+
+    Args:
+        text (str): The search text.
+
+    Returns:
+        str: The FTS5 query, an empty string when the text contains no words.
+
+    Example:
+        >>> build_fts_query("matrix rel")
+        '"matrix" "rel"*'
+    """
+    words, is_prefix = split_search_text(text)
+    terms = [f'"{word}"' for word in words]
+    if is_prefix:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _fold_diacritics(text: str) -> str:
+    if text.isascii():
+        return text
+    return "".join(char for char in unicodedata.normalize("NFD", text) if not unicodedata.combining(char))
+
+
+def contains_search_words(text: str, words: list[str], is_prefix: bool) -> bool:
+    """
+    Checks whether a text contains all words of a search text, like the query of build_fts_query
+    matches it in the full-text index (words are compared case-folded and without diacritics).
+
+    Args:
+        text (str): The searched text, e.g. a movie title.
+        words (list[str]): The words of the search text, as split by split_search_text.
+        is_prefix (bool): Whether the last word is matched as a prefix.
+
+    Returns:
+        bool: True when every word is contained.
+
+    Example:
+        >>> contains_search_words("The Matrix Reloaded", *split_search_text("matrix rel"))
+        True
+    """
+    tokens = set(split_words(_fold_diacritics(text)))
+    words = [_fold_diacritics(word) for word in words]
+    if is_prefix:
+        prefix = words.pop()
+        if not any(token.startswith(prefix) for token in tokens):
+            return False
+    return tokens.issuperset(words)